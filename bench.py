@@ -0,0 +1,441 @@
+"""GLFT 客户端基准测试：基于 mock_server 离线测量界面延迟、吞吐、重试效果、导出内存与表格渲染耗时。
+
+    python bench.py                                   # 默认规模
+    python bench.py --json bench.json                 # 保存结果作为基线
+    python bench.py --compare bench.json --tolerance 0.2   # 与基线比较，退化超过 20% 时返回非零
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from rich.console import Console
+from rich.prompt import Confirm, Prompt
+
+from glft_app import TRADE_COLUMNS, GlftTuiApp
+from glft_client import ApiError, AsyncGlftApiClient, GlftApiClient
+from glft_monitor import RiskMonitor
+from glft_records import Trade, decode_records
+from glft_table import TableView
+from glft_transport import TransportOptions
+from mock_server import MOCK_TOKEN, MockConfig, MockServer, make_trade, start_mock_server
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，跳过峰值内存统计。
+    resource = None
+
+# 指标名 -> 方向：lower 表示越小越好，higher 表示越大越好。
+Results = dict[str, tuple[float, str]]
+
+# 绝对预算（指标名 -> 上限）：不依赖基线，每次运行都检查，超出时与退化一样返回非零。
+BUDGETS: dict[str, float] = {
+    # headless 冷启动中由本仓库代码决定的部分（glft 模块导入、建客户端、登录与一次请求），
+    # 即总耗时扣除“解释器启动 + import httpx”的下限。总耗时本身达不到 100ms 的目标（见 README），
+    # 这里只防止本仓库自己的部分继续变慢。
+    "startup.headless_metrics.own_p50_ms": 100.0,
+}
+
+SCREENS = (
+    "show_dashboard",
+    "show_market_data",
+    "manage_strategy",
+    "manage_risk",
+    "manage_system_config",
+    "manage_alerts",
+)
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _timed(func: Callable[[], Any], iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_screens(server: MockServer, iterations: int) -> Results:
+    """每个界面完整走一遍“拉取 + 渲染”，交互提示一律按默认值返回。"""
+    api = GlftApiClient(server.base_url)
+    async_api = AsyncGlftApiClient(server.base_url, cache=api.cache, metrics=api.metrics)
+    api.login("bench", "bench")
+    app = GlftTuiApp(api, Console(file=io.StringIO(), width=160), async_api=async_api)
+    results: Results = {}
+    try:
+        with (
+            mock.patch.object(Confirm, "ask", return_value=False),
+            mock.patch.object(Prompt, "ask", return_value="0"),
+        ):
+            for name in SCREENS:
+                screen = getattr(app, name)
+                screen()
+                samples = _timed(screen, iterations)
+                results[f"screen.{name}.p50_ms"] = (_percentile(samples, 0.5) * 1000, "lower")
+                results[f"screen.{name}.p95_ms"] = (_percentile(samples, 0.95) * 1000, "lower")
+    finally:
+        app.close()
+        api.close()
+    return results
+
+
+def bench_throughput(server: MockServer, concurrency: int, duration: float) -> Results:
+    api = GlftApiClient(server.base_url)
+    api.login("bench", "bench")
+    counts = [0] * concurrency
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int) -> None:
+        while time.perf_counter() < deadline:
+            api.get_dashboard_metrics()
+            counts[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    api.close()
+    return {"throughput.dashboard_metrics.rps": (sum(counts) / elapsed, "higher")}
+
+
+def bench_flaky(latency_ms: float, error_rate: float, requests: int) -> Results:
+    """后端随机返回 503 时，对比不重试与默认重试策略下仪表盘请求的成功率与 p95 延迟。"""
+    server = start_mock_server(MockConfig(latency_ms=latency_ms, error_rate=error_rate, trades=0))
+    results: Results = {}
+    try:
+        for label, options in (
+            ("no_retry", TransportOptions(retries=0, breaker_threshold=0)),
+            ("retry", TransportOptions()),
+        ):
+            api = GlftApiClient(server.base_url, options=options)
+            api.token = MOCK_TOKEN
+            samples, succeeded = [], 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                try:
+                    api.get_dashboard_metrics()
+                    succeeded += 1
+                except ApiError:
+                    pass
+                samples.append(time.perf_counter() - started)
+            api.close()
+            results[f"flaky.{label}.success_ratio"] = (succeeded / requests, "higher")
+            results[f"flaky.{label}.p95_ms"] = (_percentile(samples, 0.95) * 1000, "lower")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def bench_export(server: MockServer) -> Results:
+    """在子进程里分别跑流式导出与旧的整包导出，比较客户端峰值 RSS。"""
+    if resource is None:
+        return {}
+    server.state.pnl_csv()  # 预先生成 CSV，避免首个子进程把生成时间算进去。
+    results: Results = {}
+    for mode in ("stream", "legacy"):
+        output = subprocess.run(
+            [sys.executable, __file__, "_export-child", server.base_url, mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        child = json.loads(output)
+        results[f"export.{mode}.peak_rss_mb"] = (child["peak_rss_mb"], "lower")
+        results[f"export.{mode}.seconds"] = (child["seconds"], "lower")
+    return results
+
+
+def _export_child(base_url: str, mode: str) -> None:
+    api = GlftApiClient(base_url)
+    api.login("bench", "bench")
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "pnl.csv"
+        started = time.perf_counter()
+        if mode == "stream":
+            api.download_pnl_csv(target)
+        else:
+            target.write_text(api.export_pnl_csv(), encoding="utf-8")
+        seconds = time.perf_counter() - started
+    api.close()
+    print(json.dumps({"peak_rss_mb": _peak_rss_mb(), "seconds": seconds}))
+
+
+def _peak_rss_mb() -> float:
+    # Linux 上 ru_maxrss 会跨 exec 继承 fork 时父进程的峰值，优先读本进程地址空间的 VmHWM。
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    # ru_maxrss 在 Linux 上单位是 KiB，macOS 上是字节。
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+def bench_cold_start(server: MockServer, iterations: int) -> Results:
+    """headless 子命令的冷启动耗时（进程启动 + 导入 + 登录 + 一次请求），看门狗脚本每次都要付出这部分。"""
+    tui = Path(__file__).with_name("tui.py")
+    command = [sys.executable, str(tui), "--api-url", server.base_url, "metrics", "--json"]
+    env = {**os.environ, "GLFT_USERNAME": "bench", "GLFT_PASSWORD": "bench"}
+    env.pop("GLFT_TOKEN", None)
+    samples = _timed(lambda: subprocess.run(command, check=True, capture_output=True, env=env), iterations)
+    floor_command = [sys.executable, "-c", "import httpx"]
+    floor = _percentile(_timed(lambda: subprocess.run(floor_command, check=True, env=env), iterations), 0.5)
+    p50 = _percentile(samples, 0.5)
+    return {
+        "startup.headless_metrics.p50_ms": (p50 * 1000, "lower"),
+        "startup.headless_metrics.p95_ms": (_percentile(samples, 0.95) * 1000, "lower"),
+        "startup.import_floor.p50_ms": (floor * 1000, "lower"),
+        "startup.headless_metrics.own_p50_ms": (max(0.0, p50 - floor) * 1000, "lower"),
+    }
+
+
+def bench_build_table(server: MockServer, row_counts: list[int]) -> Results:
+    api = GlftApiClient(server.base_url)
+    app = GlftTuiApp(api, Console(file=io.StringIO(), width=160))
+    results: Results = {}
+    for count in row_counts:
+        rows = [make_trade(trade_id) for trade_id in range(1, count + 1)]
+        started = time.perf_counter()
+        table = app._build_table("成交", rows, TRADE_COLUMNS)
+        built = time.perf_counter()
+        app.console.print(table)
+        rendered = time.perf_counter()
+        results[f"table.{count}.build_ms"] = ((built - started) * 1000, "lower")
+        results[f"table.{count}.render_ms"] = ((rendered - built) * 1000, "lower")
+    api.close()
+    return results
+
+
+def bench_table_view(server: MockServer, row_counts: list[int]) -> Results:
+    """表格浏览器：建索引、按索引筛选、按列排序，以及只格式化并渲染一屏的耗时。"""
+    api = GlftApiClient(server.base_url)
+    app = GlftTuiApp(api, Console(file=io.StringIO(), width=160))
+    results: Results = {}
+    for count in row_counts:
+        rows = decode_records(Trade, json.dumps([make_trade(trade_id) for trade_id in range(1, count + 1)]))
+        started = time.perf_counter()
+        view = TableView(rows, TRADE_COLUMNS)
+        indexed = time.perf_counter()
+        view.set_filter(view.parse_filter("BTC sell"))
+        filtered = time.perf_counter()
+        view.sort_by("price")
+        sorted_at = time.perf_counter()
+        # 翻一页只格式化并渲染一屏，耗时不应随总行数增长。
+        pages = _timed(lambda: (view.scroll(view.page_rows), app.console.print(app._build_view_table("成交", view))), 5)
+        results[f"table_view.{count}.index_ms"] = ((indexed - started) * 1000, "lower")
+        results[f"table_view.{count}.filter_ms"] = ((filtered - indexed) * 1000, "lower")
+        results[f"table_view.{count}.sort_ms"] = ((sorted_at - filtered) * 1000, "lower")
+        results[f"table_view.{count}.page_render_ms"] = (_percentile(pages, 0.5) * 1000, "lower")
+    api.close()
+    return results
+
+
+def bench_decode(count: int) -> Results:
+    """对比通用 dict 与紧凑记录两种解码方式的耗时与常驻内存。"""
+    import tracemalloc
+
+    payload = json.dumps([make_trade(trade_id) for trade_id in range(1, count + 1)]).encode("utf-8")
+    results: Results = {}
+    for name, decode in (("dict", json.loads), ("records", lambda data: decode_records(Trade, data))):
+        started = time.perf_counter()
+        decode(payload)
+        results[f"decode.{count}.{name}_ms"] = ((time.perf_counter() - started) * 1000, "lower")
+        tracemalloc.start()
+        decoded = decode(payload)
+        results[f"decode.{count}.{name}_mb"] = (tracemalloc.get_traced_memory()[0] / 1024 / 1024, "lower")
+        tracemalloc.stop()
+        del decoded
+    return results
+
+
+def bench_analytics(count: int) -> Results:
+    """成交分析：一次并入 count 笔历史成交的耗时，以及之后增量并入 1000 笔与汇总的耗时。"""
+    try:
+        from glft_analytics import TradeAnalytics
+    except ImportError:  # 未安装 numpy 时跳过。
+        return {}
+
+    trades = [Trade.from_json_object(make_trade(trade_id)) for trade_id in range(count + 1000, 0, -1)]
+    analytics = TradeAnalytics()
+    started = time.perf_counter()
+    analytics.add_trades(trades[1000:])
+    loaded = time.perf_counter()
+    analytics.add_trades(trades[:1000])
+    analytics.summary()
+    finished = time.perf_counter()
+    return {
+        f"analytics.{count}.load_ms": ((loaded - started) * 1000, "lower"),
+        "analytics.incremental_1000.ms": ((finished - loaded) * 1000, "lower"),
+    }
+
+
+def bench_sweep(replay_trades: int) -> Results:
+    """参数扫描：4000 组候选（10×10×5×8）回放 replay_trades 笔成交的耗时。"""
+    try:
+        from glft_quote import sweep
+    except ImportError:  # 未安装 numpy 时跳过。
+        return {}
+
+    prices = [make_trade(trade_id)["price"] for trade_id in range(3, 3 * replay_trades + 3, 3)]
+    ranges = {
+        "gamma": [0.01 * step for step in range(1, 11)],
+        "sigma": [0.5 * step for step in range(1, 11)],
+        "A": [50.0 * step for step in range(1, 6)],
+        "k": [0.25 * step for step in range(1, 9)],
+    }
+    started = time.perf_counter()
+    sweep(prices, ranges, lot_usd=500.0, cap_usd=5000.0)
+    return {f"sweep.4000x{replay_trades}.seconds": (time.perf_counter() - started, "lower")}
+
+
+def bench_monitor(count: int) -> Results:
+    """本地风控监测：每秒可计入的订单 + 成交事件数，以及热路径上的净内存分配（应为常数）。"""
+    import tracemalloc
+
+    monitor = RiskMonitor({"max_order_rate_per_min": 240, "max_cancel_rate_per_min": 120, "max_inventory_usd": 1e4})
+    # 事件时间跨越多个窗口，同时覆盖桶的推进与清空。
+    timestamps = [1_700_000_000 + index * 0.001 for index in range(count)]
+    started = time.perf_counter()
+    for index, timestamp in enumerate(timestamps):
+        if index & 1:
+            monitor.observe_trade("buy" if index & 2 else "sell", 0.01, 60_000.0, timestamp)
+        else:
+            monitor.observe_order(index >> 2, "open" if index & 2 else "cancelled", timestamp)
+    elapsed = time.perf_counter() - started
+    monitor.check()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for timestamp in timestamps[: count // 10]:
+        monitor.observe_trade("sell", 0.01, 60_000.0, timestamp + count)
+    grown = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+    return {
+        f"monitor.{count}.events_per_second": (count / elapsed, "higher"),
+        f"monitor.{count}.hot_loop_alloc_kb": (max(grown, 0) / 1024, "lower"),
+    }
+
+
+def compare(results: Results, baseline_path: Path, tolerance: float) -> list[str]:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = []
+    for name, (value, direction) in results.items():
+        if name not in baseline:
+            continue
+        previous = float(baseline[name]["value"])
+        if previous <= 0:
+            continue
+        change = (value - previous) / previous
+        if (direction == "lower" and change > tolerance) or (direction == "higher" and -change > tolerance):
+            regressions.append(f"{name}: {previous:.3f} -> {value:.3f} ({change:+.1%})")
+    return regressions
+
+
+def over_budget(results: Results) -> list[str]:
+    return [
+        f"{name}: {results[name][0]:.3f} > {limit:.3f}"
+        for name, limit in BUDGETS.items()
+        if name in results and results[name][0] > limit
+    ]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="GLFT 客户端基准测试")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="模拟服务的单请求延迟（毫秒）")
+    parser.add_argument("--trades", type=int, default=200_000, help="模拟服务的成交条数（影响导出规模）")
+    parser.add_argument("--iterations", type=int, default=20, help="每个界面的重复次数")
+    parser.add_argument("--concurrency", type=int, default=8, help="吞吐测试的并发线程数")
+    parser.add_argument("--duration", type=float, default=3.0, help="吞吐测试时长（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="重试测试中模拟服务随机返回 503 的比例")
+    parser.add_argument("--flaky-requests", type=int, default=300, help="重试测试每种策略发出的请求数")
+    parser.add_argument(
+        "--rows",
+        type=lambda text: [int(part) for part in text.split(",")],
+        default=[1_000, 10_000],
+        help="表格渲染测试的行数，逗号分隔",
+    )
+    parser.add_argument("--decode-rows", type=int, default=100_000, help="解码测试的成交条数")
+    parser.add_argument("--analytics-rows", type=int, default=1_000_000, help="成交分析测试的历史成交条数")
+    parser.add_argument("--sweep-trades", type=int, default=5_000, help="参数扫描测试回放的成交笔数")
+    parser.add_argument("--monitor-events", type=int, default=1_000_000, help="本地风控监测测试计入的事件数")
+    parser.add_argument("--json", type=Path, default=None, help="把结果写入 JSON 文件，可作为后续比较的基线")
+    parser.add_argument("--compare", type=Path, default=None, help="与指定的基线 JSON 比较")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的退化比例（默认 0.2）")
+    return parser.parse_args()
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "_export-child":
+        _export_child(sys.argv[2], sys.argv[3])
+        return
+
+    args = parse_args()
+    server = start_mock_server(MockConfig(latency_ms=args.latency_ms, trades=args.trades))
+    results: Results = {}
+    try:
+        results.update(bench_screens(server, args.iterations))
+        results.update(bench_throughput(server, args.concurrency, args.duration))
+        results.update(bench_flaky(args.latency_ms, args.error_rate, args.flaky_requests))
+        results.update(bench_export(server))
+        results.update(bench_cold_start(server, args.iterations))
+        results.update(bench_build_table(server, args.rows))
+        results.update(bench_table_view(server, args.rows))
+        results.update(bench_decode(args.decode_rows))
+        results.update(bench_analytics(args.analytics_rows))
+        results.update(bench_sweep(args.sweep_trades))
+        results.update(bench_monitor(args.monitor_events))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    width = max(len(name) for name in results)
+    for name, (value, _) in results.items():
+        print(f"{name:<{width}}  {value:12.3f}")
+
+    if args.json is not None:
+        payload = {name: {"value": value, "better": direction} for name, (value, direction) in results.items()}
+        args.json.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    failed = False
+    exceeded = over_budget(results)
+    if exceeded:
+        print("\n超出预算：")
+        for line in exceeded:
+            print(f"  {line}")
+        failed = True
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print("\n性能退化：")
+            for line in regressions:
+                print(f"  {line}")
+            failed = True
+        else:
+            print("\n未发现超过阈值的退化。")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
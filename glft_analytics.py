@@ -0,0 +1,322 @@
+"""成交历史的本地向量化分析：累计已实现盈亏、手续费、最大回撤、成交率、分方向 / 分标的统计与滚动夏普。
+
+成交按列存进可增长的 NumPy 数组，新成交到达时只对增量部分做向量化计算并累加到已有结果上，不重算全量。
+成交号与订单号需为数值（与本地存储的同步游标一致）。依赖 numpy（可选依赖，未安装时仅分析界面不可用）。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
+
+import numpy as np
+
+from glft_records import Order, Trade
+
+DEFAULT_SHARPE_WINDOW = 500
+SIDES = ("buy", "sell")
+# 分组统计的列：笔数、成交量、成交额、手续费、已实现盈亏。
+BREAKDOWN_FIELDS = ("count", "volume", "notional", "fee", "realized_pnl")
+_INITIAL_CAPACITY = 1024
+
+
+class _Column:
+    """按倍数扩容的一维数组，追加的均摊开销为 O(1)。"""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype: Any) -> None:
+        self.data = np.empty(_INITIAL_CAPACITY, dtype=dtype)
+        self.size = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.data[:self.size]
+
+    def extend(self, values: np.ndarray) -> None:
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+
+def _float_column(records: Sequence[Any], field: str) -> np.ndarray:
+    return np.fromiter(map(attrgetter(field), records), dtype=np.float64, count=len(records))
+
+
+def _contains(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=np.bool_)
+    index = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[index] == ids
+
+
+def _insert_unique(sorted_ids: np.ndarray, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """把 ids 中尚不存在的值插入有序数组，返回 (新数组, 实际插入的值)；只对增量排序，不重排全量。"""
+    # 排序后相邻比较去重；比 np.unique 的哈希去重快几倍。
+    ids = np.sort(ids)
+    if len(ids) > 1:
+        ids = ids[np.concatenate(([True], ids[1:] != ids[:-1]))]
+    fresh = ids[~_contains(sorted_ids, ids)]
+    if not len(fresh):
+        return sorted_ids, fresh
+    return np.insert(sorted_ids, np.searchsorted(sorted_ids, fresh), fresh), fresh
+
+
+@dataclass(slots=True)
+class _TradeBatch:
+    """一批待并入的成交的列数组，按成交号升序且已去重。"""
+
+    ids: np.ndarray
+    size: np.ndarray
+    notional: np.ndarray
+    fee: np.ndarray
+    realized: np.ndarray
+    codes: np.ndarray
+    # 缺订单号的成交不计入，长度可能比 ids 短。
+    order_ids: np.ndarray
+    last_id: Any
+    first_at: str | None
+    last_at: str | None
+
+
+_BATCH_TRADE_FIELDS = ("ids", "size", "notional", "fee", "realized", "codes")
+
+
+def _concat_batches(batches: list[_TradeBatch]) -> _TradeBatch:
+    """合并多页的列数组。翻页期间有新成交写入时相邻页会有重叠，此时按成交号去重。"""
+    batches = sorted(batches, key=lambda batch: batch.ids[0])
+    columns = {field: np.concatenate([getattr(batch, field) for batch in batches]) for field in _BATCH_TRADE_FIELDS}
+    if not (np.diff(columns["ids"]) > 0).all():
+        _, first_index = np.unique(columns["ids"], return_index=True)
+        columns = {field: values[first_index] for field, values in columns.items()}
+    last = max(batches, key=lambda batch: batch.ids[-1])
+    return _TradeBatch(
+        **columns,
+        order_ids=np.concatenate([batch.order_ids for batch in batches]),
+        last_id=last.last_id,
+        first_at=batches[0].first_at,
+        last_at=last.last_at,
+    )
+
+
+class TradeAnalytics:
+    """成交分析的增量状态。add_trades / add_orders 只处理新数据，summary 等读取接口不做全量扫描。"""
+
+    def __init__(self, sharpe_window: int = DEFAULT_SHARPE_WINDOW) -> None:
+        self.sharpe_window = max(2, sharpe_window)
+        self.trade_cursor: Any = None
+        self.order_cursor: Any = None
+        self.first_trade_at: str | None = None
+        self.last_trade_at: str | None = None
+
+        self._net_pnl = _Column(np.float64)
+        # 累计净盈亏曲线，以及净盈亏与其平方的前缀和（首元素为 0），滚动均值 / 方差由两次相减得到。
+        self._equity = _Column(np.float64)
+        self._prefix = _Column(np.float64)
+        self._prefix_sq = _Column(np.float64)
+        self._prefix.extend(np.zeros(1))
+        self._prefix_sq.extend(np.zeros(1))
+        self._peak = 0.0
+        self._max_drawdown = 0.0
+
+        self._symbols: dict[str, int] = {}
+        # (标的, 方向) -> 分组号，查不到时按当前大小自动编号；一遍取出两个字段即可同时得到分方向与分标的统计。
+        self._groups: defaultdict[tuple[str, str], int] = defaultdict()
+        self._groups.default_factory = self._groups.__len__
+        self._group_side = np.empty(0, dtype=np.intp)
+        self._group_symbol = np.empty(0, dtype=np.intp)
+        self._side_stats = np.zeros((len(SIDES), len(BREAKDOWN_FIELDS)))
+        self._symbol_stats = np.zeros((0, len(BREAKDOWN_FIELDS)))
+
+        # 两个有序去重数组：已知订单号、出现过成交的订单号；matched 为二者交集的大小，随增量维护。
+        self._order_ids = np.empty(0, dtype=np.int64)
+        self._filled_order_ids = np.empty(0, dtype=np.int64)
+        self._matched_orders = 0
+
+    @property
+    def trade_count(self) -> int:
+        return self._net_pnl.size
+
+    def add_trades(self, trades: Sequence[Trade]) -> int:
+        """并入一批成交（顺序不限，可含已处理过的），返回实际新增的笔数。"""
+        batch = self._extract(trades)
+        return 0 if batch is None else self._merge(batch)
+
+    def add_trade_pages(self, pages: Iterable[Sequence[Trade]]) -> int:
+        """逐页并入成交，返回实际新增的笔数。
+
+        分页接口按新到旧返回，逐页 add_trades 会让较旧的页落到游标之前被丢掉、净盈亏曲线也会乱序；
+        这里每页到达即抽成列数组，记录对象随页释放，全部到齐后按成交号顺序一次并入。
+        """
+        batches = [batch for page in pages if (batch := self._extract(page)) is not None]
+        if not batches:
+            return 0
+        return self._merge(batches[0] if len(batches) == 1 else _concat_batches(batches))
+
+    def _extract(self, trades: Sequence[Trade]) -> _TradeBatch | None:
+        """把成交抽成按成交号升序、去重并去掉游标之前部分的列数组；没有新成交时返回 None。"""
+        if not trades:
+            return None
+        ids = _float_column(trades, "trade_id")
+        # 统一按成交号升序，并丢掉游标之前与批内重复的成交。页面通常整批按新到旧（或旧到新）返回，
+        # 此时反转或原样使用即可，只有乱序时才去重排序并按下标重新取记录。
+        step = np.diff(ids)
+        if (step > 0).all():
+            batch: Sequence[Trade] = trades
+        elif (step < 0).all():
+            ids, batch = ids[::-1], trades[::-1]
+        else:
+            ids, first_index = np.unique(ids, return_index=True)
+            batch = [trades[index] for index in first_index]
+        if self.trade_cursor is not None:
+            start = int(np.searchsorted(ids, self.trade_cursor, side="right"))
+            ids, batch = ids[start:], batch[start:]
+        if not len(ids):
+            return None
+
+        price = _float_column(batch, "price")
+        size = _float_column(batch, "size")
+        groups = self._groups
+        known = len(groups)
+        codes = np.fromiter(
+            map(groups.__getitem__, map(attrgetter("symbol", "side"), batch)), dtype=np.intp, count=len(batch)
+        )
+        if len(groups) > known:
+            self._register_groups(list(groups)[known:])
+        try:
+            order_ids = np.fromiter(map(attrgetter("order_id"), batch), dtype=np.int64, count=len(batch))
+        except TypeError:  # 有成交缺订单号。
+            order_ids = np.array([trade.order_id for trade in batch if trade.order_id is not None], dtype=np.int64)
+        return _TradeBatch(
+            ids=ids,
+            size=size,
+            notional=price * size,
+            fee=_float_column(batch, "fee"),
+            realized=_float_column(batch, "realized_pnl"),
+            codes=codes,
+            order_ids=order_ids,
+            last_id=batch[-1].trade_id,
+            first_at=batch[0].created_at,
+            last_at=batch[-1].created_at,
+        )
+
+    def _merge(self, batch: _TradeBatch) -> int:
+        self._extend_equity(batch.realized - batch.fee)
+        weights = (None, batch.size, batch.notional, batch.fee, batch.realized)
+        totals = np.column_stack([np.bincount(batch.codes, values, minlength=len(self._groups)) for values in weights])
+        np.add.at(self._side_stats, self._group_side, totals)
+        np.add.at(self._symbol_stats, self._group_symbol, totals)
+
+        self._filled_order_ids, fresh = _insert_unique(self._filled_order_ids, batch.order_ids)
+        self._matched_orders += int(_contains(self._order_ids, fresh).sum())
+
+        self.trade_cursor = batch.last_id
+        if self.first_trade_at is None:
+            self.first_trade_at = batch.first_at
+        self.last_trade_at = batch.last_at or self.last_trade_at
+        return len(batch.ids)
+
+    def _register_groups(self, fresh: list[tuple[str, str]]) -> None:
+        symbols = self._symbols
+        for symbol, _ in fresh:
+            symbols.setdefault(symbol, len(symbols))
+        self._group_side = np.append(self._group_side, [int(side == "sell") for _, side in fresh])
+        self._group_symbol = np.append(self._group_symbol, [symbols[symbol] for symbol, _ in fresh])
+        if len(symbols) > len(self._symbol_stats):
+            grown = np.zeros((len(symbols), len(BREAKDOWN_FIELDS)))
+            grown[:len(self._symbol_stats)] = self._symbol_stats
+            self._symbol_stats = grown
+
+    def _extend_equity(self, net: np.ndarray) -> None:
+        base = self._equity.values[-1] if self._equity.size else 0.0
+        equity = base + np.cumsum(net)
+        running_peak = np.maximum.accumulate(np.maximum(equity, self._peak))
+        self._max_drawdown = max(self._max_drawdown, float((running_peak - equity).max()))
+        self._peak = float(running_peak[-1])
+
+        self._net_pnl.extend(net)
+        self._equity.extend(equity)
+        self._prefix.extend(self._prefix.values[-1] + np.cumsum(net))
+        self._prefix_sq.extend(self._prefix_sq.values[-1] + np.cumsum(net * net))
+
+    def add_orders(self, orders: Iterable[Order]) -> None:
+        """并入订单（只用订单号计算成交率）；订单状态更新重复到达时按订单号去重。"""
+        orders = list(orders)
+        if not orders:
+            return
+        self._order_ids, fresh = _insert_unique(self._order_ids, _float_column(orders, "order_id").astype(np.int64))
+        self._matched_orders += int(_contains(self._filled_order_ids, fresh).sum())
+        newest = max((order.updated_at for order in orders if order.updated_at is not None), default=None)
+        if newest is not None and (self.order_cursor is None or newest > self.order_cursor):
+            self.order_cursor = newest
+
+    def rolling_sharpe(self, points: int | None = None) -> np.ndarray:
+        """每笔成交净盈亏在最近 sharpe_window 笔上的均值 / 标准差（按笔计，未年化）。
+
+        points 不为空时只返回曲线末尾这么多个点；成交数不足一个窗口时返回空数组。
+        """
+        window = self.sharpe_window
+        count = self.trade_count
+        if count < window:
+            return np.empty(0)
+        start = window if points is None else max(window, count + 1 - points)
+        prefix, prefix_sq = self._prefix.values, self._prefix_sq.values
+        total = prefix[start:] - prefix[start - window:count + 1 - window]
+        total_sq = prefix_sq[start:] - prefix_sq[start - window:count + 1 - window]
+        mean = total / window
+        variance = np.maximum(total_sq / window - mean * mean, 0.0)
+        std = np.sqrt(variance * window / (window - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(std > 0, mean / std, 0.0)
+
+    def equity_curve(self, points: int) -> np.ndarray:
+        """累计净盈亏曲线按等间隔抽样到 points 个点，供终端里画迷你走势。"""
+        equity = self._equity.values
+        if len(equity) <= points:
+            return equity.copy()
+        return equity[np.linspace(0, len(equity) - 1, points).astype(np.intp)]
+
+    def summary(self) -> dict[str, Any]:
+        totals = self._side_stats.sum(axis=0)
+        sharpe = self.rolling_sharpe(points=1)
+        return {
+            "trades": self.trade_count,
+            "first_trade_at": self.first_trade_at,
+            "last_trade_at": self.last_trade_at,
+            "volume": float(totals[1]),
+            "notional": float(totals[2]),
+            "fees": float(totals[3]),
+            "realized_pnl": float(totals[4]),
+            "net_pnl": float(totals[4] - totals[3]),
+            "max_drawdown": self._max_drawdown,
+            "orders": len(self._order_ids),
+            "fill_rate": self._matched_orders / len(self._order_ids) if len(self._order_ids) else None,
+            "rolling_sharpe": float(sharpe[-1]) if len(sharpe) else None,
+            "sharpe_window": self.sharpe_window,
+        }
+
+    def breakdown(self, by: str) -> list[dict[str, Any]]:
+        """按 side 或 symbol 分组的统计，每组一行，跳过没有成交的分组。"""
+        if by == "side":
+            labels, stats = SIDES, self._side_stats
+        elif by == "symbol":
+            labels, stats = tuple(self._symbols), self._symbol_stats
+        else:
+            raise ValueError(f"不支持的分组方式：{by}")
+        rows = []
+        for label, values in zip(labels, stats):
+            if not values[0]:
+                continue
+            row: dict[str, Any] = {by: label}
+            row.update((field, float(value)) for field, value in zip(BREAKDOWN_FIELDS, values))
+            row["count"] = int(values[0])
+            row["net_pnl"] = row["realized_pnl"] - row["fee"]
+            rows.append(row)
+        return rows
@@ -0,0 +1,1592 @@
+"""GLFT 交互式终端界面：菜单、各功能界面与实时仪表盘。仅在交互模式下由 tui.py 导入。"""
+
+from __future__ import annotations
+
+import asyncio
+import getpass
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from functools import wraps
+from itertools import chain, islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from rich import box
+from rich.console import Console, Group, RenderableType
+from rich.live import Live
+from rich.markup import escape
+from rich.panel import Panel
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
+from rich.prompt import Confirm, Prompt
+from rich.table import Table
+
+from glft_client import (
+    DEFAULT_PAGE_SIZE,
+    PNL_COMPRESSION_SUFFIXES,
+    ApiError,
+    AsyncGlftApiClient,
+    GlftApiClient,
+    TokenCache,
+    UsageError,
+    load_credentials,
+    partial_download_paths,
+    pnl_export_compression,
+)
+from glft_events import (
+    STATE_CONNECTED,
+    STATE_RECONNECTING,
+    STATE_UNAUTHORIZED,
+    STATE_UNSUPPORTED,
+    EventStream,
+    StreamEvent,
+)
+from glft_fleet import EngineSnapshot, Fleet
+from glft_monitor import LimitStatus, RiskMonitor, RiskWarning
+from glft_records import Alert, Order, Record, Trade
+from glft_store import RECORD_TYPES, LocalStore
+from glft_table import TableView
+
+if TYPE_CHECKING:
+    from glft_analytics import TradeAnalytics
+    from glft_session import ReplayTransport, SessionRecorder
+
+DASHBOARD_FIELDS: list[tuple[str, str, str]] = [
+    ("mid_price", "中间价", ".4f"),
+    ("inventory_btc", "库存(BTC)", ".6f"),
+    ("inventory_usd", "库存(USD)", ".2f"),
+    ("unrealized_pnl", "未实现盈亏", ".2f"),
+    ("open_orders", "挂单数量", ""),
+    ("spread", "盘口价差", ".4f"),
+    ("cancel_rate_per_min", "撤单率/分钟", ".2f"),
+    ("order_rate_per_min", "下单率/分钟", ".2f"),
+]
+
+# 订单 / 成交 / 告警载入表格浏览器的最大行数；浏览器只格式化可见窗口，行数多也不影响翻页速度。
+BROWSE_MAX_ROWS = 20_000
+BROWSE_HELP = (
+    "回车/n 下一页 · p 上一页 · g/G 首页/末页 · +N/-N 滚动 N 行 · s <列> 排序（再次排序切换升降序）"
+    " · f <条件> 筛选（如 f BTC sell open 或 f side=buy） · c 清除筛选 · q/0 返回"
+)
+ORDER_COLUMNS = [
+    ("order_id", "订单号"),
+    ("symbol", "标的"),
+    ("side", "方向"),
+    ("price", "价格"),
+    ("size", "数量"),
+    ("status", "状态"),
+]
+TRADE_COLUMNS = [
+    ("trade_id", "成交号"),
+    ("symbol", "标的"),
+    ("side", "方向"),
+    ("price", "价格"),
+    ("size", "数量"),
+    ("fee", "手续费"),
+    ("realized_pnl", "已实现盈亏"),
+]
+POSITION_COLUMNS = [
+    ("symbol", "标的"),
+    ("size", "仓位"),
+    ("entry_price", "成本价"),
+    ("mark_price", "标记价"),
+    ("unrealized_pnl", "未实现盈亏"),
+]
+ALERT_COLUMNS = [
+    ("id", "ID"),
+    ("level", "级别"),
+    ("message", "内容"),
+    ("is_read", "已读"),
+]
+
+MIN_LIVE_INTERVAL_SECONDS = 0.1
+DEFAULT_LIVE_INTERVAL_SECONDS = 1.0
+
+# fleet 总览表中每台引擎展示的指标；SUMMED 中的字段在表尾汇总。
+FLEET_FIELDS: list[tuple[str, str, str]] = [
+    ("mid_price", "中间价", ".4f"),
+    ("inventory_usd", "库存(USD)", ".2f"),
+    ("unrealized_pnl", "未实现盈亏", ".2f"),
+    ("open_orders", "挂单", ""),
+    ("order_rate_per_min", "下单率/分钟", ".2f"),
+    ("cancel_rate_per_min", "撤单率/分钟", ".2f"),
+]
+FLEET_SUMMED_FIELDS = frozenset({"inventory_usd", "unrealized_pnl", "open_orders"})
+
+# 参数扫描默认回放的成交笔数与展示的候选数。
+SWEEP_REPLAY_TRADES = 5000
+SWEEP_TOP_RESULTS = 10
+# 没有本地存储时逐页向接口找该标的的成交，最多翻这么多页，标的成交稀少时不会把整个历史都拉一遍。
+SWEEP_MAX_PAGES = 40
+
+# 成交分析一次拉取的页大小：历史成交可能有数百万条，页越大往返越少。
+ANALYTICS_PAGE_SIZE = 5000
+ANALYTICS_SPARKLINE_POINTS = 48
+ANALYTICS_SUMMARY_FIELDS: list[tuple[str, str, str]] = [
+    ("trades", "成交笔数", ","),
+    ("volume", "成交量", ",.4f"),
+    ("notional", "成交额", ",.2f"),
+    ("fees", "手续费合计", ",.4f"),
+    ("realized_pnl", "已实现盈亏", ",.2f"),
+    ("net_pnl", "净盈亏（扣手续费）", ",.2f"),
+    ("max_drawdown", "最大回撤", ",.2f"),
+    ("orders", "订单数", ","),
+    ("fill_rate", "成交率（有成交的订单占比）", ".2%"),
+    ("rolling_sharpe", "滚动夏普（按笔，未年化）", ".4f"),
+]
+ANALYTICS_BREAKDOWN_FORMATS = {
+    "count": ",",
+    "volume": ",.4f",
+    "notional": ",.2f",
+    "fee": ",.4f",
+    "realized_pnl": ",.2f",
+    "net_pnl": ",.2f",
+}
+_SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+# 主菜单显示期间在后台预取的接口（客户端方法名），以及预取结果可直接使用的最长时间。
+PREFETCH_CALLS = ("get_dashboard_metrics", "get_risk_status", "get_risk_limits", "get_position_records")
+PREFETCH_MAX_AGE_SECONDS = 5.0
+_NOT_PREFETCHED = object()
+
+# 实时仪表盘中本地风控监测拉取增量订单 / 成交的最小间隔，以及积压时一次最多追的页数。
+MONITOR_POLL_SECONDS = 1.0
+MONITOR_MAX_PAGES = 10
+MONITOR_LEVEL_STYLES = {"ok": "green", "warning": "yellow", "critical": "bold red"}
+MONITOR_LEVEL_LABELS = {"ok": "正常", "warning": "预警", "critical": "临界"}
+TRANSPORT_EVENT_LABELS = {
+    "retry": "GET 重试",
+    "hedge": "对冲请求",
+    "hedge_win": "对冲胜出",
+    "breaker_open": "熔断",
+    "short_circuit": "熔断拦截",
+}
+
+# 推送到达的最近告警保留条数，以及各告警级别的显示样式。
+ALERT_FEED_SIZE = 20
+# 回放定位界面列出当前时刻之前的请求条数。
+REPLAY_CONTEXT_ROWS = 15
+ALERT_LEVEL_STYLES = {"info": "cyan", "warning": "yellow", "critical": "bold red"}
+
+
+def _screen(name: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    """标记一个界面方法：进入时清零渲染计时，退出时把累计的构建 + 输出耗时记到该界面名下。"""
+
+    def decorate(method: Callable[..., None]) -> Callable[..., None]:
+        @wraps(method)
+        def wrapper(self: GlftTuiApp, *args: Any, **kwargs: Any) -> None:
+            self._render_seconds = 0.0
+            try:
+                method(self, *args, **kwargs)
+            finally:
+                self.metrics.observe_render(name, self._render_seconds)
+
+        return wrapper
+
+    return decorate
+
+
+class GlftTuiApp:
+    def __init__(
+        self,
+        api: GlftApiClient,
+        console: Console,
+        async_api: AsyncGlftApiClient | None = None,
+        live_interval: float | None = None,
+        store: LocalStore | None = None,
+        replay: ReplayTransport | None = None,
+        token_cache: TokenCache | None = None,
+        recorder: SessionRecorder | None = None,
+    ) -> None:
+        self.api = api
+        self.console = console
+        self.async_api = async_api
+        self.live_interval = live_interval
+        self.store = store
+        # 回放模式：请求由录制文件应答，不连接后端、不订阅推送。
+        self.replay = replay
+        # 录制时另存从本地存储展示的行，请求里只有增量，回放单靠请求还原不出当时的界面。
+        self.recorder = recorder
+        self.metrics = api.metrics
+        self._render_seconds = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # 跨次进入成交分析界面保留，之后只按游标拉取并累加新成交。
+        self.analytics: TradeAnalytics | None = None
+        # 事件流推送来的告警；事件回调在订阅线程中执行，这里只做追加 / 增删，不跨线程做复合操作。
+        self.events: EventStream | None = None
+        self.alert_feed: deque[Alert] = deque(maxlen=ALERT_FEED_SIZE)
+        self.unread_alert_ids: set[int] = set()
+        # 订阅线程产生的提示（Rich 标记）；直接打印会插进正在输入的 Prompt，菜单界面留到下次重绘时输出。
+        # 实时仪表盘等在 _notice_ready 上，有推送就立即醒来输出并刷新底部告警栏，不等下一个刷新周期。
+        self._notices: deque[str] = deque()
+        self._notice_ready = threading.Event()
+        self.token_cache = token_cache
+        # 本次会话输入过的账号密码，只保存在内存中，用于 token 失效（401）后静默重新登录。
+        self._credentials: tuple[str, str] | None = None
+        # 方法名 -> (发起时的缓存代数, 发起时刻, 结果)；期间发生过写操作（缓存代数变化）的预取结果作废。
+        self._prefetched: dict[str, tuple[int, float, Future[Any]]] = {}
+        self._prefetch_pool: ThreadPoolExecutor | None = None
+        # 本地滑动窗口风控监测，首次进入实时仪表盘时创建；游标为已计入的最新订单 / 成交时间。
+        self.monitor: RiskMonitor | None = None
+        self._monitor_cursors: dict[str, str | None] = {"orders": None, "trades": None}
+        self._monitor_polled_at = -MONITOR_POLL_SECONDS
+
+    def close(self) -> None:
+        if self.events is not None:
+            self.events.stop()
+            self.events = None
+        if self._prefetch_pool is not None:
+            self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
+            self._prefetch_pool = None
+        if self._loop is None:
+            return
+        if self.async_api is not None:
+            self._loop.run_until_complete(self.async_api.aclose())
+        self._loop.close()
+        self._loop = None
+
+    def _fetch_concurrently(self, *calls: str | tuple[str, dict[str, Any]]) -> list[Any]:
+        """并发调用多个互不依赖的 GET，失败的接口以 ApiError 占位返回，不影响其余结果。
+
+        每项可以是方法名，也可以是 (方法名, 关键字参数)。
+        """
+        normalized = [(call, {}) if isinstance(call, str) else call for call in calls]
+        results = [_NOT_PREFETCHED if kwargs else self._take_prefetched(name) for name, kwargs in normalized]
+        pending = [index for index, result in enumerate(results) if result is _NOT_PREFETCHED]
+        for index, result in zip(pending, self._fetch_all([normalized[index] for index in pending])):
+            results[index] = result
+        # 登录失效时在事件循环之外提示重新登录，再补拉这些接口。
+        expired = [index for index, result in enumerate(results) if _is_unauthorized(result)]
+        if expired and self._relogin(results[expired[0]]):
+            for index, result in zip(expired, self._fetch_all([normalized[index] for index in expired])):
+                results[index] = result
+        return results
+
+    def _fetch_all(self, normalized: list[tuple[str, dict[str, Any]]]) -> list[Any]:
+        if not normalized:
+            return []
+        if self.async_api is None:
+            results: list[Any] = []
+            for name, kwargs in normalized:
+                try:
+                    results.append(getattr(self.api, name)(**kwargs))
+                except ApiError as exc:
+                    results.append(exc)
+            return results
+
+        # 同一个事件循环跨屏复用，AsyncClient 的连接池才能保持长连接。
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        self.async_api.token = self.api.token
+        self.async_api.credentials = self._credentials
+
+        async def gather() -> list[Any]:
+            coros = [getattr(self.async_api, name)(**kwargs) for name, kwargs in normalized]
+            return await asyncio.gather(*coros, return_exceptions=True)
+
+        results = self._loop.run_until_complete(gather())
+        # 异步客户端在事件循环里静默重新登录过：把新 token 交回同步客户端并保存。
+        if self.async_api.token != self.api.token and self._credentials is not None:
+            self.api.token = self.async_api.token
+            self.api.token_expires_at = self.async_api.token_expires_at
+            self._save_token(self._credentials[0])
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, ApiError):
+                raise result
+        return results
+
+    def _start_prefetch(self) -> None:
+        """在后台线程里预取首屏常用的接口，用户停留在菜单上的时间用来填补进入界面时的冷启动往返。"""
+        if self.replay is not None or not self.api.token or not PREFETCH_CALLS:
+            return
+        if self._prefetch_pool is None:
+            self._prefetch_pool = ThreadPoolExecutor(len(PREFETCH_CALLS), thread_name_prefix="glft-prefetch")
+        generation = self.api.cache.generation
+        now = time.monotonic()
+        for name in PREFETCH_CALLS:
+            entry = self._prefetched.get(name)
+            if entry is not None and entry[0] == generation:
+                _, started, future = entry
+                # 仍在进行中、或已成功且未过期的预取直接复用，菜单重绘不重复发请求。
+                if not future.done() or (now - started <= PREFETCH_MAX_AGE_SECONDS and future.exception() is None):
+                    continue
+            self._prefetched[name] = (generation, time.monotonic(), self._prefetch_pool.submit(getattr(self.api, name)))
+
+    def _take_prefetched(self, name: str) -> Any:
+        """取出预取结果（仍在进行中则等它完成）；没有预取、已过期、期间有过写操作或预取失败时返回 _NOT_PREFETCHED。"""
+        entry = self._prefetched.pop(name, None)
+        if entry is None:
+            return _NOT_PREFETCHED
+        generation, started, future = entry
+        if generation != self.api.cache.generation or time.monotonic() - started > PREFETCH_MAX_AGE_SECONDS:
+            future.cancel()
+            return _NOT_PREFETCHED
+        try:
+            return future.result()
+        except ApiError:
+            # 失败交给界面自己的请求重试并报告，预取不向用户展示错误。
+            return _NOT_PREFETCHED
+
+    def _call(self, name: str) -> Any:
+        result = self._take_prefetched(name)
+        return getattr(self.api, name)() if result is _NOT_PREFETCHED else result
+
+    def _report_failure(self, label: str, result: Any) -> bool:
+        if isinstance(result, ApiError):
+            self.console.print(f"[red]{label}加载失败：{result}[/red]")
+            return True
+        return False
+
+    def run(self) -> None:
+        self.console.print(
+            Panel.fit(
+                "[bold cyan]GLFT 终端控制台（TUI）[/bold cyan]\n通过键盘菜单完成原 GUI 的全部核心操作。",
+                border_style="cyan",
+            )
+        )
+        if self.replay is None:
+            self.api.reauthenticate = self._reauthenticate
+            if not self._restore_session():
+                self._login_loop()
+            self._start_event_stream()
+        else:
+            reader = self.replay.reader
+            self.api.login("replay", "replay")
+            self.console.print(
+                f"[magenta]回放模式：{reader.path}，共 {len(reader)} 个请求"
+                f"（{_format_timestamp(reader.start)} – {_format_timestamp(reader.end)}），只读。[/magenta]"
+            )
+
+        while True:
+            self._start_prefetch()
+            self.console.print()
+            self._flush_notices(self.console)
+            if self.replay is None:
+                self.console.print("[bold]主菜单[/bold]")
+            else:
+                self.console.print(f"[bold]主菜单[/bold] [magenta]回放时刻 {_format_timestamp(self.replay.at)}[/magenta]")
+            self.console.print("1) 仪表盘")
+            self.console.print("2) 订单 / 成交 / 持仓")
+            self.console.print("3) 策略参数")
+            self.console.print("4) 风控执行")
+            self.console.print("5) API Key 管理")
+            self.console.print("6) 系统配置")
+            self.console.print("7) 告警中心")
+            self.console.print("8) 导出 PnL CSV")
+            self.console.print("9) 重新登录")
+            self.console.print("10) 诊断")
+            self.console.print("11) 成交分析")
+            choices = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11"]
+            if self.replay is not None:
+                self.console.print("12) 回放定位")
+                choices.append("12")
+            self.console.print("0) 退出")
+
+            choice = Prompt.ask("请选择操作", choices=choices, default="1")
+            if choice == "0":
+                self.console.print("[green]已退出 GLFT TUI。[/green]")
+                break
+            try:
+                self._dispatch(choice)
+            except ApiError as exc:
+                # 登录失效：重新登录后自动重做刚才的操作（失败的请求没有生效）。
+                if not self._relogin(exc):
+                    self.console.print(f"[red]请求失败：{exc}[/red]")
+                    continue
+                try:
+                    self._dispatch(choice)
+                except ApiError as retry_exc:
+                    self.console.print(f"[red]请求失败：{retry_exc}[/red]")
+
+    def _dispatch(self, choice: str) -> None:
+        if choice == "1":
+            self.show_dashboard()
+        elif choice == "2":
+            self.show_market_data()
+        elif choice == "3":
+            self.manage_strategy()
+        elif choice == "4":
+            self.manage_risk()
+        elif choice == "5":
+            self.manage_api_keys()
+        elif choice == "6":
+            self.manage_system_config()
+        elif choice == "7":
+            self.manage_alerts()
+        elif choice == "8":
+            self.export_pnl_csv()
+        elif choice == "9":
+            self.api.clear_token()
+            self._credentials = None
+            if self.token_cache is not None:
+                self.token_cache.clear()
+            self._login_loop()
+        elif choice == "10":
+            self.show_diagnostics()
+        elif choice == "11":
+            self.show_analytics()
+        elif choice == "12":
+            self.seek_replay()
+
+    def _login_loop(self) -> None:
+        while True:
+            self.console.print()
+            self.console.print("[bold]请登录[/bold]")
+            username = Prompt.ask("账号", default="admin").strip()
+            password = getpass.getpass("密码: ")
+            if not username or not password:
+                self.console.print("[yellow]账号和密码不能为空。[/yellow]")
+                continue
+            try:
+                self.api.login(username, password)
+                profile = self.api.get_me()
+                self.console.print(
+                    f"[green]登录成功：{profile['username']}（{'启用' if profile['is_active'] else '禁用'}）[/green]"
+                )
+            except ApiError as exc:
+                self.console.print(f"[red]登录失败：{exc}[/red]")
+                continue
+            self._credentials = (username, password)
+            self._save_token(profile["username"])
+            return
+
+    def _restore_session(self) -> bool:
+        """沿用缓存中未过期的 token，不输入密码、不发请求；token 实际已失效时由 401 触发重新登录。"""
+        cached = self.token_cache.load() if self.token_cache is not None else None
+        if cached is None:
+            return False
+        self.api.token = cached["access_token"]
+        self.api.token_expires_at = cached["expires_at"]
+        owner = f" {cached['username']} " if cached["username"] else ""
+        self.console.print(
+            f"[green]已恢复{owner}的登录会话（有效期至 {datetime.fromtimestamp(cached['expires_at']):%Y-%m-%d %H:%M}）。[/green]"
+        )
+        return True
+
+    def _save_token(self, username: str | None) -> None:
+        if self.token_cache is None or not self.api.token:
+            return
+        try:
+            self.token_cache.save(self.api.token, self.api.token_expires_at, username)
+        except OSError as exc:
+            self.console.print(f"[yellow]登录 token 未能保存到 {self.token_cache.path}：{exc}[/yellow]")
+
+    def _reauthenticate(self) -> str | None:
+        """客户端遇到 401 时调用：用本次会话的账号密码静默登录，没有可用密码时返回 None。
+
+        这里持有客户端的重新鉴权锁，可能运行在预取线程里，所以不做交互；
+        需要输入密码时 401 照常抛出，由主线程的 _relogin 提示重新登录。
+        """
+        if self._credentials is None:
+            return None
+        try:
+            self.api.login(*self._credentials)
+        except ApiError:
+            self._credentials = None
+            return None
+        self._save_token(self._credentials[0])
+        return self.api.token
+
+    def _relogin(self, exc: ApiError) -> bool:
+        """主线程在请求因登录失效（401）失败后调用：提示重新登录，返回 True 表示调用方可以重试。"""
+        if exc.status_code != 401 or self.replay is not None:
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        if self.token_cache is not None:
+            self.token_cache.clear()
+        self.console.print("[yellow]登录已失效，请重新登录；完成后自动继续刚才的操作。[/yellow]")
+        self._login_loop()
+        return True
+
+    def _start_event_stream(self) -> None:
+        """订阅告警与状态推送。token 每次重连时现取，重新登录后无需重建订阅。"""
+        if self.events is not None:
+            return
+        self.events = EventStream(
+            self.api.base_url,
+            lambda: self.api.token,
+            self._on_stream_event,
+            self._on_stream_state,
+            renew_token=self.api.renew_token,
+        )
+        self.events.start()
+
+    def _flush_notices(self, console: Console) -> None:
+        while self._notices:
+            console.print(self._notices.popleft())
+
+    def _on_stream_event(self, event: StreamEvent) -> None:
+        data = event.data
+        if event.event == "alert" and isinstance(data, dict):
+            alert = Alert.from_json_object(data)
+            if not isinstance(alert, Alert):
+                return
+            self.alert_feed.append(alert)
+            if not alert.is_read:
+                self.unread_alert_ids.add(int(alert.id))
+            style = ALERT_LEVEL_STYLES.get(alert.level, "white")
+            text = escape(f"▶ 新告警 #{alert.id} [{alert.level}] {alert.message}")
+            self._notices.append(f"[{style}]{text}[/{style}]")
+        elif event.event == "alerts_read" and isinstance(data, dict):
+            self.unread_alert_ids.difference_update(int(alert_id) for alert_id in data.get("ids", ()))
+        elif event.event == "status" and isinstance(data, dict):
+            self.api.cache.invalidate(("/risk/status", "/dashboard/metrics"))
+            if "engine_running" in data:
+                state = "运行中" if data["engine_running"] else "已停止"
+                self._notices.append(f"[magenta]▶ 引擎状态变化：{state}[/magenta]")
+        self._notice_ready.set()
+
+    def _on_stream_state(self, state: str) -> None:
+        if state == STATE_RECONNECTING:
+            self._notices.append("[dim]告警推送连接已断开，正在重连……[/dim]")
+        elif state == STATE_CONNECTED and self.events is not None and self.events.reconnects:
+            self._notices.append("[dim]告警推送已恢复。[/dim]")
+        elif state == STATE_UNAUTHORIZED:
+            self._notices.append("[yellow]告警推送登录已失效，重新登录后自动恢复。[/yellow]")
+        elif state == STATE_UNSUPPORTED:
+            self._notices.append("[yellow]服务端不支持事件推送，新告警需在告警中心查看。[/yellow]")
+        self._notice_ready.set()
+
+    def _alert_footer(self) -> str | None:
+        if not self.alert_feed:
+            return None
+        latest = self.alert_feed[-1]
+        style = ALERT_LEVEL_STYLES.get(latest.level, "white")
+        return (
+            f"未读新告警 {len(self.unread_alert_ids)} 条 · "
+            f"最新 [{style}]{escape(f'#{latest.id} [{latest.level}] {latest.message}')}[/{style}]"
+        )
+
+    @_screen("仪表盘")
+    def show_dashboard(self) -> None:
+        metrics = self._call("get_dashboard_metrics")
+        table = Table(title="仪表盘指标", box=box.SIMPLE_HEAVY)
+        table.add_column("指标", style="cyan")
+        table.add_column("当前值", style="white")
+        for field, label, spec in DASHBOARD_FIELDS:
+            table.add_row(label, format(metrics[field], spec))
+        self._show(table)
+        if Confirm.ask("进入实时刷新模式？（Ctrl+C 退出）", default=False):
+            self.watch_dashboard()
+            return
+        self._pause()
+
+    def watch_dashboard(self) -> None:
+        interval = self._resolve_live_interval()
+        # 每个指标缓存 (原始值, 显示文本, 变化文本)，只有值变化的单元格才重新格式化。
+        cells: dict[str, tuple[Any, str, str]] = {}
+        updated_at = "-"
+        error: str | None = None
+        footer = self._alert_footer()
+        monitor = self._ensure_monitor()
+        monitor_rows: list[LimitStatus] = []
+
+        live = Live(
+            self._build_live_dashboard(cells, interval, updated_at, error, footer, monitor_rows),
+            console=self.console,
+            auto_refresh=False,
+        )
+        try:
+            with live:
+                next_poll = 0.0
+                while True:
+                    changed = polled = False
+                    if time.monotonic() >= next_poll:
+                        next_poll = time.monotonic() + interval
+                        polled = True
+                        try:
+                            metrics, changed = self.api.poll_dashboard_metrics()
+                            if error is not None:
+                                error, changed = None, True
+                            if changed and isinstance(metrics.get("inventory_usd"), (int, float)):
+                                monitor.set_inventory(metrics["inventory_usd"], time.time())
+                        except ApiError as exc:
+                            if exc.status_code == 401:
+                                raise
+                            error, changed = str(exc), True
+                        for warning in self._feed_monitor():
+                            style = MONITOR_LEVEL_STYLES[warning.level]
+                            live.console.print(f"[{style}]▶ 本地风控预警：{escape(warning.message)}[/{style}]")
+                        if (latest_rows := monitor.status()) != monitor_rows:
+                            monitor_rows, changed = latest_rows, True
+                    # 先清标志再取推送：取的过程中新到的推送会重新置位，不会漏。
+                    self._notice_ready.clear()
+                    if (latest_footer := self._alert_footer()) != footer:
+                        footer, changed = latest_footer, True
+                    self._flush_notices(live.console)
+
+                    if changed:
+                        render_started = time.perf_counter()
+                        if polled and error is None:
+                            self._update_dashboard_cells(cells, metrics)
+                            updated_at = f"{datetime.now():%H:%M:%S}"
+                        live.update(
+                            self._build_live_dashboard(cells, interval, updated_at, error, footer, monitor_rows),
+                            refresh=True,
+                        )
+                        self.metrics.observe_render("仪表盘（实时）", time.perf_counter() - render_started)
+                    # 推送到达时提前醒来，只刷新告警相关部分；指标仍按 interval 轮询。
+                    self._notice_ready.wait(max(0.0, next_poll - time.monotonic()))
+        except KeyboardInterrupt:
+            self.console.print("[green]已退出实时刷新模式。[/green]")
+
+    def _ensure_monitor(self) -> RiskMonitor:
+        if self.monitor is None:
+            self.monitor = RiskMonitor()
+        # 阈值可能在别的界面被改过；接口有 30 秒缓存，重复进入不会多打请求。
+        try:
+            self.monitor.set_limits(self.api.get_risk_limits())
+        except ApiError as exc:
+            self.console.print(f"[yellow]风控阈值加载失败，本地监测只统计速率：{exc}[/yellow]")
+        return self.monitor
+
+    def _feed_monitor(self) -> list[RiskWarning]:
+        """按游标拉取新订单 / 成交计入本地监测，返回新出现的预警。
+
+        首次只取最新一页填充窗口，不回溯历史。分页按新到旧返回，积压超过一页时最多追 MONITOR_MAX_PAGES 页，
+        更早的部分直接跳过——积压到这个程度时它们大多已滑出监测窗口。
+        """
+        monitor = self.monitor
+        if time.monotonic() - self._monitor_polled_at >= MONITOR_POLL_SECONDS:
+            self._monitor_polled_at = time.monotonic()
+            cursors = self._monitor_cursors
+            first_pages = self._fetch_concurrently(
+                ("get_order_records", {"since": cursors["orders"], "limit": DEFAULT_PAGE_SIZE}),
+                ("get_trade_records", {"since": cursors["trades"], "limit": DEFAULT_PAGE_SIZE}),
+            )
+            for table, first_page, fetch, observe, field in (
+                ("orders", first_pages[0], self.api.get_order_records, monitor.observe_orders, "updated_at"),
+                ("trades", first_pages[1], self.api.get_trade_records, monitor.observe_trades, "created_at"),
+            ):
+                if isinstance(first_page, ApiError):
+                    continue
+                since = cursors[table]
+                pages: Any = [first_page]
+                if since is not None and len(first_page) == DEFAULT_PAGE_SIZE:
+                    more = self.api.iter_pages(fetch, DEFAULT_PAGE_SIZE, since, offset=len(first_page))
+                    pages = chain(pages, islice(more, MONITOR_MAX_PAGES - 1))
+                try:
+                    for page in pages:
+                        observe(page)
+                        newest = max((value for row in page if (value := getattr(row, field))), default=None)
+                        if newest is not None and (cursors[table] is None or newest > cursors[table]):
+                            cursors[table] = newest
+                except ApiError:
+                    continue
+        monitor.advance(time.time())
+        return monitor.check()
+
+    def _resolve_live_interval(self) -> float:
+        if self.live_interval is not None:
+            return max(self.live_interval, MIN_LIVE_INTERVAL_SECONDS)
+        try:
+            interval = float(self.api.get_config()["quote_interval_ms"]) / 1000
+        except (ApiError, KeyError, TypeError, ValueError):
+            interval = DEFAULT_LIVE_INTERVAL_SECONDS
+        return max(interval, MIN_LIVE_INTERVAL_SECONDS)
+
+    @staticmethod
+    def _update_dashboard_cells(cells: dict[str, tuple[Any, str, str]], metrics: dict[str, Any]) -> None:
+        for field, _, spec in DASHBOARD_FIELDS:
+            value = metrics.get(field)
+            previous = cells.get(field)
+            if previous is not None and previous[0] == value:
+                continue
+            if value is None:
+                cells[field] = (value, "-", "")
+                continue
+            delta = ""
+            if previous is not None and isinstance(value, (int, float)) and isinstance(previous[0], (int, float)):
+                diff = value - previous[0]
+                style = "green" if diff > 0 else "red"
+                delta = f"[{style}]{format(diff, '+' + spec)}[/{style}]"
+            cells[field] = (value, format(value, spec), delta)
+
+    @staticmethod
+    def _build_live_dashboard(
+        cells: dict[str, tuple[Any, str, str]],
+        interval: float,
+        updated_at: str,
+        error: str | None,
+        footer: str | None = None,
+        monitor_rows: list[LimitStatus] | None = None,
+    ) -> RenderableType:
+        caption = f"刷新间隔 {interval:.2f}s · 更新于 {updated_at} · Ctrl+C 退出"
+        if error is not None:
+            caption += f"\n[red]拉取失败：{error}[/red]"
+        if footer is not None:
+            caption += f"\n{footer}"
+        table = Table(title="仪表盘指标（实时）", caption=caption, box=box.SIMPLE_HEAVY)
+        table.add_column("指标", style="cyan")
+        table.add_column("当前值", style="white", justify="right")
+        table.add_column("最近变化", justify="right")
+        for field, label, _ in DASHBOARD_FIELDS:
+            _, text, delta = cells.get(field, (None, "-", ""))
+            table.add_row(label, text, delta)
+        if not monitor_rows:
+            return table
+
+        monitor_table = Table(title="本地风控监测（最近 60 秒）", box=box.SIMPLE_HEAVY)
+        for label in ("指标", "每秒", "每分钟", "当前", "阈值", "余量", "状态"):
+            monitor_table.add_column(label, justify="left" if label == "指标" else "right")
+        for row in monitor_rows:
+            style = MONITOR_LEVEL_STYLES[row.level]
+            monitor_table.add_row(
+                row.label,
+                f"{row.per_second:,.0f}",
+                f"{row.per_minute:,.0f}",
+                f"{row.value:,.0f}",
+                "-" if row.limit is None else f"{row.limit:,.0f}",
+                "-" if row.headroom is None else f"{row.headroom:,.0f}",
+                f"[{style}]{MONITOR_LEVEL_LABELS[row.level]}[/{style}]",
+            )
+        return Group(table, monitor_table)
+
+    @_screen("订单 / 成交 / 持仓")
+    def show_market_data(self) -> None:
+        views = (
+            None if self.replay is None else [self.replay.store_view(table) for table in ("orders", "trades")]
+        )
+        if views is not None and None not in views:
+            # 录制时启用了本地存储：订单 / 成交用录下的展示行，持仓照常按请求回放。
+            orders, trades = (
+                [RECORD_TYPES[table].from_json_object(row) for row in rows]
+                for table, rows in zip(("orders", "trades"), views)
+            )
+            (positions,) = self._fetch_concurrently("get_position_records")
+        elif self.store is None:
+            orders, trades, positions = self._fetch_concurrently(
+                ("get_order_records", {"limit": DEFAULT_PAGE_SIZE}),
+                ("get_trade_records", {"limit": DEFAULT_PAGE_SIZE}),
+                "get_position_records",
+            )
+        else:
+            sync_params = {table: self.store.sync_params(table) for table in ("orders", "trades")}
+            orders, trades, positions = self._fetch_concurrently(
+                ("get_order_records", {**sync_params["orders"], "limit": DEFAULT_PAGE_SIZE}),
+                ("get_trade_records", {**sync_params["trades"], "limit": DEFAULT_PAGE_SIZE}),
+                "get_position_records",
+            )
+            # 同步失败时仍展示本地已有的数据，只提示一次。
+            for table, label, fetched, fetch in (
+                ("orders", "订单", orders, self.api.get_order_records),
+                ("trades", "成交", trades, self.api.get_trade_records),
+            ):
+                if not self._report_failure(label, fetched):
+                    self._sync_store_table(table, label, fetch, sync_params[table].get("since"), fetched)
+            orders = self.store.recent("orders", BROWSE_MAX_ROWS)
+            trades = self.store.recent("trades", BROWSE_MAX_ROWS)
+            if self.recorder is not None:
+                for table, rows in (("orders", orders), ("trades", trades)):
+                    self.recorder.record_store_view(
+                        table, [row.to_dict() if isinstance(row, Record) else row for row in rows]
+                    )
+
+        sections = [
+            (label, rows, columns)
+            for label, rows, columns in (
+                ("订单", orders, ORDER_COLUMNS),
+                ("成交", trades, TRADE_COLUMNS),
+                ("持仓", positions, POSITION_COLUMNS),
+            )
+            if not self._report_failure(label, rows)
+        ]
+        if not sections:
+            self._pause()
+            return
+        while True:
+            self.console.print()
+            for number, (label, rows, _) in enumerate(sections, start=1):
+                self.console.print(f"{number}) {label}（{len(rows)} 条）")
+            self.console.print("0) 返回")
+            choice = Prompt.ask("请选择要浏览的表", choices=[str(n) for n in range(len(sections) + 1)], default="1")
+            if choice == "0":
+                return
+            label, rows, columns = sections[int(choice) - 1]
+            self._browse(label, rows, columns)
+
+    def _sync_store_table(
+        self,
+        table: str,
+        label: str,
+        fetch: Callable[..., list[Order] | list[Trade]],
+        since: Any,
+        first_page: list[Order] | list[Trade],
+    ) -> None:
+        newest = self.store.merge(table, first_page, since)
+        if len(first_page) == DEFAULT_PAGE_SIZE:
+            # 首页已满，说明积压较多，继续逐页追平；中途失败则不推进游标，下次重新补齐。
+            try:
+                for page in self.api.iter_pages(fetch, DEFAULT_PAGE_SIZE, since, offset=len(first_page)):
+                    page_newest = self.store.merge(table, page, since)
+                    if newest is None or (page_newest is not None and page_newest > newest):
+                        newest = page_newest
+            except ApiError as exc:
+                if exc.status_code == 401:
+                    raise
+                self._report_failure(label, exc)
+                return
+        self.store.advance(table, newest)
+
+    @_screen("策略参数")
+    def manage_strategy(self) -> None:
+        params = self.api.get_strategy_params()
+        self._show(self._build_kv_table("当前策略参数", params))
+
+        while True:
+            self.console.print("1) 更新策略参数  2) 报价预览  3) 参数扫描  0) 返回")
+            choice = Prompt.ask("请选择", choices=["0", "1", "2", "3"], default="0")
+            if choice == "0":
+                return
+            if choice == "2":
+                self._show_quote_preview(params, "当前参数报价预览")
+                continue
+            defaults = params
+            if choice == "3":
+                defaults = self._run_param_sweep(params)
+                if defaults is None:
+                    continue
+            params = self._update_strategy_params(params, defaults)
+
+    def _update_strategy_params(self, params: dict[str, Any], defaults: dict[str, Any]) -> dict[str, Any]:
+        payload = {
+            "gamma": self._prompt_float("gamma", defaults["gamma"]),
+            "sigma": self._prompt_float("sigma", defaults["sigma"]),
+            "A": self._prompt_float("A", defaults["A"]),
+            "k": self._prompt_float("k", defaults["k"]),
+            "time_horizon_seconds": self._prompt_int("time_horizon_seconds", defaults["time_horizon_seconds"]),
+            "inventory_cap_usd": self._prompt_float("inventory_cap_usd", defaults["inventory_cap_usd"]),
+            "order_cap_usd": self._prompt_float("order_cap_usd", defaults["order_cap_usd"]),
+            "leverage_limit": self._prompt_float("leverage_limit", defaults["leverage_limit"]),
+            "auto_tuning_enabled": Confirm.ask("启用自动调参？", default=bool(defaults["auto_tuning_enabled"])),
+        }
+        try:
+            self._show_quote_preview(payload, "新参数报价预览")
+        except ApiError as exc:
+            self.console.print(f"[yellow]无法预览报价：{exc}[/yellow]")
+        if not Confirm.ask("确认提交以上策略参数？", default=True):
+            return params
+        updated = self.api.update_strategy_params(payload)
+        self.console.print("[green]策略参数更新成功。[/green]")
+        self._show(self._build_kv_table("更新后策略参数", updated))
+        return updated
+
+    def _show_quote_preview(self, params: dict[str, Any], title: str) -> None:
+        """按 GLFT 闭式近似在库存网格上预览报价偏移；能取到中间价时一并给出买卖价。"""
+        try:
+            from glft_quote import quote_grid
+        except ImportError as exc:
+            raise ApiError("未安装 numpy，无法预览报价。") from exc
+        try:
+            rows = quote_grid(params)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ApiError(f"策略参数无法用于报价预览：{exc}") from exc
+        try:
+            mid = float(self.api.get_dashboard_metrics()["mid_price"])
+        except (ApiError, KeyError, TypeError, ValueError):
+            mid = None
+
+        caption = "偏移与 1/k、sigma 同一价格单位；time_horizon_seconds 不进入渐近公式"
+        table = Table(title=title, caption=caption, box=box.SIMPLE_HEAVY)
+        for label in ("库存(USD)", "库存(手)", "买价偏移", "卖价偏移", "半价差", "偏斜"):
+            table.add_column(label, justify="right")
+        if mid is not None:
+            table.add_column(f"买价 @{mid:.2f}", justify="right")
+            table.add_column(f"卖价 @{mid:.2f}", justify="right")
+        for row in rows:
+            cells = [
+                f"{row['inventory_usd']:,.2f}",
+                f"{row['lots']:+.2f}",
+                f"{row['bid_offset']:.6f}",
+                f"{row['ask_offset']:.6f}",
+                f"{row['half_spread']:.6f}",
+                f"{row['skew']:+.6f}",
+            ]
+            if mid is not None:
+                cells += [f"{mid - row['bid_offset']:.4f}", f"{mid + row['ask_offset']:.4f}"]
+            table.add_row(*cells)
+        self._show(table)
+
+    def _run_param_sweep(self, params: dict[str, Any]) -> dict[str, Any] | None:
+        """在参数网格上回放缓存的成交，列出表现最好的候选；选中的候选作为更新参数时的默认值返回。"""
+        try:
+            from glft_quote import SWEEP_FIELDS, parse_range, sweep
+        except ImportError as exc:
+            raise ApiError("未安装 numpy，无法进行参数扫描。") from exc
+
+        latest = next(self.api.iter_pages(self.api.get_trade_records, 1), [])
+        symbol = Prompt.ask("回放标的", default=latest[0].symbol if latest else "").strip()
+        if not symbol:
+            raise ApiError("未指定回放标的。")
+        count = self._prompt_int("回放成交笔数", SWEEP_REPLAY_TRADES)
+        ranges = {}
+        for field in SWEEP_FIELDS:
+            while True:
+                text = Prompt.ask(f"{field} 取值（start:stop:count 或 a,b,c）", default=str(params[field]))
+                try:
+                    ranges[field] = parse_range(text)
+                    break
+                except ValueError:
+                    self.console.print(f"[red]{field} 取值格式无效。[/red]")
+
+        with self.console.status("正在载入回放成交…"):
+            prices = self._replay_prices(symbol, count)
+        candidates = 1
+        for values in ranges.values():
+            candidates *= len(values)
+        with self.console.status(f"正在回放 {len(prices)} 笔成交、{candidates} 组候选参数…"):
+            started = time.perf_counter()
+            try:
+                results = sweep(prices, ranges, float(params["order_cap_usd"]), float(params["inventory_cap_usd"]))
+            except ValueError as exc:
+                raise ApiError(f"参数扫描失败：{exc}") from exc
+            elapsed = time.perf_counter() - started
+        self.console.print(f"扫描完成：{candidates} 组候选，用时 {elapsed:.2f}s")
+
+        shown = min(SWEEP_TOP_RESULTS, candidates)
+        table = Table(title=f"参数扫描结果（{symbol}，按回放盈亏排序，前 {shown} 组）", box=box.SIMPLE_HEAVY)
+        for label in ("排名", *SWEEP_FIELDS, "盈亏", "成交数", "成交率", "最大回撤", "期末库存(手)"):
+            table.add_column(label, justify="right")
+        for rank in range(shown):
+            table.add_row(
+                str(rank + 1),
+                *(f"{results[field][rank]:.6g}" for field in SWEEP_FIELDS),
+                f"{results['pnl'][rank]:,.2f}",
+                f"{int(results['fills'][rank])}",
+                f"{results['fill_rate'][rank]:.2%}",
+                f"{results['max_drawdown'][rank]:,.2f}",
+                f"{results['final_lots'][rank]:+.0f}",
+            )
+        self._show(table)
+
+        pick = Prompt.ask("采用第几组作为新参数的默认值（0 放弃）", choices=[str(i) for i in range(shown + 1)], default="0")
+        if pick == "0":
+            return None
+        return {**params, **{field: float(results[field][int(pick) - 1]) for field in SWEEP_FIELDS}}
+
+    def _replay_prices(self, symbol: str, count: int) -> list[float]:
+        """参数扫描用的成交价序列：有本地存储时先增量同步再从库里取，否则从接口逐页拉到足够笔数（至多 SWEEP_MAX_PAGES 页）。"""
+        if self.store is not None:
+            since = self.store.sync_params("trades").get("since")
+            first_page = self.api.get_trade_records(since=since, limit=DEFAULT_PAGE_SIZE)
+            self._sync_store_table("trades", "成交", self.api.get_trade_records, since, first_page)
+            return self.store.trade_prices(symbol, count)
+
+        collected: list[tuple[Any, float]] = []
+        pages = islice(self.api.iter_pages(self.api.get_trade_records, DEFAULT_PAGE_SIZE), SWEEP_MAX_PAGES)
+        for page in pages:
+            collected += [(trade.trade_id, trade.price) for trade in page if trade.symbol == symbol]
+            if len(collected) >= count:
+                break
+        collected.sort()
+        return [price for _, price in collected[-count:]]
+
+    @_screen("风控执行")
+    def manage_risk(self) -> None:
+        limits = self._show_risk_overview()
+
+        while True:
+            self.console.print("1) 启动引擎  2) 停止引擎  3) 更新风控阈值  0) 返回")
+            choice = Prompt.ask("请选择", choices=["0", "1", "2", "3"], default="0")
+            if choice == "0":
+                return
+            if choice == "1":
+                self.api.engine_start()
+                self.console.print("[green]引擎已启动。[/green]")
+            elif choice == "2":
+                self.api.engine_stop()
+                self.console.print("[yellow]引擎已停止。[/yellow]")
+            elif limits is None:
+                self.console.print("[yellow]风控阈值未能加载，暂无法更新。[/yellow]")
+                continue
+            else:
+                payload = {
+                    "max_inventory_usd": self._prompt_float("max_inventory_usd", limits["max_inventory_usd"]),
+                    "max_order_usd": self._prompt_float("max_order_usd", limits["max_order_usd"]),
+                    "max_leverage": self._prompt_float("max_leverage", limits["max_leverage"]),
+                    "max_cancel_rate_per_min": self._prompt_float(
+                        "max_cancel_rate_per_min", limits["max_cancel_rate_per_min"]
+                    ),
+                    "max_order_rate_per_min": self._prompt_float(
+                        "max_order_rate_per_min", limits["max_order_rate_per_min"]
+                    ),
+                }
+                self.api.update_risk_limits(payload)
+                self.console.print("[green]风控阈值已更新。[/green]")
+            limits = self._show_risk_overview()
+
+    def _show_risk_overview(self) -> dict[str, Any] | None:
+        status, limits = self._fetch_concurrently("get_risk_status", "get_risk_limits")
+        if not self._report_failure("风控状态", status):
+            self._show(self._build_kv_table("风控状态", status))
+        if self._report_failure("风控阈值", limits):
+            return None
+        self._show(self._build_kv_table("风控阈值", limits))
+        return limits
+
+    @_screen("API Key 管理")
+    def manage_api_keys(self) -> None:
+        current: dict[str, Any] | None = None
+        try:
+            current = self.api.get_keys()
+            self._show(self._build_kv_table("已配置的 API Key 信息", current))
+        except ApiError as exc:
+            if exc.status_code == 404:
+                self.console.print("[yellow]当前未配置 API Key。[/yellow]")
+            else:
+                raise
+
+        if not Confirm.ask("是否更新 API Key？", default=True):
+            return
+
+        default_sub = current["sub_account_id"] if current else ""
+        default_ip = current.get("ip_whitelist", "") if current else ""
+
+        api_key = getpass.getpass("请输入 GRVT API Key: ").strip()
+        private_key = getpass.getpass("请输入 GRVT Private Key: ").strip()
+        if not api_key or not private_key:
+            raise ApiError("API Key 与 Private Key 不能为空。")
+
+        payload = {
+            "api_key": api_key,
+            "private_key": private_key,
+            "sub_account_id": Prompt.ask("Sub Account ID", default=default_sub).strip(),
+            "ip_whitelist": Prompt.ask("IP 白名单（逗号分隔）", default=default_ip).strip(),
+        }
+        if not payload["sub_account_id"]:
+            raise ApiError("Sub Account ID 不能为空。")
+
+        updated = self.api.save_keys(payload)
+        self.console.print("[green]API Key 已更新。[/green]")
+        self._show(self._build_kv_table("当前 API Key 信息", updated))
+        self._pause()
+
+    @_screen("系统配置")
+    def manage_system_config(self) -> None:
+        config = self.api.get_config()
+        self._show(self._build_kv_table("系统配置", config))
+        if not Confirm.ask("是否更新系统配置？", default=False):
+            return
+
+        payload = {
+            "grvt_env": Prompt.ask("grvt_env", default=str(config["grvt_env"])).strip(),
+            "grvt_symbol": Prompt.ask("grvt_symbol", default=str(config["grvt_symbol"])).strip(),
+            "quote_interval_ms": self._prompt_int("quote_interval_ms", config["quote_interval_ms"]),
+            "order_duration_secs": self._prompt_int("order_duration_secs", config["order_duration_secs"]),
+            "calibration_window_days": self._prompt_int(
+                "calibration_window_days", config["calibration_window_days"]
+            ),
+            "calibration_timeframe": Prompt.ask(
+                "calibration_timeframe", default=str(config["calibration_timeframe"])
+            ).strip(),
+            "calibration_update_time": Prompt.ask(
+                "calibration_update_time(HH:MM)", default=str(config["calibration_update_time"])
+            ).strip(),
+            "calibration_trade_sample": self._prompt_int(
+                "calibration_trade_sample", config["calibration_trade_sample"]
+            ),
+            "log_retention_days": self._prompt_int("log_retention_days", config["log_retention_days"]),
+            "alert_email_to": Prompt.ask("alert_email_to", default=str(config["alert_email_to"])).strip(),
+            "smtp_host": Prompt.ask("smtp_host", default=str(config["smtp_host"])).strip(),
+            "smtp_port": self._prompt_int("smtp_port", config["smtp_port"]),
+            "smtp_user": Prompt.ask("smtp_user", default=str(config["smtp_user"])).strip(),
+            "smtp_password": getpass.getpass("smtp_password（留空表示不更新）: ").strip(),
+            "smtp_tls": Confirm.ask("启用 smtp_tls？", default=bool(config["smtp_tls"])),
+        }
+        updated = self.api.update_config(payload)
+        self.console.print("[green]系统配置已更新。[/green]")
+        self._show(self._build_kv_table("更新后系统配置", updated))
+        self._pause()
+
+    @_screen("告警中心")
+    def manage_alerts(self) -> None:
+        alerts = self.api.get_alert_records(limit=BROWSE_MAX_ROWS)
+        self._browse(f"告警列表（最近 {len(alerts)} 条）", alerts, ALERT_COLUMNS)
+        unread_ids = [int(alert.id) for alert in alerts if not alert.is_read]
+        if not unread_ids:
+            self.console.print("[green]当前没有未读告警。[/green]")
+            self._pause()
+            return
+
+        if not Confirm.ask("是否标记告警为已读？", default=False):
+            return
+
+        id_text = Prompt.ask("请输入告警 ID（多个用逗号分隔，all 表示已载入的全部未读）", default="all").strip()
+        if id_text.lower() == "all":
+            alert_ids = unread_ids
+        else:
+            try:
+                alert_ids = [int(part) for part in id_text.replace("，", ",").split(",") if part.strip()]
+            except ValueError:
+                self.console.print("[red]告警 ID 必须是整数。[/red]")
+                self._pause()
+                return
+        marked = self.api.mark_alerts_read(alert_ids)
+        self.unread_alert_ids.difference_update(marked)
+        self.console.print(f"[green]已将 {len(marked)} 条告警标记为已读。[/green]")
+        self._pause()
+
+    def export_pnl_csv(self) -> None:
+        default_path = self._pending_pnl_export() or Path("reports") / f"pnl_{datetime.now():%Y%m%d_%H%M%S}.csv"
+        save_path = Path(Prompt.ask("请输入导出路径", default=str(default_path)))
+        # 续传时沿用上次的压缩格式，否则会因格式不一致而从头下载。
+        default_compression = pnl_export_compression(save_path) or "none"
+        compression_choice = Prompt.ask("压缩格式", choices=["none", "gzip", "zstd"], default=default_compression)
+        compression = None if compression_choice == "none" else compression_choice
+        suffix = PNL_COMPRESSION_SUFFIXES.get(compression or "", "")
+        if suffix and save_path.suffix != suffix:
+            save_path = save_path.with_name(save_path.name + suffix)
+        if partial_download_paths(save_path)[0].exists():
+            self.console.print("[cyan]检测到未完成的下载，将从断点续传。[/cyan]")
+
+        with Progress(
+            TextColumn("[cyan]导出 PnL"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            TimeRemainingColumn(),
+            console=self.console,
+        ) as progress:
+            task = progress.add_task("pnl", total=None)
+
+            def on_progress(done: int, total: int | None) -> None:
+                progress.update(task, completed=done, total=total)
+
+            saved = self.api.download_pnl_csv(save_path, compression=compression, on_progress=on_progress)
+        self.console.print(f"[green]PnL 报表导出成功：{saved}[/green]")
+        self._pause()
+
+    @staticmethod
+    def _pending_pnl_export() -> Path | None:
+        pending = sorted(Path("reports").glob("pnl_*.part"), key=lambda p: p.stat().st_mtime)
+        if not pending:
+            return None
+        return pending[-1].with_name(pending[-1].name.removesuffix(".part"))
+
+    @_screen("成交分析")
+    def show_analytics(self) -> None:
+        try:
+            from glft_analytics import TradeAnalytics
+        except ImportError as exc:
+            raise ApiError("未安装 numpy，无法使用成交分析。") from exc
+        if self.analytics is None:
+            self.analytics = TradeAnalytics()
+        analytics = self.analytics
+
+        with self.console.status("正在拉取新成交与订单…"):
+            started = time.perf_counter()
+            # 逐页交给分析：每页用完即释放，不把整段历史的记录对象同时留在内存里。
+            try:
+                added = analytics.add_trade_pages(
+                    self.api.iter_pages(self.api.get_trade_records, ANALYTICS_PAGE_SIZE, analytics.trade_cursor)
+                )
+                for page in self.api.iter_pages(
+                    self.api.get_order_records, ANALYTICS_PAGE_SIZE, analytics.order_cursor
+                ):
+                    analytics.add_orders(page)
+            except (TypeError, ValueError) as exc:
+                raise ApiError(f"成交或订单数据无法用于分析：{exc}") from exc
+            elapsed = time.perf_counter() - started
+
+        summary = analytics.summary()
+        self.console.print(f"新增 {added} 笔成交（拉取与计算共 {elapsed:.2f}s）")
+        if not summary["trades"]:
+            self.console.print("[yellow]暂无成交记录。[/yellow]")
+            self._pause()
+            return
+
+        table = Table(title="成交分析", box=box.SIMPLE_HEAVY)
+        table.add_column("指标", style="cyan")
+        table.add_column("值", justify="right")
+        for field, label, spec in ANALYTICS_SUMMARY_FIELDS:
+            value = summary[field]
+            table.add_row(label, "-" if value is None else format(value, spec))
+        table.add_row("时间范围", f"{summary['first_trade_at'] or '-'} ~ {summary['last_trade_at'] or '-'}")
+        table.add_row("累计净盈亏走势", _sparkline(analytics.equity_curve(ANALYTICS_SPARKLINE_POINTS)))
+        table.add_row(
+            f"滚动夏普走势（{summary['sharpe_window']} 笔）",
+            _sparkline(analytics.rolling_sharpe(ANALYTICS_SPARKLINE_POINTS)),
+        )
+        self._show(table)
+
+        for by, label in (("side", "方向"), ("symbol", "标的")):
+            rows = [
+                {**row, **{field: format(row[field], spec) for field, spec in ANALYTICS_BREAKDOWN_FORMATS.items()}}
+                for row in analytics.breakdown(by)
+            ]
+            self._show(self._build_table(f"按{label}统计", rows, [
+                (by, label),
+                ("count", "笔数"),
+                ("volume", "成交量"),
+                ("notional", "成交额"),
+                ("fee", "手续费"),
+                ("realized_pnl", "已实现盈亏"),
+                ("net_pnl", "净盈亏"),
+            ]))
+        self._pause()
+
+    @_screen("回放定位")
+    def seek_replay(self) -> None:
+        from glft_session import resolve_seek_target
+
+        replay = self.replay
+        reader = replay.reader
+        position = reader.position(replay.at)
+        records = [reader.read(index) for index in range(max(0, position - REPLAY_CONTEXT_ROWS), position)]
+        self._show(self._build_table(
+            f"回放时刻 {_format_timestamp(replay.at)} 之前的请求（共 {position} / {len(reader)} 个）",
+            [
+                {
+                    "index": record.index + 1,
+                    "time": _format_timestamp(record.timestamp),
+                    "request": record.key,
+                    "status": record.status,
+                }
+                for record in records
+            ],
+            [("index", "#"), ("time", "时间"), ("request", "请求"), ("status", "状态")],
+        ))
+        target = Prompt.ask(
+            "定位到（HH:MM:SS、YYYY-MM-DD HH:MM:SS、+/-秒数、#序号、start、end；留空不变）", default=""
+        ).strip()
+        if not target:
+            return
+        try:
+            replay.at = resolve_seek_target(target, reader, replay.at)
+        except ValueError as exc:
+            self.console.print(f"[red]{exc}[/red]")
+            return
+        # 换了时刻，缓存与增量分析状态都对应旧时刻，一并丢弃。
+        self.api.cache.invalidate()
+        self.analytics = None
+        self.console.print(
+            f"[green]已定位到 {_format_timestamp(replay.at)}（第 {reader.position(replay.at)} 个请求）。[/green]"
+        )
+
+    @_screen("诊断")
+    def show_diagnostics(self) -> None:
+        requests = self.metrics.request_summaries()
+        table = Table(title="接口耗时统计", box=box.SIMPLE_HEAVY)
+        for label in ("接口", "次数", "错误", "p50(ms)", "p95(ms)", "p99(ms)", "字节数", "解码(ms)"):
+            table.add_column(label, justify="left" if label == "接口" else "right")
+        for endpoint, summary in requests.items():
+            table.add_row(
+                endpoint,
+                str(summary["count"]),
+                str(summary["errors"]),
+                f"{summary['p50_ms']:.1f}",
+                f"{summary['p95_ms']:.1f}",
+                f"{summary['p99_ms']:.1f}",
+                str(summary["bytes"]),
+                f"{summary['decode_ms']:.1f}",
+            )
+        if not requests:
+            table.add_row(*(["-"] * 8))
+        self._show(table)
+
+        renders = self.metrics.render_summaries()
+        table = Table(title="界面渲染耗时", box=box.SIMPLE_HEAVY)
+        for label in ("界面", "次数", "p50(ms)", "p95(ms)", "最大(ms)"):
+            table.add_column(label, justify="left" if label == "界面" else "right")
+        for screen, summary in renders.items():
+            table.add_row(
+                screen,
+                str(summary["count"]),
+                f"{summary['p50_ms']:.1f}",
+                f"{summary['p95_ms']:.1f}",
+                f"{summary['max_ms']:.1f}",
+            )
+        if not renders:
+            table.add_row(*(["-"] * 5))
+        self._show(table)
+
+        events = self.metrics.transport_counts()
+        if events:
+            table = Table(title="传输层事件", box=box.SIMPLE_HEAVY)
+            table.add_column("事件")
+            table.add_column("次数", justify="right")
+            for event, count in events.items():
+                table.add_row(TRANSPORT_EVENT_LABELS.get(event, event), str(count))
+            self._show(table)
+
+        fmt = Prompt.ask("导出诊断数据", choices=["none", "prometheus", "jsonl"], default="none")
+        if fmt == "none":
+            return
+        suffix = ".prom" if fmt == "prometheus" else ".jsonl"
+        default_path = Path("reports") / f"glft_diagnostics{suffix}"
+        save_path = Path(Prompt.ask("请输入导出路径", default=str(default_path)))
+        self.metrics.dump(save_path, fmt)
+        self.console.print(f"[green]诊断数据已导出：{save_path}[/green]")
+        self._pause()
+
+    def _show(self, renderable: Any) -> None:
+        started = time.perf_counter()
+        self.console.print(renderable)
+        self._render_seconds += time.perf_counter() - started
+
+    def _browse(self, title: str, rows: Sequence[dict[str, Any] | Record], columns: list[tuple[str, str]]) -> None:
+        """分页浏览大结果集：每次只格式化并输出一屏，支持滚动、按列排序与按索引筛选。"""
+        # 留出标题、表头、说明与输入行的高度。
+        view = TableView(rows, columns, page_rows=max(5, self.console.size.height - 10))
+        while True:
+            self._show(self._build_view_table(title, view))
+            command = Prompt.ask(f"[dim]{BROWSE_HELP}[/dim]\n操作", default="n").strip()
+            action, _, argument = command.partition(" ")
+            argument = argument.strip()
+            try:
+                if action in ("", "n"):
+                    view.scroll(view.page_rows)
+                elif action == "p":
+                    view.scroll(-view.page_rows)
+                elif action == "g":
+                    view.home()
+                elif action == "G":
+                    view.end()
+                elif action[:1] in ("+", "-") and action[1:].isdigit():
+                    view.scroll(int(action))
+                elif action == "s" and argument:
+                    view.sort_by(view.resolve_field(argument))
+                elif action == "f" and argument:
+                    view.set_filter(view.parse_filter(argument))
+                elif action == "c":
+                    view.set_filter({})
+                elif action in ("q", "0"):
+                    return
+                else:
+                    self.console.print(f"[yellow]无法识别的操作：{command}[/yellow]")
+            except ValueError as exc:
+                self.console.print(f"[red]{exc}[/red]")
+
+    def _build_view_table(self, title: str, view: TableView) -> Table:
+        started = time.perf_counter()
+        visible = len(view)
+        caption = (
+            f"第 {min(view.offset + 1, visible)}–{min(view.offset + view.page_rows, visible)} 条 / 共 {visible} 条"
+        )
+        if view.filters:
+            conditions = " ".join(f"{field}={'|'.join(map(str, keys))}" for field, keys in view.filters.items())
+            caption += f"（全部 {view.total} 条 · 筛选 {escape(conditions)}）"
+        if view.sort_field is not None:
+            caption += f" · 按 {view.sort_field} {'降序' if view.descending else '升序'}"
+        table = Table(title=title, caption=caption, box=box.SIMPLE_HEAVY)
+        for _, label in view.columns:
+            table.add_column(label, overflow="fold")
+        cells = view.window()
+        if not cells:
+            table.add_row(*(["-"] * len(view.columns)))
+        for row in cells:
+            table.add_row(*map(escape, row))
+        self._render_seconds += time.perf_counter() - started
+        return table
+
+    def _build_kv_table(self, title: str, data: dict[str, Any]) -> Table:
+        started = time.perf_counter()
+        table = Table(title=title, box=box.SIMPLE_HEAVY)
+        table.add_column("字段", style="cyan")
+        table.add_column("值", style="white")
+        for key, value in data.items():
+            table.add_row(str(key), str(value))
+        self._render_seconds += time.perf_counter() - started
+        return table
+
+    def _build_table(
+        self,
+        title: str,
+        rows: Sequence[dict[str, Any] | Record],
+        columns: list[tuple[str, str]],
+    ) -> Table:
+        started = time.perf_counter()
+        table = Table(title=title, box=box.SIMPLE_HEAVY, show_lines=False)
+        for _, label in columns:
+            table.add_column(label, overflow="fold")
+        if not rows:
+            table.add_row(*(["-"] * len(columns)))
+        fields = [field for field, _ in columns]
+        for row in rows:
+            if isinstance(row, Record):
+                table.add_row(*(str(getattr(row, field, "")) for field in fields))
+            else:
+                table.add_row(*(str(row.get(field, "")) for field in fields))
+        self._render_seconds += time.perf_counter() - started
+        return table
+
+    def _prompt_float(self, name: str, default: float) -> float:
+        while True:
+            value = Prompt.ask(name, default=str(default)).strip()
+            try:
+                return float(value)
+            except ValueError:
+                self.console.print(f"[red]{name} 必须是数字。[/red]")
+
+    def _prompt_int(self, name: str, default: int) -> int:
+        while True:
+            value = Prompt.ask(name, default=str(default)).strip()
+            try:
+                return int(value)
+            except ValueError:
+                self.console.print(f"[red]{name} 必须是整数。[/red]")
+
+    def _pause(self) -> None:
+        Prompt.ask("按回车继续", default="")
+
+
+def _is_unauthorized(result: Any) -> bool:
+    return isinstance(result, ApiError) and result.status_code == 401
+
+
+def _format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _sparkline(values: Sequence[float]) -> str:
+    if not len(values):
+        return "-"
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    top = len(_SPARK_BLOCKS) - 1
+    return "".join(_SPARK_BLOCKS[round((value - low) / span * top)] for value in values)
+
+
+class FleetTuiApp:
+    """fleet 模式的交互界面：一张表实时汇总全部引擎，并支持批量启停。"""
+
+    def __init__(self, fleet: Fleet, console: Console, live_interval: float | None = None) -> None:
+        self.fleet = fleet
+        self.console = console
+        self.live_interval = max(live_interval or DEFAULT_LIVE_INTERVAL_SECONDS, MIN_LIVE_INTERVAL_SECONDS)
+        self._loop = asyncio.new_event_loop()
+
+    def close(self) -> None:
+        self._loop.run_until_complete(self.fleet.aclose())
+        self._loop.close()
+
+    def run(self) -> None:
+        self.console.print(
+            Panel.fit(
+                f"[bold cyan]GLFT 终端控制台（fleet 模式）[/bold cyan]\n共 {len(self.fleet.engines)} 台引擎。",
+                border_style="cyan",
+            )
+        )
+        self._login_all()
+
+        while True:
+            self.console.print()
+            self.console.print("1) 实时总览  2) 全部启动引擎  3) 全部停止引擎  4) 重新登录  0) 退出")
+            choice = Prompt.ask("请选择操作", choices=["0", "1", "2", "3", "4"], default="1")
+            if choice == "1":
+                self.watch_fleet()
+            elif choice == "2":
+                self._bulk_action("engine_start", "启动引擎")
+            elif choice == "3":
+                self._bulk_action("engine_stop", "停止引擎")
+            elif choice == "4":
+                self._login_all()
+            else:
+                self.console.print("[green]已退出 GLFT TUI。[/green]")
+                return
+
+    def _login_all(self) -> None:
+        fallback = None
+        missing = self.fleet.missing_credentials()
+        if missing:
+            try:
+                fallback = load_credentials(None)
+            except UsageError:
+                self.console.print(f"[bold]以下引擎未配置凭据，将使用同一账号登录：{', '.join(missing)}[/bold]")
+                username = Prompt.ask("账号", default="admin").strip()
+                fallback = {"username": username, "password": getpass.getpass("密码: ")}
+        results = self._loop.run_until_complete(self.fleet.login_all(fallback))
+        self._show_results("登录结果", results, lambda _: "登录成功")
+
+    def _bulk_action(self, method: str, label: str) -> None:
+        if not Confirm.ask(f"确认对全部 {len(self.fleet.engines)} 台引擎执行“{label}”？", default=False):
+            return
+        results = self._loop.run_until_complete(self.fleet.broadcast(method))
+        self._show_results(label, results, lambda result: "运行中" if result.get("engine_running") else "已停止")
+
+    def _show_results(self, title: str, results: dict[str, Any], describe: Callable[[Any], str]) -> None:
+        table = Table(title=title, box=box.SIMPLE_HEAVY)
+        table.add_column("引擎", style="cyan")
+        table.add_column("结果")
+        for name, result in results.items():
+            if isinstance(result, ApiError):
+                table.add_row(name, f"[red]失败：{result}[/red]")
+            else:
+                table.add_row(name, f"[green]{describe(result)}[/green]")
+        self.console.print(table)
+
+    def watch_fleet(self) -> None:
+        snapshots: list[EngineSnapshot] = []
+        live = Live(self._build_fleet_table(snapshots, 0.0, "-"), console=self.console, auto_refresh=False)
+        try:
+            with live:
+                while True:
+                    started = time.monotonic()
+                    snapshots = self._loop.run_until_complete(self.fleet.poll())
+                    elapsed = time.monotonic() - started
+                    live.update(self._build_fleet_table(snapshots, elapsed, f"{datetime.now():%H:%M:%S}"), refresh=True)
+                    time.sleep(max(0.0, self.live_interval - elapsed))
+        except KeyboardInterrupt:
+            self.console.print("[green]已退出实时总览。[/green]")
+
+    def _build_fleet_table(self, snapshots: list[EngineSnapshot], elapsed: float, updated_at: str) -> Table:
+        online = sum(1 for snapshot in snapshots if snapshot.error is None)
+        slowest = max((snapshot.latency_ms for snapshot in snapshots), default=0.0)
+        caption = (
+            f"在线 {online}/{len(self.fleet.engines)} · 本轮 {elapsed * 1000:.0f}ms（最慢 {slowest:.0f}ms）"
+            f" · 刷新间隔 {self.live_interval:.2f}s · 更新于 {updated_at} · Ctrl+C 退出"
+        )
+        table = Table(title="引擎总览（实时）", caption=caption, box=box.SIMPLE_HEAVY, show_footer=True)
+        table.add_column("引擎", style="cyan", footer="合计")
+        table.add_column("状态")
+        table.add_column("风控")
+        totals = dict.fromkeys(FLEET_SUMMED_FIELDS, 0)
+        for snapshot in snapshots:
+            for field in FLEET_SUMMED_FIELDS:
+                totals[field] += (snapshot.metrics or {}).get(field) or 0
+        for field, label, spec in FLEET_FIELDS:
+            footer = format(totals[field], spec) if field in FLEET_SUMMED_FIELDS else ""
+            table.add_column(label, justify="right", footer=footer)
+        table.add_column("延迟(ms)", justify="right")
+
+        for snapshot in snapshots:
+            metrics, risk = snapshot.metrics or {}, snapshot.risk
+            if risk is None:
+                state, risk_text = "-", "-"
+            else:
+                state = "运行" if risk.get("engine_running") else "[yellow]停止[/yellow]"
+                if risk.get("kill_switch"):
+                    risk_text = "[red]熔断[/red]"
+                elif risk.get("breaches"):
+                    risk_text = f"[yellow]{len(risk['breaches'])} 项超限[/yellow]"
+                else:
+                    risk_text = "[green]正常[/green]"
+            if snapshot.error is not None:
+                state = f"[red]{escape(snapshot.error)}[/red]"
+            cells = [
+                "-" if metrics.get(field) is None else format(metrics[field], spec) for field, _, spec in FLEET_FIELDS
+            ]
+            # 引擎名来自配置、错误信息来自服务端，都可能含有方括号，按纯文本输出。
+            table.add_row(escape(snapshot.name), state, risk_text, *cells, f"{snapshot.latency_ms:.0f}")
+        return table
+
+
+def default_store_path(api_url: str) -> Path:
+    url = httpx.URL(api_url)
+    return Path.home() / ".glft" / f"{url.host or 'local'}_{url.port or 'default'}.sqlite3"
+
+
+def default_token_cache_path(api_url: str) -> Path:
+    return default_store_path(api_url).with_suffix(".token")
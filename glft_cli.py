@@ -0,0 +1,316 @@
+"""GLFT 无界面子命令：供 cron、看门狗与健康检查脚本调用，输出机器可读的结果。
+
+只依赖 glft_client，不导入 rich、sqlite3 与 asyncio，冷启动开销基本只剩解释器与 httpx。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from glft_client import ENV_CREDENTIALS_FILE, ApiError, GlftApiClient, UsageError, load_credentials
+from glft_transport import TransportOptions
+
+if TYPE_CHECKING:
+    import httpx
+
+    from glft_fleet import Fleet
+
+# 退出码：脚本据此区分“接口报错”“用法错误”“鉴权失败”。
+EXIT_OK = 0
+EXIT_API_ERROR = 1
+EXIT_USAGE = 2
+EXIT_AUTH = 3
+
+ENV_API_URL = "GLFT_API_URL"
+ENV_FLEET_CONFIG = "GLFT_FLEET_CONFIG"
+
+
+def add_transport_arguments(parser: argparse.ArgumentParser) -> None:
+    """连接池、HTTP/2、重试与对冲的调优参数，交互界面、headless 子命令与 fleet 共用。"""
+    defaults = TransportOptions()
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=defaults.max_connections,
+        help=f"每台后端的最大连接数（默认 {defaults.max_connections}）",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="启用 HTTP/2 多路复用（需安装 h2：pip install 'httpx[http2]'）",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=defaults.retries,
+        help=f"GET 请求遇到网络错误或 502/503/504 时的最大重试次数，写请求从不重试（默认 {defaults.retries}）",
+    )
+    parser.add_argument(
+        "--hedge-ms",
+        type=float,
+        default=None,
+        help="仪表盘指标与风控状态请求超过这么多毫秒未返回时再发一份，取先返回的（默认不对冲）",
+    )
+
+
+def transport_options(args: argparse.Namespace) -> TransportOptions:
+    if args.max_connections < 1:
+        raise UsageError("--max-connections 至少为 1。")
+    if args.retries < 0:
+        raise UsageError("--retries 不能为负数。")
+    if args.hedge_ms is not None and args.hedge_ms <= 0:
+        raise UsageError("--hedge-ms 必须大于 0。")
+    if args.http2:
+        import importlib.util
+
+        if importlib.util.find_spec("h2") is None:
+            raise UsageError("--http2 需要安装 h2：pip install 'httpx[http2]'")
+    defaults = TransportOptions()
+    return TransportOptions(
+        max_connections=args.max_connections,
+        max_keepalive_connections=min(defaults.max_keepalive_connections, args.max_connections),
+        http2=args.http2,
+        retries=args.retries,
+        hedge_after=None if args.hedge_ms is None else args.hedge_ms / 1000,
+    )
+
+
+def add_subcommands(parser: argparse.ArgumentParser) -> None:
+    """把 headless 子命令注册到主解析器上；不带子命令时仍进入交互界面。"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="以 JSON 输出（默认每行一个 key=value）")
+    common.add_argument(
+        "--credentials",
+        type=Path,
+        default=None,
+        help=f"凭据文件（JSON，含 username/password 或 token；也可用环境变量 {ENV_CREDENTIALS_FILE}）",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", metavar="<命令>")
+    subparsers.add_parser("metrics", parents=[common], help="输出仪表盘指标")
+
+    for name, label in (("risk", "风控"), ("strategy", "策略参数")):
+        command = subparsers.add_parser(name, help=f"查看或修改{label}")
+        actions = command.add_subparsers(dest="action", metavar="<操作>", required=True)
+        if name == "risk":
+            actions.add_parser("status", parents=[common], help="输出风控状态")
+            actions.add_parser("limits", parents=[common], help="输出风控阈值")
+        else:
+            actions.add_parser("show", parents=[common], help="输出当前策略参数")
+        setter = actions.add_parser("set", parents=[common], help="修改指定字段，其余字段保持不变")
+        setter.add_argument("assignments", nargs="+", metavar="key=value")
+
+    engine = subparsers.add_parser("engine", parents=[common], help="启动或停止交易引擎")
+    engine.add_argument("action", choices=["start", "stop"])
+
+    export = subparsers.add_parser("export-pnl", parents=[common], help="导出 PnL CSV（中断后重跑可续传）")
+    export.add_argument("-o", "--output", type=Path, required=True, help="保存路径")
+    export.add_argument("--compression", choices=["gzip", "zstd"], default=None, help="压缩格式")
+
+    alerts = subparsers.add_parser("alerts", help="批量标记告警已读，或订阅告警与状态推送")
+    actions = alerts.add_subparsers(dest="action", metavar="<操作>", required=True)
+    reader = actions.add_parser("read", parents=[common], help="一次请求批量标记告警为已读")
+    reader.add_argument("ids", nargs="+", type=int, metavar="ID")
+    watch = actions.add_parser("watch", parents=[common], help="订阅推送，每个事件输出一次（Ctrl+C 退出）")
+    watch.add_argument("--count", type=int, default=None, help="收到这么多个事件后退出")
+
+    fleet = subparsers.add_parser("fleet", parents=[common], help="在 fleet 配置中的全部引擎上并发执行")
+    fleet.add_argument("action", choices=["status", "start", "stop"])
+    fleet.add_argument(
+        "-c",
+        "--config",
+        type=Path,
+        default=None,
+        help=f"fleet 配置文件（也可用环境变量 {ENV_FLEET_CONFIG}）",
+    )
+
+
+def parse_assignments(assignments: list[str], current: dict[str, Any]) -> dict[str, Any]:
+    """把 key=value 解析为更新字段，值按服务端当前值的类型转换；未知字段视为用法错误。"""
+    updates: dict[str, Any] = {}
+    for assignment in assignments:
+        key, sep, text = assignment.partition("=")
+        key, text = key.strip(), text.strip()
+        if not sep or not key:
+            raise UsageError(f"参数格式应为 key=value：{assignment}")
+        if key not in current:
+            raise UsageError(f"未知字段 {key}，可选：{', '.join(sorted(current))}")
+        updates[key] = _coerce(key, text, current[key])
+    return updates
+
+
+def _coerce(key: str, text: str, current: Any) -> Any:
+    if isinstance(current, bool):
+        lowered = text.lower()
+        if lowered in ("true", "1", "yes", "on"):
+            return True
+        if lowered in ("false", "0", "no", "off"):
+            return False
+        raise UsageError(f"{key} 必须是布尔值（true / false）。")
+    if isinstance(current, (int, float)):
+        try:
+            value = float(text)
+        except ValueError as exc:
+            raise UsageError(f"{key} 必须是数字。") from exc
+        return int(value) if isinstance(current, int) and value.is_integer() else value
+    return text
+
+
+def emit(data: Any, as_json: bool) -> None:
+    if as_json:
+        sys.stdout.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+        return
+    if not isinstance(data, dict):
+        data = {"result": data}
+    lines = []
+    for key, value in data.items():
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        lines.append(f"{key}={value}\n")
+    sys.stdout.write("".join(lines))
+
+
+def _run_command(api: GlftApiClient, args: argparse.Namespace) -> Any:
+    if args.command == "metrics":
+        return api.get_dashboard_metrics()
+    if args.command == "engine":
+        return api.engine_start() if args.action == "start" else api.engine_stop()
+    if args.command == "export-pnl":
+        path = api.download_pnl_csv(args.output, compression=args.compression)
+        return {"path": str(path), "bytes": path.stat().st_size}
+    if args.command == "alerts":
+        return {"ids": api.mark_alerts_read(args.ids)}
+    if args.command == "risk":
+        if args.action == "status":
+            return api.get_risk_status()
+        limits = api.get_risk_limits()
+        if args.action == "limits":
+            return limits
+        return api.update_risk_limits({**limits, **parse_assignments(args.assignments, limits)})
+    # strategy
+    params = api.get_strategy_params()
+    if args.action == "show":
+        return params
+    return api.update_strategy_params({**params, **parse_assignments(args.assignments, params)})
+
+
+def _watch_events(
+    api: GlftApiClient, args: argparse.Namespace, transport: httpx.BaseTransport | None = None
+) -> int:
+    """把推送事件逐个写到 stdout 并立即刷新，供看门狗脚本用管道消费。
+
+    token 被拒时订阅线程会停下来等新 token，headless 下没有人会重新登录，所以直接以 EXIT_AUTH 退出。
+    """
+    import queue
+
+    from glft_events import STATE_UNAUTHORIZED, STATE_UNSUPPORTED, EventStream, StreamEvent
+
+    received: queue.Queue[StreamEvent | str] = queue.Queue()
+    stream = EventStream(api.base_url, lambda: api.token, received.put, received.put, transport=transport)
+    stream.start()
+    count = 0
+    try:
+        while args.count is None or count < args.count:
+            item = received.get()
+            if item == STATE_UNSUPPORTED:
+                sys.stderr.write("错误：服务端不支持事件推送。\n")
+                return EXIT_API_ERROR
+            if item == STATE_UNAUTHORIZED:
+                sys.stderr.write("错误：事件推送鉴权失败，token 已失效或无权限。\n")
+                return EXIT_AUTH
+            if isinstance(item, StreamEvent):
+                emit({"id": item.id, "event": item.event, "data": item.data}, args.json)
+                sys.stdout.flush()
+                count += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+    return EXIT_OK
+
+
+def fleet_config_path(path: Path | None) -> Path:
+    if path is None and os.environ.get(ENV_FLEET_CONFIG):
+        path = Path(os.environ[ENV_FLEET_CONFIG])
+    if path is None:
+        raise UsageError(f"未指定 fleet 配置：请通过 --config 或环境变量 {ENV_FLEET_CONFIG} 提供。")
+    return path
+
+
+async def _fleet_action(fleet: Fleet, action: str, fallback: dict[str, str] | None) -> dict[str, dict[str, Any]]:
+    try:
+        logins = await fleet.login_all(fallback)
+        if action == "status":
+            outcomes: dict[str, Any] = {snapshot.name: snapshot for snapshot in await fleet.poll()}
+        else:
+            outcomes = await fleet.broadcast("engine_start" if action == "start" else "engine_stop")
+    finally:
+        await fleet.aclose()
+
+    report: dict[str, dict[str, Any]] = {}
+    for name, login in logins.items():
+        outcome = outcomes[name]
+        if isinstance(login, ApiError):
+            report[name] = {"ok": False, "error": f"登录失败：{login}"}
+        elif isinstance(outcome, ApiError):
+            report[name] = {"ok": False, "error": str(outcome)}
+        elif action == "status":
+            report[name] = {"ok": outcome.error is None, **outcome.to_dict()}
+        else:
+            report[name] = {"ok": True, "result": outcome}
+    return report
+
+
+def _run_fleet(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from glft_fleet import Fleet, load_fleet_config
+
+    try:
+        engines, max_parallel = load_fleet_config(fleet_config_path(args.config))
+        options = transport_options(args)
+        # 只有配置里缺凭据的引擎才需要环境变量 / 凭据文件兜底。
+        fallback = load_credentials(args.credentials) if any(e.credentials is None for e in engines) else None
+    except UsageError as exc:
+        sys.stderr.write(f"错误：{exc}\n")
+        return EXIT_USAGE
+    report = asyncio.run(_fleet_action(Fleet(engines, max_parallel, options=options), args.action, fallback))
+    emit(report, args.json)
+    return EXIT_OK if all(entry["ok"] for entry in report.values()) else EXIT_API_ERROR
+
+
+def run(args: argparse.Namespace) -> int:
+    """执行一条子命令并返回退出码；结果写到 stdout，错误信息写到 stderr。"""
+    if args.command == "fleet":
+        return _run_fleet(args)
+    try:
+        options = transport_options(args)
+    except UsageError as exc:
+        sys.stderr.write(f"错误：{exc}\n")
+        return EXIT_USAGE
+    api = GlftApiClient(base_url=args.api_url, options=options)
+    try:
+        credentials = load_credentials(args.credentials)
+        if "token" in credentials:
+            api.token = credentials["token"]
+        else:
+            api.login(credentials["username"], credentials["password"])
+        if args.command == "alerts" and args.action == "watch":
+            return _watch_events(api, args)
+        emit(_run_command(api, args), args.json)
+        return EXIT_OK
+    except UsageError as exc:
+        sys.stderr.write(f"错误：{exc}\n")
+        return EXIT_USAGE
+    except ApiError as exc:
+        sys.stderr.write(f"请求失败：{exc}\n")
+        return EXIT_AUTH if exc.status_code in (401, 403) else EXIT_API_ERROR
+    finally:
+        api.close()
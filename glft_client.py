@@ -0,0 +1,981 @@
+"""GLFT 后端 API 客户端：同步 / 异步两套接口、响应缓存与接口埋点。
+
+不依赖 rich，headless 子命令只导入本模块即可；asyncio 与 gzip 在首次用到时才导入，压低冷启动耗时。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from glft_metrics import ClientMetrics, endpoint_label
+from glft_records import Alert, Order, Position, Trade, decode_records
+from glft_transport import AsyncResilientTransport, ResilientTransport, TransportOptions
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UsageError(Exception):
+    """命令行参数或配置文件有误（与服务端无关），CLI、fleet 与会话录制共用。"""
+
+
+PNL_EXPORT_CHUNK_BYTES = 64 * 1024
+# 压缩模式下每累积这么多原始字节就写出一个独立的 gzip member / zstd frame，
+# 二者都允许直接拼接，所以中断后可以从最后一个完整分段续传。
+PNL_COMPRESS_SEGMENT_BYTES = 1024 * 1024
+PNL_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# 只缓存变化缓慢的 GET；行情、订单、成交与告警始终直连。
+CACHE_TTL_SECONDS: dict[str, float] = {
+    "/auth/me": 300.0,
+    "/strategy/params": 30.0,
+    "/risk/limits": 30.0,
+    "/risk/status": 2.0,
+    "/keys": 300.0,
+    "/config": 300.0,
+}
+# 写接口 -> 需要失效的 GET 路径前缀；未列出的写接口会清空整个缓存。
+CACHE_INVALIDATIONS: dict[str, tuple[str, ...]] = {
+    "/strategy/params": ("/strategy/params", "/dashboard/metrics"),
+    "/risk/limits": ("/risk/limits", "/risk/status"),
+    "/engine/start": ("/risk/status", "/dashboard/metrics"),
+    "/engine/stop": ("/risk/status", "/dashboard/metrics"),
+    "/keys": ("/keys",),
+    "/config": ("/config",),
+    "/alerts/read": ("/alerts",),
+    "/alerts/{id}/read": ("/alerts",),
+}
+CACHE_MAX_ENTRIES = 128
+# 服务端不支持批量已读时，异步客户端逐条标记的最大并发数。
+MARK_READ_PARALLEL = 8
+BULK_UNSUPPORTED_STATUS = (404, 405)
+
+DEFAULT_PAGE_SIZE = 500
+
+# 按接口单独设置的超时（秒），未列出的接口用客户端的默认超时。延迟敏感的读接口超时更短，
+# 跨地域链路上卡住的请求会更早失败，交给传输层重试 / 对冲，而不是让界面等满 20 秒。
+ENDPOINT_TIMEOUT_SECONDS: dict[str, float] = {
+    "/auth/login": 10.0,
+    "/auth/me": 5.0,
+    "/dashboard/metrics": 5.0,
+    "/risk/status": 5.0,
+    "/risk/limits": 5.0,
+    "/positions": 10.0,
+}
+
+# 缓存的 token 离过期不足这么久时不再使用，直接重新登录，避免刚恢复会话就遇到 401。
+TOKEN_EXPIRY_MARGIN_SECONDS = 60.0
+
+# headless 子命令、fleet 与交互界面共用的凭据来源。
+ENV_TOKEN = "GLFT_TOKEN"
+ENV_USERNAME = "GLFT_USERNAME"
+ENV_PASSWORD = "GLFT_PASSWORD"
+ENV_CREDENTIALS_FILE = "GLFT_CREDENTIALS_FILE"
+
+
+@dataclass(slots=True)
+class _ConditionalEntry:
+    etag: str | None
+    last_modified: str | None
+    raw: bytes
+    data: Any
+
+
+def _pnl_compressor(compression: str | None) -> Callable[[bytes], bytes] | None:
+    if compression is None:
+        return None
+    if compression == "gzip":
+        import gzip
+
+        return gzip.compress
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ApiError("未安装 zstandard，无法使用 zstd 压缩。") from exc
+        return zstandard.ZstdCompressor().compress
+    raise ApiError(f"不支持的压缩格式：{compression}")
+
+
+def partial_download_paths(save_path: Path) -> tuple[Path, Path]:
+    return save_path.with_name(save_path.name + ".part"), save_path.with_name(save_path.name + ".part.json")
+
+
+def pnl_export_compression(save_path: Path) -> str | None:
+    """推断导出路径应使用的压缩格式：优先取断点状态文件里记录的格式，否则按文件后缀判断。"""
+    state_path = partial_download_paths(save_path)[1]
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = None
+    if isinstance(state, dict) and state.get("compression") in (None, *PNL_COMPRESSION_SUFFIXES):
+        return state.get("compression")
+    return next((name for name, suffix in PNL_COMPRESSION_SUFFIXES.items() if save_path.suffix == suffix), None)
+
+
+def _content_total(response: httpx.Response, offset: int) -> int | None:
+    content_range = response.headers.get("content-range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length")
+    return offset + int(length) if length and length.isdigit() else None
+
+
+def _list_params(since: Any, limit: int | None, offset: int) -> dict[str, Any] | None:
+    params: dict[str, Any] = {}
+    if since is not None:
+        params["since"] = since
+    if limit is not None:
+        params["limit"] = limit
+        params["offset"] = offset
+    return params or None
+
+
+def _endpoint_timeouts(timeout: float) -> dict[str, float]:
+    # 调用方给的默认超时更短时（如 fleet）以它为准。
+    return {path: min(seconds, timeout) for path, seconds in ENDPOINT_TIMEOUT_SECONDS.items()}
+
+
+_CacheKey = tuple[str, tuple[tuple[str, Any], ...]]
+_MISS = object()
+
+
+def _cache_key(path: str, params: dict[str, Any] | None) -> _CacheKey:
+    return path, tuple(sorted(params.items())) if params else ()
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class ResponseCache:
+    """按路径设置 TTL 的有界 LRU 响应缓存，相同 GET 并发时只发出一次请求（single-flight）。"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[_CacheKey, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[_CacheKey, _Flight] = {}
+        self._lock = threading.Lock()
+        # 每次失效都递增；加载开始后发生过失效的结果不再写入，避免写后读到旧值。
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def lookup(self, key: _CacheKey) -> Any:
+        with self._lock:
+            return self._lookup_locked(key)
+
+    def _lookup_locked(self, key: _CacheKey) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISS
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return _MISS
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def store(self, key: _CacheKey, value: Any, ttl: float, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefixes: tuple[str, ...] | None = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if prefixes is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0].startswith(prefixes)]:
+                del self._entries[key]
+
+    def get_or_load(self, key: _CacheKey, ttl: float, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._lookup_locked(key)
+            if value is not _MISS:
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        else:
+            self.store(key, flight.value, ttl, generation)
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+
+class TokenCache:
+    """把 access token 及其过期时刻保存在仅当前用户可读写（0600）的文件里，重启后 token 未过期即可免登录。
+
+    文件对其他用户可读时视为不可信，直接忽略；服务端没有给出过期时间的 token 只在本进程内使用，不落盘。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path.expanduser()
+
+    def load(self) -> dict[str, Any] | None:
+        """返回 {"access_token", "expires_at", "username"}；文件不存在、损坏、权限过宽或 token 将过期时返回 None。"""
+        try:
+            if os.name == "posix" and self.path.stat().st_mode & 0o077:
+                return None
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or not data.get("access_token"):
+            return None
+        try:
+            expires_at = float(data["expires_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if expires_at - TOKEN_EXPIRY_MARGIN_SECONDS <= time.time():
+            return None
+        return {"access_token": str(data["access_token"]), "expires_at": expires_at, "username": data.get("username")}
+
+    def save(self, token: str, expires_at: float | None, username: str | None = None) -> None:
+        if expires_at is None:
+            self.clear()
+            return
+        parent = self.path.parent
+        parent.mkdir(parents=True, exist_ok=True)
+        # 目录通常已由 LocalStore 按默认权限建好，mkdir 的 mode 对它不起作用，这里显式收紧到 0700；
+        # 目录不归当前用户时改不了，保持原样，文件本身仍是 0600。
+        if os.name == "posix" and parent.stat().st_mode & 0o077:
+            try:
+                parent.chmod(0o700)
+            except OSError:
+                pass
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        # 先以 0600 创建临时文件再原子替换，token 任何时刻都不会以默认权限出现在磁盘上。
+        temp_path.unlink(missing_ok=True)
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"access_token": token, "expires_at": expires_at, "username": username}, fh)
+        os.replace(temp_path, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def load_credentials(path: Path | None) -> dict[str, str]:
+    """凭据优先级：环境变量中的 token > 环境变量中的账号密码 > 凭据文件。"""
+    token = os.environ.get(ENV_TOKEN)
+    if token:
+        return {"token": token}
+    username, password = os.environ.get(ENV_USERNAME), os.environ.get(ENV_PASSWORD)
+    if username and password:
+        return {"username": username, "password": password}
+
+    if path is None and os.environ.get(ENV_CREDENTIALS_FILE):
+        path = Path(os.environ[ENV_CREDENTIALS_FILE])
+    if path is None:
+        raise UsageError(
+            f"未提供凭据：请设置 {ENV_TOKEN}，或 {ENV_USERNAME} / {ENV_PASSWORD}，或通过 --credentials 指定凭据文件。"
+        )
+    try:
+        data = json.loads(path.expanduser().read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise UsageError(f"无法读取凭据文件 {path}：{exc}") from exc
+    if isinstance(data, dict) and data.get("token"):
+        return {"token": str(data["token"])}
+    if isinstance(data, dict) and data.get("username") and data.get("password"):
+        return {"username": str(data["username"]), "password": str(data["password"])}
+    raise UsageError(f"凭据文件 {path} 中缺少 token 或 username / password。")
+
+
+_ORDER_DECODER = partial(decode_records, Order)
+_TRADE_DECODER = partial(decode_records, Trade)
+_POSITION_DECODER = partial(decode_records, Position)
+_ALERT_DECODER = partial(decode_records, Alert)
+
+
+class _ApiClientBase:
+    """同步 / 异步客户端共用的鉴权头构造、响应解析、响应缓存与接口埋点。"""
+
+    def __init__(self, cache: ResponseCache | None = None, metrics: ClientMetrics | None = None) -> None:
+        self._token: str | None = None
+        # 登录响应带 expires_in 时记录的过期时刻（epoch 秒），供 TokenCache 持久化。
+        self.token_expires_at: float | None = None
+        self.cache = cache if cache is not None else ResponseCache()
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+
+    @property
+    def token(self) -> str | None:
+        return self._token
+
+    @token.setter
+    def token(self, value: str | None) -> None:
+        self._token = value
+
+    def clear_token(self) -> None:
+        self._token = None
+        self.token_expires_at = None
+        self.cache.invalidate()
+
+    def _accept_login(self, result: dict[str, Any]) -> None:
+        self._token = result["access_token"]
+        expires_in = result.get("expires_in")
+        self.token_expires_at = time.time() + float(expires_in) if expires_in else None
+
+    @staticmethod
+    def _cache_ttl(method: str, path: str) -> float | None:
+        return CACHE_TTL_SECONDS.get(path) if method == "GET" else None
+
+    def _invalidate_after_write(self, path: str) -> None:
+        # 按归一化后的路径查表（/alerts/12/read -> /alerts/{id}/read）；表里没有的写接口清空全部缓存。
+        self.cache.invalidate(CACHE_INVALIDATIONS.get(endpoint_label(path)))
+
+    def _auth_headers(self, auth_required: bool) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if auth_required:
+            if not self._token:
+                raise ApiError("当前未登录，请先登录。", status_code=401)
+            headers["Authorization"] = f"Bearer {self._token}"
+        return headers
+
+    @staticmethod
+    def _parse_response(response: httpx.Response, decoder: Callable[[bytes], Any] | None = None) -> Any:
+        if response.status_code >= 400:
+            detail = response.text
+            try:
+                data = response.json()
+                if isinstance(data, dict) and "detail" in data:
+                    detail = str(data["detail"])
+            except Exception:
+                detail = response.text
+            raise ApiError(detail, status_code=response.status_code)
+
+        content_type = response.headers.get("content-type", "")
+        if "application/json" in content_type:
+            if decoder is None:
+                return response.json()
+            try:
+                return decoder(response.content)
+            except (TypeError, ValueError) as exc:
+                raise ApiError(f"服务端返回的数据格式无效：{exc}") from exc
+        return response.text
+
+    def _decode(
+        self,
+        path: str,
+        started: float,
+        response: httpx.Response,
+        decoder: Callable[[bytes], Any] | None = None,
+    ) -> Any:
+        """解析响应，同时记录该接口的往返耗时、响应字节数、解码耗时与是否出错。"""
+        received = time.perf_counter()
+        error = True
+        try:
+            result = self._parse_response(response, decoder)
+            error = False
+            return result
+        finally:
+            self.metrics.observe_request(
+                path, received - started, len(response.content), time.perf_counter() - received, error
+            )
+
+
+class GlftApiClient(_ApiClientBase):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 20.0,
+        cache: ResponseCache | None = None,
+        metrics: ClientMetrics | None = None,
+        transport: httpx.BaseTransport | None = None,
+        options: TransportOptions | None = None,
+    ) -> None:
+        super().__init__(cache, metrics)
+        normalized_base_url = base_url.rstrip("/")
+        self.base_url = normalized_base_url
+        if transport is None:
+            transport = ResilientTransport(options, self.metrics)
+        self._http = httpx.Client(base_url=normalized_base_url, timeout=timeout, transport=transport)
+        self._timeouts = _endpoint_timeouts(timeout)
+        self._conditional: dict[str, _ConditionalEntry] = {}
+        # 鉴权请求返回 401 时调用，返回新 token 后原请求重发一次；返回 None 则照常抛出 401。
+        self.reauthenticate: Callable[[], str | None] | None = None
+        self._reauth_lock = threading.Lock()
+        self._reauth_thread: int | None = None
+
+    def close(self) -> None:
+        self._http.close()
+
+    def renew_token(self, stale: str | None) -> str | None:
+        """401 后取得新 token。并发请求同时遇到 401 时只重新鉴权一次，其余直接用新 token 重发。"""
+        if self.reauthenticate is None or self._reauth_thread == threading.get_ident():
+            return None
+        with self._reauth_lock:
+            if self._token and self._token != stale:
+                return self._token
+            self._reauth_thread = threading.get_ident()
+            try:
+                token = self.reauthenticate()
+            finally:
+                self._reauth_thread = None
+            if token:
+                self._token = token
+            return token
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        headers: dict[str, str],
+        params: dict[str, Any] | None = None,
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            timeout = self._timeouts.get(path, httpx.USE_CLIENT_DEFAULT)
+            response = self._http.request(
+                method=method, url=path, json=payload, headers=headers, params=params, timeout=timeout
+            )
+            if response.status_code == 401 and "Authorization" in headers:
+                token = self.renew_token(headers["Authorization"].removeprefix("Bearer "))
+                if token:
+                    headers["Authorization"] = f"Bearer {token}"
+                    response = self._http.request(
+                        method=method, url=path, json=payload, headers=headers, params=params, timeout=timeout
+                    )
+            return response
+        except httpx.RequestError as exc:
+            self.metrics.observe_request(path, time.perf_counter() - started, error=True)
+            raise ApiError(f"网络请求失败：{exc}") from exc
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None = None,
+        auth_required: bool = True,
+        params: dict[str, Any] | None = None,
+        decoder: Callable[[bytes], Any] | None = None,
+    ) -> Any:
+        def fetch() -> Any:
+            headers = self._auth_headers(auth_required)
+            started = time.perf_counter()
+            response = self._send(method, path, payload, headers, params)
+            return self._decode(path, started, response, decoder)
+
+        ttl = self._cache_ttl(method, path) if decoder is None else None
+        if ttl is not None:
+            return self.cache.get_or_load(_cache_key(path, params), ttl, fetch)
+        if method == "GET":
+            return fetch()
+        # 写请求失败也可能已部分生效，所以无论成败都失效相关缓存。
+        try:
+            return fetch()
+        finally:
+            self._invalidate_after_write(path)
+
+    def _conditional_get(self, path: str) -> tuple[Any, bool]:
+        """带 ETag / Last-Modified 校验的 GET，返回 (数据, 是否有变化)；未变化时跳过 JSON 解码。"""
+        headers = self._auth_headers(True)
+        cached = self._conditional.get(path)
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        started = time.perf_counter()
+        response = self._send("GET", path, None, headers)
+        if cached is not None:
+            # 服务端不支持校验头时，退化为比较原始字节，同样可以省掉解码。
+            if response.status_code == 304 or (response.status_code < 400 and response.content == cached.raw):
+                self.metrics.observe_request(path, time.perf_counter() - started, len(response.content))
+                return cached.data, False
+
+        data = self._decode(path, started, response)
+        self._conditional[path] = _ConditionalEntry(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            raw=response.content,
+            data=data,
+        )
+        return data, True
+
+    def login(self, username: str, password: str) -> dict[str, Any]:
+        result = self._request(
+            "POST",
+            "/auth/login",
+            payload={"username": username, "password": password},
+            auth_required=False,
+        )
+        self._accept_login(result)
+        return result
+
+    def get_me(self) -> dict[str, Any]:
+        return self._request("GET", "/auth/me")
+
+    def get_dashboard_metrics(self) -> dict[str, Any]:
+        return self._request("GET", "/dashboard/metrics")
+
+    def poll_dashboard_metrics(self) -> tuple[dict[str, Any], bool]:
+        return self._conditional_get("/dashboard/metrics")
+
+    def get_orders(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+        return self._request("GET", "/orders", params=_list_params(since, limit, offset))
+
+    def get_trades(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+        return self._request("GET", "/trades", params=_list_params(since, limit, offset))
+
+    def get_positions(self) -> list[dict[str, Any]]:
+        return self._request("GET", "/positions")
+
+    def get_order_records(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[Order]:
+        return self._request("GET", "/orders", params=_list_params(since, limit, offset), decoder=_ORDER_DECODER)
+
+    def get_trade_records(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[Trade]:
+        return self._request("GET", "/trades", params=_list_params(since, limit, offset), decoder=_TRADE_DECODER)
+
+    def get_position_records(self) -> list[Position]:
+        return self._request("GET", "/positions", decoder=_POSITION_DECODER)
+
+    def get_alert_records(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[Alert]:
+        return self._request("GET", "/alerts", params=_list_params(since, limit, offset), decoder=_ALERT_DECODER)
+
+    def get_strategy_params(self) -> dict[str, Any]:
+        return self._request("GET", "/strategy/params")
+
+    def update_strategy_params(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self._request("POST", "/strategy/params", payload=payload)
+
+    def get_risk_status(self) -> dict[str, Any]:
+        return self._request("GET", "/risk/status")
+
+    def get_risk_limits(self) -> dict[str, Any]:
+        return self._request("GET", "/risk/limits")
+
+    def update_risk_limits(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self._request("POST", "/risk/limits", payload=payload)
+
+    def engine_start(self) -> dict[str, Any]:
+        return self._request("POST", "/engine/start")
+
+    def engine_stop(self) -> dict[str, Any]:
+        return self._request("POST", "/engine/stop")
+
+    def get_keys(self) -> dict[str, Any]:
+        return self._request("GET", "/keys")
+
+    def save_keys(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self._request("POST", "/keys", payload=payload)
+
+    def get_config(self) -> dict[str, Any]:
+        return self._request("GET", "/config")
+
+    def update_config(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self._request("POST", "/config", payload=payload)
+
+    def get_alerts(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+        return self._request("GET", "/alerts", params=_list_params(since, limit, offset))
+
+    def mark_alert_read(self, alert_id: int) -> dict[str, Any]:
+        return self._request("POST", f"/alerts/{alert_id}/read")
+
+    def mark_alerts_read(self, alert_ids: Iterable[int]) -> list[int]:
+        """一次请求批量标记已读，返回已标记的 ID；服务端没有批量接口时在同一条长连接上逐条标记。"""
+        ids = sorted(set(alert_ids))
+        if not ids:
+            return []
+        try:
+            return self._request("POST", "/alerts/read", payload={"ids": ids})["ids"]
+        except ApiError as exc:
+            if exc.status_code not in BULK_UNSUPPORTED_STATUS:
+                raise
+        for alert_id in ids:
+            self.mark_alert_read(alert_id)
+        return ids
+
+    def iter_pages(
+        self,
+        fetch: Callable[..., list[dict[str, Any]]],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        since: Any = None,
+        offset: int = 0,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """按 limit/offset 逐页请求列表接口；服务端忽略分页参数返回整表时，改为在本地切片。"""
+        previous_first: dict[str, Any] | None = None
+        while True:
+            page = fetch(since=since, limit=page_size, offset=offset)
+            if len(page) > page_size:
+                for start in range(offset, len(page), page_size):
+                    yield page[start:start + page_size]
+                return
+            # 整表恰好等于一页时无法从长度判断，靠“下一页与上一页相同”识别。
+            if not page or page[0] == previous_first:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            previous_first = page[0]
+            offset += len(page)
+
+    def iter_orders(self, page_size: int = DEFAULT_PAGE_SIZE, since: Any = None) -> Iterator[dict[str, Any]]:
+        return chain.from_iterable(self.iter_pages(self.get_orders, page_size, since))
+
+    def iter_trades(self, page_size: int = DEFAULT_PAGE_SIZE, since: Any = None) -> Iterator[dict[str, Any]]:
+        return chain.from_iterable(self.iter_pages(self.get_trades, page_size, since))
+
+    def iter_alerts(self, page_size: int = DEFAULT_PAGE_SIZE, since: Any = None) -> Iterator[dict[str, Any]]:
+        return chain.from_iterable(self.iter_pages(self.get_alerts, page_size, since))
+
+    def export_pnl_csv(self) -> str:
+        result = self._request("GET", "/reports/pnl.csv")
+        if isinstance(result, str):
+            return result
+        raise ApiError("服务端未返回有效的 CSV 数据。")
+
+    def download_pnl_csv(
+        self,
+        save_path: Path,
+        compression: str | None = None,
+        on_progress: Callable[[int, int | None], None] | None = None,
+    ) -> Path:
+        """分块流式写盘导出 PnL CSV，中断后再次调用会通过 HTTP Range 从断点续传。"""
+        compress = _pnl_compressor(compression)
+        part_path, state_path = partial_download_paths(save_path)
+
+        # raw_offset 是已落盘的原始 CSV 字节数，written 是 .part 文件中对应的有效长度。
+        raw_offset, written, etag = 0, 0, None
+        if part_path.exists():
+            try:
+                state = json.loads(state_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = None
+            if state is not None and state.get("compression") == compression:
+                etag = state.get("etag")
+                if compress is None:
+                    raw_offset = written = part_path.stat().st_size
+                else:
+                    raw_offset, written = int(state["raw"]), int(state["written"])
+
+        headers = self._auth_headers(True)
+        headers["Accept-Encoding"] = "identity"
+        if raw_offset:
+            headers["Range"] = f"bytes={raw_offset}-"
+            if etag:
+                headers["If-Range"] = etag
+
+        def save_state() -> None:
+            state_path.write_text(
+                json.dumps({"compression": compression, "etag": etag, "raw": raw_offset, "written": written}),
+                encoding="utf-8",
+            )
+
+        received = resumed_from = raw_offset
+        started = time.perf_counter()
+        error = True
+        try:
+            with self._http.stream("GET", "/reports/pnl.csv", headers=headers) as response:
+                if response.status_code == 416 and raw_offset:
+                    # 断点已覆盖完整文件，只差最后的改名。
+                    part_path.replace(save_path)
+                    state_path.unlink(missing_ok=True)
+                    error = False
+                    return save_path
+                if response.status_code >= 400:
+                    response.read()
+                    self._parse_response(response)
+                if response.status_code != 206:
+                    raw_offset = written = received = 0
+
+                total = _content_total(response, raw_offset)
+                etag = response.headers.get("etag")
+                save_path.parent.mkdir(parents=True, exist_ok=True)
+                with part_path.open("r+b" if written else "wb") as fh:
+                    fh.truncate(written)
+                    fh.seek(written)
+                    save_state()
+                    buffer = bytearray()
+                    for chunk in response.iter_bytes(PNL_EXPORT_CHUNK_BYTES):
+                        received += len(chunk)
+                        if compress is None:
+                            fh.write(chunk)
+                            raw_offset = written = received
+                        else:
+                            buffer += chunk
+                            if len(buffer) >= PNL_COMPRESS_SEGMENT_BYTES:
+                                written += fh.write(compress(bytes(buffer)))
+                                raw_offset = received
+                                buffer.clear()
+                                fh.flush()
+                                save_state()
+                        if on_progress is not None:
+                            on_progress(received, total)
+                    if buffer:
+                        written += fh.write(compress(bytes(buffer)))
+                        raw_offset = received
+            error = False
+        except httpx.RequestError as exc:
+            if compress is not None and part_path.exists():
+                save_state()
+            raise ApiError(f"下载中断（已保存 {raw_offset} 字节，重新导出同一路径可续传）：{exc}") from exc
+        finally:
+            # 成功、HTTP 错误与网络中断都记一笔；字节数只算本次实际收到的部分。
+            self.metrics.observe_request(
+                "/reports/pnl.csv", time.perf_counter() - started, received - resumed_from, error=error
+            )
+
+        part_path.replace(save_path)
+        state_path.unlink(missing_ok=True)
+        return save_path
+
+
+class AsyncGlftApiClient(_ApiClientBase):
+    """基于 httpx.AsyncClient 的异步客户端，方法与 GlftApiClient 一一对应，便于并发拉取多个接口。"""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 20.0,
+        cache: ResponseCache | None = None,
+        metrics: ClientMetrics | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        options: TransportOptions | None = None,
+    ) -> None:
+        super().__init__(cache, metrics)
+        normalized_base_url = base_url.rstrip("/")
+        if transport is None:
+            transport = AsyncResilientTransport(options, self.metrics)
+        self._http = httpx.AsyncClient(base_url=normalized_base_url, timeout=timeout, transport=transport)
+        self._timeouts = _endpoint_timeouts(timeout)
+        self._inflight: dict[_CacheKey, asyncio.Future[Any]] = {}
+        # 鉴权请求返回 401 时用这组账号密码在事件循环里重新登录，原请求重发一次；为 None 则照常抛出 401。
+        self.credentials: tuple[str, str] | None = None
+        self._renew_lock: asyncio.Lock | None = None
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def renew_token(self, stale: str | None) -> str | None:
+        """401 后取得新 token。并发请求同时遇到 401 时只登录一次，其余等锁后直接用新 token 重发。"""
+        if self.credentials is None:
+            return None
+        if self._renew_lock is None:
+            import asyncio
+
+            self._renew_lock = asyncio.Lock()
+        async with self._renew_lock:
+            if self._token and self._token != stale:
+                return self._token
+            try:
+                await self.login(*self.credentials)
+            except ApiError:
+                return None
+            return self._token
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None = None,
+        auth_required: bool = True,
+        params: dict[str, Any] | None = None,
+        decoder: Callable[[bytes], Any] | None = None,
+    ) -> Any:
+        ttl = self._cache_ttl(method, path) if decoder is None else None
+        if ttl is None:
+            try:
+                return await self._fetch(method, path, payload, auth_required, params, decoder)
+            finally:
+                if method != "GET":
+                    self._invalidate_after_write(path)
+
+        import asyncio
+
+        key = _cache_key(path, params)
+        value = self.cache.lookup(key)
+        if value is not _MISS:
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        generation = self.cache.generation
+        task = asyncio.ensure_future(self._fetch(method, path, payload, auth_required, params))
+        self._inflight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+        self.cache.store(key, value, ttl, generation)
+        return value
+
+    async def _fetch(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        auth_required: bool,
+        params: dict[str, Any] | None,
+        decoder: Callable[[bytes], Any] | None = None,
+    ) -> Any:
+        headers = self._auth_headers(auth_required)
+        started = time.perf_counter()
+        try:
+            timeout = self._timeouts.get(path, httpx.USE_CLIENT_DEFAULT)
+            response = await self._http.request(
+                method=method, url=path, json=payload, headers=headers, params=params, timeout=timeout
+            )
+            if response.status_code == 401 and "Authorization" in headers:
+                token = await self.renew_token(headers["Authorization"].removeprefix("Bearer "))
+                if token:
+                    headers["Authorization"] = f"Bearer {token}"
+                    response = await self._http.request(
+                        method=method, url=path, json=payload, headers=headers, params=params, timeout=timeout
+                    )
+        except httpx.RequestError as exc:
+            self.metrics.observe_request(path, time.perf_counter() - started, error=True)
+            raise ApiError(f"网络请求失败：{exc}") from exc
+        return self._decode(path, started, response, decoder)
+
+    async def login(self, username: str, password: str) -> dict[str, Any]:
+        result = await self._request(
+            "POST",
+            "/auth/login",
+            payload={"username": username, "password": password},
+            auth_required=False,
+        )
+        self._accept_login(result)
+        return result
+
+    async def get_me(self) -> dict[str, Any]:
+        return await self._request("GET", "/auth/me")
+
+    async def get_dashboard_metrics(self) -> dict[str, Any]:
+        return await self._request("GET", "/dashboard/metrics")
+
+    async def get_orders(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+        return await self._request("GET", "/orders", params=_list_params(since, limit, offset))
+
+    async def get_trades(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+        return await self._request("GET", "/trades", params=_list_params(since, limit, offset))
+
+    async def get_positions(self) -> list[dict[str, Any]]:
+        return await self._request("GET", "/positions")
+
+    async def get_order_records(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[Order]:
+        return await self._request("GET", "/orders", params=_list_params(since, limit, offset), decoder=_ORDER_DECODER)
+
+    async def get_trade_records(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[Trade]:
+        return await self._request("GET", "/trades", params=_list_params(since, limit, offset), decoder=_TRADE_DECODER)
+
+    async def get_position_records(self) -> list[Position]:
+        return await self._request("GET", "/positions", decoder=_POSITION_DECODER)
+
+    async def get_alert_records(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[Alert]:
+        return await self._request("GET", "/alerts", params=_list_params(since, limit, offset), decoder=_ALERT_DECODER)
+
+    async def get_strategy_params(self) -> dict[str, Any]:
+        return await self._request("GET", "/strategy/params")
+
+    async def update_strategy_params(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return await self._request("POST", "/strategy/params", payload=payload)
+
+    async def get_risk_status(self) -> dict[str, Any]:
+        return await self._request("GET", "/risk/status")
+
+    async def get_risk_limits(self) -> dict[str, Any]:
+        return await self._request("GET", "/risk/limits")
+
+    async def update_risk_limits(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return await self._request("POST", "/risk/limits", payload=payload)
+
+    async def engine_start(self) -> dict[str, Any]:
+        return await self._request("POST", "/engine/start")
+
+    async def engine_stop(self) -> dict[str, Any]:
+        return await self._request("POST", "/engine/stop")
+
+    async def get_keys(self) -> dict[str, Any]:
+        return await self._request("GET", "/keys")
+
+    async def save_keys(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return await self._request("POST", "/keys", payload=payload)
+
+    async def get_config(self) -> dict[str, Any]:
+        return await self._request("GET", "/config")
+
+    async def update_config(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return await self._request("POST", "/config", payload=payload)
+
+    async def get_alerts(self, since: Any = None, limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+        return await self._request("GET", "/alerts", params=_list_params(since, limit, offset))
+
+    async def mark_alert_read(self, alert_id: int) -> dict[str, Any]:
+        return await self._request("POST", f"/alerts/{alert_id}/read")
+
+    async def mark_alerts_read(self, alert_ids: Iterable[int]) -> list[int]:
+        """同 GlftApiClient.mark_alerts_read；回退到逐条标记时并发发出，并发数不超过 MARK_READ_PARALLEL。"""
+        import asyncio
+
+        ids = sorted(set(alert_ids))
+        if not ids:
+            return []
+        try:
+            return (await self._request("POST", "/alerts/read", payload={"ids": ids}))["ids"]
+        except ApiError as exc:
+            if exc.status_code not in BULK_UNSUPPORTED_STATUS:
+                raise
+        semaphore = asyncio.Semaphore(MARK_READ_PARALLEL)
+
+        async def mark(alert_id: int) -> None:
+            async with semaphore:
+                await self.mark_alert_read(alert_id)
+
+        await asyncio.gather(*(mark(alert_id) for alert_id in ids))
+        return ids
+
+    async def export_pnl_csv(self) -> str:
+        result = await self._request("GET", "/reports/pnl.csv")
+        if isinstance(result, str):
+            return result
+        raise ApiError("服务端未返回有效的 CSV 数据。")
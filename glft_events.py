@@ -0,0 +1,195 @@
+"""告警与引擎状态的推送订阅（server-sent events）。
+
+后台线程与服务端保持一条 GET /events/stream 长连接，事件到达即回调，不再轮询 /alerts。
+断线后按指数退避加随机抖动重连，并带上 Last-Event-ID，由服务端补发断线期间错过的事件。
+token 被拒（401）时不再拿同一个 token 重连，而是等到拿到新 token 为止。
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import socket
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+EVENTS_PATH = "/events/stream"
+RECONNECT_MIN_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30.0
+# 服务端空闲时定期发心跳注释，超过这么久一个字节都没收到就认为连接已死，主动重连。
+STREAM_READ_TIMEOUT_SECONDS = 30.0
+
+# 连接状态，交给 on_state 回调。
+STATE_CONNECTED = "connected"
+STATE_RECONNECTING = "reconnecting"
+STATE_UNSUPPORTED = "unsupported"
+STATE_UNAUTHORIZED = "unauthorized"
+
+
+@dataclass(slots=True)
+class StreamEvent:
+    id: str | None
+    event: str
+    data: Any
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[tuple[str | None, str, str, int | None]]:
+    """按 SSE 规范把文本行解析为 (id, event, data, retry)。
+
+    空行结束一条事件；以冒号开头的行是注释（心跳）；id 在后续事件中沿用，直到被新的 id 覆盖。
+    只带 retry 字段、没有 data 的事件也会产出，data 为空串。
+    """
+    last_id: str | None = None
+    event = ""
+    data: list[str] = []
+    retry: int | None = None
+    for line in lines:
+        if not line:
+            if data or retry is not None:
+                yield last_id, event or "message", "\n".join(data), retry
+            event, data, retry = "", [], None
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+        if field == "data":
+            data.append(value)
+        elif field == "event":
+            event = value
+        elif field == "id" and "\0" not in value:
+            last_id = value
+        elif field == "retry" and value.isdigit():
+            retry = int(value)
+
+
+class EventStream:
+    """在后台线程里订阅事件流。on_event / on_state 在该线程中调用，回调里不要做耗时操作。
+
+    token_provider 每次建立连接时调用一次，重新登录后重连即使用新 token；返回 None 时暂停订阅直到拿到 token。
+    服务端返回 401 时报告 unauthorized，先调用 renew_token(被拒的 token) 尝试续期，之后同样暂停，
+    直到 token_provider 返回一个不同的 token（例如用户在主线程重新登录后）。
+    服务端返回 404 / 405 表示不支持推送，此时报告 unsupported 后退出，不反复重试。
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token_provider: Callable[[], str | None],
+        on_event: Callable[[StreamEvent], None],
+        on_state: Callable[[str], None] | None = None,
+        path: str = EVENTS_PATH,
+        renew_token: Callable[[str], str | None] | None = None,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        self._http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=httpx.Timeout(10.0, read=STREAM_READ_TIMEOUT_SECONDS),
+            transport=transport,
+        )
+        self._token_provider = token_provider
+        self._on_event = on_event
+        self._on_state = on_state
+        self._renew_token = renew_token
+        self._path = path
+        self._stopped = threading.Event()
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self.last_event_id: str | None = None
+        self.state = STATE_RECONNECTING
+        self.reconnects = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="glft-event-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stopped.set()
+        self.interrupt()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._http.close()
+
+    def interrupt(self) -> None:
+        """断开当前连接（订阅线程随后自动重连）。
+
+        在另一个线程里关闭响应不会唤醒阻塞在 recv 上的读取，这里直接对底层 socket 做 shutdown。
+        """
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        if self._on_state is not None:
+            self._on_state(state)
+
+    def _run(self) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        rejected: str | None = None
+        while not self._stopped.is_set():
+            token = self._token_provider()
+            if token is None or token == rejected:
+                self._stopped.wait(RECONNECT_MIN_SECONDS)
+                continue
+            headers = {"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+            if self.last_event_id is not None:
+                headers["Last-Event-ID"] = self.last_event_id
+            try:
+                with self._http.stream("GET", self._path, headers=headers) as response:
+                    if response.status_code in (404, 405):
+                        self._set_state(STATE_UNSUPPORTED)
+                        return
+                    if response.status_code == 401:
+                        rejected = token
+                    if response.status_code == 200:
+                        stream = response.extensions.get("network_stream")
+                        self._socket = stream.get_extra_info("socket") if stream is not None else None
+                        self._set_state(STATE_CONNECTED)
+                        delay = self._consume(response) or RECONNECT_MIN_SECONDS
+            except (httpx.HTTPError, OSError):
+                pass
+            finally:
+                self._socket = None
+            if self._stopped.is_set():
+                return
+            if rejected == token:
+                self._set_state(STATE_UNAUTHORIZED)
+                if self._renew_token is not None:
+                    self._renew_token(token)
+                delay = RECONNECT_MIN_SECONDS
+                continue
+            self._set_state(STATE_RECONNECTING)
+            self.reconnects += 1
+            # 全抖动：多个客户端同时断线时不会在同一时刻一起重连。
+            self._stopped.wait(random.uniform(RECONNECT_MIN_SECONDS, delay))
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    def _consume(self, response: httpx.Response) -> float | None:
+        """读取事件直到连接断开，返回服务端通过 retry 字段建议的重连间隔（秒）。"""
+        retry_seconds: float | None = None
+        for event_id, event, data, retry in parse_sse(response.iter_lines()):
+            if retry is not None:
+                retry_seconds = max(retry / 1000, RECONNECT_MIN_SECONDS)
+            if event_id is not None:
+                self.last_event_id = event_id
+            if not data:
+                continue
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                payload = data
+            self._on_event(StreamEvent(event_id, event, payload))
+        return retry_seconds
@@ -0,0 +1,172 @@
+"""多后端（fleet）模式：按配置文件同时管理多台 GLFT 引擎。
+
+每台引擎一个 AsyncGlftApiClient，所有请求在同一个事件循环里并发发出，并用信号量限制同时进行的引擎数，
+一轮刷新的耗时接近最慢的那台后端，而不是所有后端之和。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from glft_client import ApiError, AsyncGlftApiClient, UsageError
+from glft_transport import TransportOptions
+
+DEFAULT_MAX_PARALLEL = 16
+# 单台后端卡住时不应拖慢整张表，fleet 模式下的请求超时比单机模式短得多。
+FLEET_TIMEOUT_SECONDS = 5.0
+
+
+@dataclass(slots=True)
+class FleetEngine:
+    name: str
+    api_url: str
+    credentials: dict[str, str] | None = None
+
+
+@dataclass(slots=True)
+class EngineSnapshot:
+    name: str
+    metrics: dict[str, Any] | None = None
+    risk: dict[str, Any] | None = None
+    error: str | None = None
+    latency_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "metrics": self.metrics,
+            "risk": self.risk,
+            "error": self.error,
+            "latency_ms": round(self.latency_ms, 3),
+        }
+
+
+def _entry_credentials(entry: dict[str, Any]) -> dict[str, str] | None:
+    if entry.get("token"):
+        return {"token": str(entry["token"])}
+    if entry.get("username") and entry.get("password"):
+        return {"username": str(entry["username"]), "password": str(entry["password"])}
+    return None
+
+
+def load_fleet_config(path: Path) -> tuple[list[FleetEngine], int]:
+    """读取 fleet 配置，返回 (引擎列表, 最大并发数)。
+
+    配置为 JSON：{"max_parallel": 8, "defaults": {"username": ..., "password": ...},
+    "engines": [{"name": ..., "api_url": ..., "token" 或 "username"/"password": ...}]}；
+    也可以直接是引擎数组。引擎未写凭据时取 defaults，仍没有则由调用方统一提供。
+    """
+    try:
+        data = json.loads(path.expanduser().read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise UsageError(f"无法读取 fleet 配置 {path}：{exc}") from exc
+    if isinstance(data, list):
+        data = {"engines": data}
+    if not isinstance(data, dict) or not isinstance(data.get("engines"), list) or not data["engines"]:
+        raise UsageError(f"fleet 配置 {path} 中缺少 engines 列表。")
+
+    defaults = _entry_credentials(data.get("defaults") or {})
+    engines: list[FleetEngine] = []
+    for index, entry in enumerate(data["engines"], start=1):
+        if not isinstance(entry, dict) or not entry.get("api_url"):
+            raise UsageError(f"fleet 配置第 {index} 个引擎缺少 api_url。")
+        name = str(entry.get("name") or entry["api_url"])
+        if any(engine.name == name for engine in engines):
+            raise UsageError(f"fleet 配置中引擎名重复：{name}")
+        engines.append(FleetEngine(name, str(entry["api_url"]), _entry_credentials(entry) or defaults))
+
+    try:
+        max_parallel = int(data.get("max_parallel", DEFAULT_MAX_PARALLEL))
+    except (TypeError, ValueError) as exc:
+        raise UsageError("fleet 配置中的 max_parallel 必须是整数。") from exc
+    return engines, max(1, max_parallel)
+
+
+class Fleet:
+    """一组引擎的并发客户端。所有方法都是协程，须在同一个事件循环里调用。"""
+
+    def __init__(
+        self,
+        engines: list[FleetEngine],
+        max_parallel: int = DEFAULT_MAX_PARALLEL,
+        timeout: float = FLEET_TIMEOUT_SECONDS,
+        options: TransportOptions | None = None,
+    ) -> None:
+        self.engines = engines
+        # 每台引擎各有一套连接池与熔断器，一台后端故障不会拖累其它引擎。
+        self.clients = {
+            engine.name: AsyncGlftApiClient(engine.api_url, timeout=timeout, options=options) for engine in engines
+        }
+        self._semaphore = asyncio.Semaphore(max_parallel)
+
+    def missing_credentials(self) -> list[str]:
+        return [engine.name for engine in self.engines if engine.credentials is None]
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(client.aclose() for client in self.clients.values()))
+
+    async def _fan_out(self, call: Callable[[str, AsyncGlftApiClient], Awaitable[Any]]) -> dict[str, Any]:
+        """对每台引擎并发执行 call(引擎名, 客户端)，返回 引擎名 -> 结果；失败的引擎以 ApiError 占位。"""
+
+        async def bounded(name: str) -> Any:
+            async with self._semaphore:
+                return await call(name, self.clients[name])
+
+        names = list(self.clients)
+        results = await asyncio.gather(*(bounded(name) for name in names), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, ApiError):
+                raise result
+        return dict(zip(names, results))
+
+    async def login_all(self, fallback: dict[str, str] | None = None) -> dict[str, Any]:
+        """并发登录全部引擎；配置里没有凭据的引擎使用 fallback。"""
+        credentials = {engine.name: engine.credentials or fallback for engine in self.engines}
+
+        async def login(name: str, client: AsyncGlftApiClient) -> Any:
+            creds = credentials[name]
+            if creds is None:
+                raise ApiError("未提供凭据。", status_code=401)
+            if "token" in creds:
+                client.token = creds["token"]
+                return await client.get_me()
+            return await client.login(creds["username"], creds["password"])
+
+        return await self._fan_out(login)
+
+    async def poll(self) -> list[EngineSnapshot]:
+        """拉取每台引擎的仪表盘指标与风控状态；同一引擎的两个接口也并发请求。"""
+
+        async def snapshot(name: str, client: AsyncGlftApiClient) -> EngineSnapshot:
+            started = time.perf_counter()
+            metrics, risk = await asyncio.gather(
+                client.get_dashboard_metrics(), client.get_risk_status(), return_exceptions=True
+            )
+            result = EngineSnapshot(name, latency_ms=(time.perf_counter() - started) * 1000)
+            for value in (metrics, risk):
+                if isinstance(value, BaseException) and not isinstance(value, ApiError):
+                    raise value
+            if isinstance(metrics, ApiError) and isinstance(risk, ApiError) and str(metrics) == str(risk):
+                # 未登录、后端不可达时两个接口报同一个错，只显示一次。
+                result.error = str(metrics)
+            else:
+                errors = [
+                    f"{label}：{value}"
+                    for label, value in (("指标", metrics), ("风控", risk))
+                    if isinstance(value, ApiError)
+                ]
+                result.error = "；".join(errors) or None
+            result.metrics = None if isinstance(metrics, ApiError) else metrics
+            result.risk = None if isinstance(risk, ApiError) else risk
+            return result
+
+        return list((await self._fan_out(snapshot)).values())
+
+    async def broadcast(self, method: str, *args: Any) -> dict[str, Any]:
+        """在全部引擎上并发调用同名客户端方法（如 engine_stop），返回每台引擎的结果或 ApiError。"""
+        return await self._fan_out(lambda name, client: getattr(client, method)(*args))
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+# Prometheus 风格的延迟桶上界（秒），同时用于请求与渲染耗时。
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 每个序列保留的最近样本数，用来计算 p50 / p95 / p99。
+SAMPLE_WINDOW = 2048
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    """把路径中的数字 ID 归一化，例如 /alerts/12/read -> /alerts/{id}/read。"""
+    return _ID_SEGMENT.sub("/{id}", path.split("?", 1)[0])
+
+
+def _percentile(sorted_samples: list[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = max(0, math.ceil(q * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+class _Series:
+    __slots__ = ("count", "errors", "total", "buckets", "samples", "bytes", "decode")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.samples: deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.bytes = 0
+        self.decode = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def summary(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 3),
+            "bytes": self.bytes,
+            "decode_ms": round(self.decode * 1000, 3),
+        }
+
+
+class ClientMetrics:
+    """按接口统计请求延迟、传输字节、解码耗时与错误数，并按界面统计渲染耗时。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: dict[str, _Series] = {}
+        self._renders: dict[str, _Series] = {}
+        # 传输层事件（重试、对冲、熔断等）-> 次数。
+        self._transport: dict[str, int] = {}
+
+    def observe_request(
+        self,
+        path: str,
+        seconds: float,
+        nbytes: int = 0,
+        decode_seconds: float = 0.0,
+        error: bool = False,
+    ) -> None:
+        label = endpoint_label(path)
+        with self._lock:
+            series = self._requests.get(label)
+            if series is None:
+                series = self._requests[label] = _Series()
+            series.observe(seconds)
+            series.bytes += nbytes
+            series.decode += decode_seconds
+            if error:
+                series.errors += 1
+
+    def observe_render(self, screen: str, seconds: float) -> None:
+        with self._lock:
+            series = self._renders.get(screen)
+            if series is None:
+                series = self._renders[screen] = _Series()
+            series.observe(seconds)
+
+    def observe_transport(self, event: str) -> None:
+        with self._lock:
+            self._transport[event] = self._transport.get(event, 0) + 1
+
+    def transport_counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._transport.items()))
+
+    def request_summaries(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {label: series.summary() for label, series in sorted(self._requests.items())}
+
+    def render_summaries(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {screen: series.summary() for screen, series in sorted(self._renders.items())}
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            _histogram_lines(
+                lines,
+                "glft_client_request_duration_seconds",
+                "GLFT API 请求耗时",
+                "endpoint",
+                self._requests,
+            )
+            for name, kind, help_text, attr in (
+                ("glft_client_response_bytes_total", "counter", "GLFT API 响应字节数", "bytes"),
+                ("glft_client_decode_seconds_total", "counter", "GLFT API 响应解码耗时", "decode"),
+                ("glft_client_request_errors_total", "counter", "GLFT API 请求失败次数", "errors"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for label, series in sorted(self._requests.items()):
+                    lines.append(f'{name}{{endpoint="{label}"}} {getattr(series, attr)}')
+            _histogram_lines(
+                lines,
+                "glft_tui_render_duration_seconds",
+                "TUI 界面渲染耗时",
+                "screen",
+                self._renders,
+            )
+            if self._transport:
+                name = "glft_client_transport_events_total"
+                lines.append(f"# HELP {name} GLFT API 传输层事件次数（重试、对冲、熔断）")
+                lines.append(f"# TYPE {name} counter")
+                for event, count in sorted(self._transport.items()):
+                    lines.append(f'{name}{{event="{event}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self) -> str:
+        timestamp = time.time()
+        records = [
+            {"ts": timestamp, "kind": "request", "endpoint": label, **summary}
+            for label, summary in self.request_summaries().items()
+        ]
+        records += [
+            {"ts": timestamp, "kind": "render", "screen": screen, **summary}
+            for screen, summary in self.render_summaries().items()
+        ]
+        records += [
+            {"ts": timestamp, "kind": "transport", "event": event, "count": count}
+            for event, count in self.transport_counts().items()
+        ]
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    def dump(self, path: Path, fmt: str) -> Path:
+        """导出到文件：prometheus 原子覆盖写（便于 textfile collector 采集），jsonl 追加写形成时间序列。"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "prometheus":
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(self.to_prometheus(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        elif fmt == "jsonl":
+            with path.open("a", encoding="utf-8") as fh:
+                fh.write(self.to_json_lines())
+        else:
+            raise ValueError(f"不支持的导出格式：{fmt}")
+        return path
+
+
+def _histogram_lines(
+    lines: list[str],
+    name: str,
+    help_text: str,
+    label_name: str,
+    series_by_label: dict[str, _Series],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for label, series in sorted(series_by_label.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, series.buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label_name}="{label}",le="+Inf"}} {series.count}')
+        lines.append(f'{name}_sum{{{label_name}="{label}"}} {series.total}')
+        lines.append(f'{name}_count{{{label_name}="{label}"}} {series.count}')
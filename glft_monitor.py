@@ -0,0 +1,278 @@
+"""本地滑动窗口风控监测：把订单 / 成交流折算成每秒、每分钟速率与库存漂移，对照风控阈值提前预警。
+
+/dashboard/metrics 只给出速率的单次快照，超限与否要靠人盯。这里按事件时间把每个事件计入环形秒桶：
+每个通道（下单、撤单、成交笔数、成交净额）各有 WINDOW_SECONDS 个预分配的桶和一个窗口总和，
+事件到达时只改一个桶和总和，时间推进时只清空滑出窗口的桶，热路径上不创建列表、字典等容器对象。
+速率达到阈值的 WARN_RATIO，或按最近一秒的速度折合成每分钟会超过阈值时，在后端硬限触发前给出本地预警。
+不依赖 rich 与网络，由 glft_app 喂入增量订单 / 成交并展示。
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from glft_records import Order, Trade
+
+WINDOW_SECONDS = 60
+# 占用达到阈值的这个比例给出 warning，达到 CRITICAL_RATIO 给出 critical。
+WARN_RATIO = 0.8
+CRITICAL_RATIO = 0.95
+# 终态订单；其余状态（open / new / partially_filled 等）视为在途。
+CLOSED_STATUSES = frozenset({"filled", "cancelled", "canceled", "rejected", "expired"})
+CANCELLED_STATUSES = frozenset({"cancelled", "canceled"})
+# 在途订单号集合的上限：服务端漏报终态时集合不会无限增长，超过即清空（之后最多把少量订单重复计为新单）。
+OPEN_ORDER_ID_LIMIT = 100_000
+
+# 通道编号。
+ORDERS = 0
+CANCELS = 1
+FILLS = 2
+NOTIONAL = 3
+_CHANNELS = 4
+
+LEVEL_OK = "ok"
+LEVEL_WARNING = "warning"
+LEVEL_CRITICAL = "critical"
+_LEVEL_RANK = {LEVEL_OK: 0, LEVEL_WARNING: 1, LEVEL_CRITICAL: 2}
+
+
+@dataclass(slots=True)
+class LimitStatus:
+    key: str
+    label: str
+    per_second: float
+    per_minute: float
+    value: float
+    limit: float | None
+    # 按最近一秒的速度外推一分钟后的值；库存为当前库存加上一分钟的漂移。
+    projected: float
+    level: str
+
+    @property
+    def headroom(self) -> float | None:
+        return None if self.limit is None else self.limit - self.value
+
+    @property
+    def usage(self) -> float | None:
+        return None if not self.limit else self.value / self.limit
+
+
+@dataclass(slots=True)
+class RiskWarning:
+    key: str
+    level: str
+    message: str
+
+
+def _timestamp(text: str | None) -> float | None:
+    if not text:
+        return None
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return moment.timestamp()
+
+
+class RiskMonitor:
+    """limits 取 get_risk_limits 的返回。库存用 set_inventory 按仪表盘快照校准，之后的成交净额增量累加。
+
+    事件按自身时间戳计入窗口，比窗口头早一个窗口以上的迟到事件丢弃并计数；读数前调用 advance(当前时间)，
+    没有新事件时速率也会随时间回落。
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, Any] | None = None,
+        window_seconds: int = WINDOW_SECONDS,
+    ) -> None:
+        if window_seconds < 2:
+            raise ValueError("监测窗口至少 2 秒。")
+        self.window = window_seconds
+        self._buckets = [array("d", bytes(8 * window_seconds)) for _ in range(_CHANNELS)]
+        self._totals = array("d", bytes(8 * _CHANNELS))
+        self._head = -1
+        self._open_ids: set[Any] = set()
+        self.inventory_usd = 0.0
+        self._inventory_as_of = -math.inf
+        self.events = 0
+        self.late_events = 0
+        self.limits: dict[str, float] = {}
+        self.set_limits(limits or {})
+        # 当前处于预警中的指标 -> 级别，check 只报告新出现或升级的预警。
+        self._active: dict[str, str] = {}
+
+    def set_limits(self, limits: dict[str, Any]) -> None:
+        parsed: dict[str, float] = {}
+        for field in ("max_order_rate_per_min", "max_cancel_rate_per_min", "max_inventory_usd"):
+            try:
+                value = float(limits[field])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if value > 0:
+                parsed[field] = value
+        self.limits = parsed
+
+    def set_inventory(self, inventory_usd: float, as_of: float) -> None:
+        """以服务端快照校准库存；as_of 之后成交的净额继续累加到库存上。"""
+        self.inventory_usd = float(inventory_usd)
+        self._inventory_as_of = as_of
+
+    # ---- 热路径 ----
+
+    def _add(self, channel: int, timestamp: float, value: float) -> None:
+        second = int(timestamp)
+        if second > self._head:
+            self._advance(second)
+        elif second <= self._head - self.window:
+            self.late_events += 1
+            return
+        self._buckets[channel][second % self.window] += value
+        self._totals[channel] += value
+
+    def _advance(self, second: int) -> None:
+        window, head, buckets, totals = self.window, self._head, self._buckets, self._totals
+        if head < 0 or second - head >= window:
+            for channel in range(_CHANNELS):
+                bucket = buckets[channel]
+                for slot in range(window):
+                    bucket[slot] = 0.0
+                totals[channel] = 0.0
+        else:
+            for elapsed in range(head + 1, second + 1):
+                slot = elapsed % window
+                for channel in range(_CHANNELS):
+                    bucket = buckets[channel]
+                    totals[channel] -= bucket[slot]
+                    bucket[slot] = 0.0
+            if second // window != head // window:
+                # 每转一圈按桶重算一次总和，消除浮点加减反复累积的误差。
+                for channel in range(_CHANNELS):
+                    totals[channel] = math.fsum(buckets[channel])
+        self._head = second
+
+    def advance(self, now: float) -> None:
+        """把窗口推进到 now（早于窗口头时不动），滑出窗口的事件不再计入速率。"""
+        if int(now) > self._head:
+            self._advance(int(now))
+
+    def observe_order(self, order_id: Any, status: str, timestamp: float) -> None:
+        """计入一次订单状态：首次见到的订单计一次下单，转为撤单时再计一次撤单。"""
+        self.events += 1
+        seen = order_id in self._open_ids
+        if status not in CLOSED_STATUSES:
+            if not seen:
+                if len(self._open_ids) >= OPEN_ORDER_ID_LIMIT:
+                    self._open_ids.clear()
+                self._open_ids.add(order_id)
+                self._add(ORDERS, timestamp, 1.0)
+            return
+        if seen:
+            self._open_ids.discard(order_id)
+        else:
+            self._add(ORDERS, timestamp, 1.0)
+        if status in CANCELLED_STATUSES:
+            self._add(CANCELS, timestamp, 1.0)
+
+    def observe_trade(self, side: str, size: float, price: float, timestamp: float) -> None:
+        """计入一笔成交：买入为正、卖出为负的成交额累加到净额通道与库存上。"""
+        self.events += 1
+        notional = size * price if side == "buy" else -size * price
+        self._add(FILLS, timestamp, 1.0)
+        self._add(NOTIONAL, timestamp, notional)
+        if timestamp > self._inventory_as_of:
+            self.inventory_usd += notional
+
+    # ---- 批量入口与读数 ----
+
+    def observe_orders(self, orders: Iterable[Order]) -> int:
+        """计入一批订单记录，返回计入条数（没有时间戳的记录跳过）。"""
+        count = 0
+        for order in orders:
+            timestamp = _timestamp(order.updated_at)
+            if timestamp is not None:
+                self.observe_order(order.order_id, order.status, timestamp)
+                count += 1
+        return count
+
+    def observe_trades(self, trades: Iterable[Trade]) -> int:
+        count = 0
+        for trade in trades:
+            timestamp = _timestamp(trade.created_at)
+            if timestamp is not None:
+                self.observe_trade(trade.side, trade.size, trade.price, timestamp)
+                count += 1
+        return count
+
+    def per_minute(self, channel: int) -> float:
+        return self._totals[channel] * 60 / self.window
+
+    def per_second(self, channel: int) -> float:
+        """最近一个完整秒内的数量（窗口头所在的秒还在累计中，不算）。"""
+        if self._head < 0:
+            return 0.0
+        return self._buckets[channel][(self._head - 1) % self.window]
+
+    def status(self) -> list[LimitStatus]:
+        """各项指标的当前读数、阈值、余量与预警级别。"""
+        rows = []
+        for key, label, channel, limit_field in (
+            ("order_rate", "下单速率（/分钟）", ORDERS, "max_order_rate_per_min"),
+            ("cancel_rate", "撤单速率（/分钟）", CANCELS, "max_cancel_rate_per_min"),
+        ):
+            per_second, per_minute = self.per_second(channel), self.per_minute(channel)
+            limit = self.limits.get(limit_field)
+            rows.append(LimitStatus(
+                key, label, per_second, per_minute, per_minute, limit, per_second * 60,
+                _level(per_minute, per_second * 60, limit),
+            ))
+        drift_second, drift_minute = self.per_second(NOTIONAL), self.per_minute(NOTIONAL)
+        exposure = abs(self.inventory_usd)
+        projected = abs(self.inventory_usd + drift_minute)
+        limit = self.limits.get("max_inventory_usd")
+        rows.append(LimitStatus(
+            "inventory", "库存（USD，速率为漂移）", drift_second, drift_minute, exposure, limit, projected,
+            _level(exposure, projected, limit),
+        ))
+        fills_second, fills_minute = self.per_second(FILLS), self.per_minute(FILLS)
+        rows.append(LimitStatus(
+            "fill_rate", "成交笔数（/分钟）", fills_second, fills_minute, fills_minute, None, fills_second * 60, LEVEL_OK
+        ))
+        return rows
+
+    def check(self) -> list[RiskWarning]:
+        """返回新出现或升级的预警；指标回落后解除，再次越线会重新报告。"""
+        warnings = []
+        for row in self.status():
+            previous = self._active.get(row.key, LEVEL_OK)
+            if row.level == LEVEL_OK:
+                self._active.pop(row.key, None)
+                continue
+            self._active[row.key] = row.level
+            if _LEVEL_RANK[row.level] > _LEVEL_RANK[previous]:
+                warnings.append(RiskWarning(row.key, row.level, _describe(row)))
+        return warnings
+
+
+def _level(value: float, projected: float, limit: float | None) -> str:
+    if limit is None:
+        return LEVEL_OK
+    if value >= limit * CRITICAL_RATIO:
+        return LEVEL_CRITICAL
+    if value >= limit * WARN_RATIO or projected >= limit:
+        return LEVEL_WARNING
+    return LEVEL_OK
+
+
+def _describe(row: LimitStatus) -> str:
+    name = row.label.split("（")[0]
+    if row.value >= row.limit * WARN_RATIO:
+        return f"{name} {row.value:,.0f} 已达阈值 {row.limit:,.0f} 的 {row.usage:.0%}，余量 {row.headroom:,.0f}"
+    if row.key == "inventory":
+        return f"{name}按最近一分钟漂移 {row.per_minute:+,.0f}，一分钟后约 {row.projected:,.0f}，超过阈值 {row.limit:,.0f}"
+    return f"{name}按最近一秒折合 {row.projected:,.0f}/分钟，将超过阈值 {row.limit:,.0f}"
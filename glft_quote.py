@@ -0,0 +1,178 @@
+"""GLFT 报价的本地预览与参数扫描。
+
+报价使用 Guéant–Lehalle–Fernandez-Tapia 的闭式近似（库存为 q 手时）：
+
+    δ_bid(q) = ln(1 + γ/k) / γ + (2q + 1) / 2 · ω
+    δ_ask(q) = ln(1 + γ/k) / γ - (2q - 1) / 2 · ω
+    ω = sqrt(σ² γ / (2 A k) · (1 + γ/k)^(1 + k/γ))
+
+这是 T → ∞ 的渐近解，time_horizon_seconds 不进入公式。σ、1/k 与报价偏移使用同一价格单位；
+一手按 order_cap_usd 计，库存网格的上限为 inventory_cap_usd。
+
+参数扫描把缓存的成交价序列当作中间价回放：每一步按当前库存挂出买卖价，下一笔成交价穿过挂单即视为成交。
+回放对全部候选参数向量化（逐步推进、每步处理整组候选），候选很多时再按进程池分块并行。
+依赖 numpy（可选依赖，未安装时仅报价预览与参数扫描不可用）。
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Any
+
+import numpy as np
+
+SWEEP_FIELDS = ("gamma", "sigma", "A", "k")
+# 候选数超过该值才启用进程池，小网格在进程间搬数据反而更慢。
+SWEEP_PARALLEL_THRESHOLD = 512
+DEFAULT_INVENTORY_LEVELS = 11
+
+
+def glft_offsets(gamma: Any, sigma: Any, A: Any, k: Any, q: Any) -> tuple[np.ndarray, np.ndarray]:
+    """返回 (买价偏移, 卖价偏移)，参数可以是标量或可广播的数组。"""
+    gamma, sigma, A, k, q = (np.asarray(value, dtype=np.float64) for value in (gamma, sigma, A, k, q))
+    base = np.log1p(gamma / k) / gamma
+    omega = np.sqrt(sigma * sigma * gamma / (2 * A * k) * (1 + gamma / k) ** (1 + k / gamma))
+    return base + (2 * q + 1) / 2 * omega, base - (2 * q - 1) / 2 * omega
+
+
+def quote_grid(params: dict[str, Any], levels: int = DEFAULT_INVENTORY_LEVELS) -> list[dict[str, float]]:
+    """在 [-inventory_cap_usd, inventory_cap_usd] 上取 levels 个库存点，逐点给出报价偏移与半价差。"""
+    cap_usd = float(params["inventory_cap_usd"])
+    lot_usd = float(params["order_cap_usd"])
+    if lot_usd <= 0:
+        raise ValueError("order_cap_usd 必须为正数。")
+    inventory_usd = np.linspace(-cap_usd, cap_usd, max(2, levels))
+    q = inventory_usd / lot_usd
+    bid, ask = glft_offsets(params["gamma"], params["sigma"], params["A"], params["k"], q)
+    return [
+        {
+            "inventory_usd": float(inv),
+            "lots": float(lots),
+            "bid_offset": float(b),
+            "ask_offset": float(a),
+            "half_spread": float((a + b) / 2),
+            "skew": float((a - b) / 2),
+        }
+        for inv, lots, b, a in zip(inventory_usd, q, bid, ask)
+    ]
+
+
+def parse_range(text: str) -> np.ndarray:
+    """解析扫描区间：`start:stop:count` 为等距取点，`a,b,c` 为显式取值，单个数字为固定值。"""
+    text = text.strip()
+    if ":" in text:
+        start, stop, count = text.split(":")
+        if int(count) < 1:
+            raise ValueError("取点数至少为 1。")
+        return np.linspace(float(start), float(stop), int(count))
+    values = [float(part) for part in text.split(",") if part.strip()]
+    if not values:
+        raise ValueError("取值为空。")
+    return np.array(values)
+
+
+def candidate_grid(ranges: dict[str, Sequence[float]]) -> dict[str, np.ndarray]:
+    """把各参数的取值做笛卡尔积，返回 字段 -> 候选数组（长度相同；任一参数没有取值时为空数组）。"""
+    combos = np.array(list(product(*(ranges[field] for field in SWEEP_FIELDS))), dtype=np.float64)
+    combos = combos.reshape(-1, len(SWEEP_FIELDS))
+    return {field: combos[:, index] for index, field in enumerate(SWEEP_FIELDS)}
+
+
+def replay(
+    prices: np.ndarray,
+    candidates: dict[str, np.ndarray],
+    lot_usd: float,
+    cap_usd: float,
+) -> dict[str, np.ndarray]:
+    """用成交价序列回放全部候选参数，返回每个候选的 pnl、成交数、成交率、最大回撤与期末库存（手）。"""
+    gamma, sigma, A, k = (candidates[field] for field in SWEEP_FIELDS)
+    count = len(gamma)
+    base = np.log1p(gamma / k) / gamma
+    omega = np.sqrt(sigma * sigma * gamma / (2 * A * k) * (1 + gamma / k) ** (1 + k / gamma))
+    cap_lots = cap_usd / lot_usd
+
+    lots = np.zeros(count)
+    position = np.zeros(count)
+    cash = np.zeros(count)
+    peak = np.zeros(count)
+    drawdown = np.zeros(count)
+    posted = np.zeros(count)
+    fills = np.zeros(count)
+    for mid, following in zip(prices[:-1].tolist(), prices[1:].tolist()):
+        size = lot_usd / mid
+        bid = mid - (base + (lots + 0.5) * omega)
+        ask = mid + (base - (lots - 0.5) * omega)
+        can_buy = lots < cap_lots
+        can_sell = lots > -cap_lots
+        bought = can_buy & (following <= bid)
+        sold = can_sell & (following >= ask)
+        lots += bought
+        lots -= sold
+        position += size * (bought.astype(np.float64) - sold)
+        cash += size * (np.where(sold, ask, 0.0) - np.where(bought, bid, 0.0))
+        posted += can_buy
+        posted += can_sell
+        fills += bought
+        fills += sold
+        equity = cash + position * following
+        np.maximum(peak, equity, out=peak)
+        np.maximum(drawdown, peak - equity, out=drawdown)
+
+    last = prices[-1] if len(prices) else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill_rate = np.where(posted > 0, fills / posted, 0.0)
+    return {
+        "pnl": cash + position * last,
+        "fills": fills,
+        "fill_rate": fill_rate,
+        "max_drawdown": drawdown,
+        "final_lots": lots,
+    }
+
+
+def _replay_chunk(args: tuple[np.ndarray, dict[str, np.ndarray], float, float]) -> dict[str, np.ndarray]:
+    return replay(*args)
+
+
+def sweep(
+    prices: Sequence[float] | np.ndarray,
+    ranges: dict[str, Sequence[float]],
+    lot_usd: float,
+    cap_usd: float,
+    workers: int | None = None,
+) -> dict[str, np.ndarray]:
+    """对参数网格做回放扫描，结果按 pnl 从高到低排序，字段包含候选参数本身与 replay 的各项指标。"""
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < 2:
+        raise ValueError("用于回放的成交价不足两笔。")
+    if lot_usd <= 0:
+        raise ValueError("order_cap_usd 必须为正数。")
+    candidates = candidate_grid(ranges)
+    count = len(candidates["gamma"])
+    if not count:
+        raise ValueError("参数网格为空。")
+    if min(values.min() for values in candidates.values()) <= 0:
+        raise ValueError("gamma、sigma、A、k 都必须为正数。")
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and count >= SWEEP_PARALLEL_THRESHOLD:
+        bounds = np.linspace(0, count, min(workers, count) + 1).astype(np.intp)
+        chunks = [
+            (prices, {field: values[start:stop] for field, values in candidates.items()}, lot_usd, cap_usd)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        # TUI 里还跑着推送订阅与预取线程，fork 会把它们持有的锁一起复制过去，子进程可能卡死；
+        # 改用 forkserver（Windows 上没有，退回 spawn）从干净的进程派生。
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context(method)) as pool:
+            parts = list(pool.map(_replay_chunk, chunks))
+        metrics = {field: np.concatenate([part[field] for part in parts]) for field in parts[0]}
+    else:
+        metrics = replay(prices, candidates, lot_usd, cap_usd)
+
+    order = np.argsort(-metrics["pnl"], kind="stable")
+    return {field: values[order] for field, values in {**candidates, **metrics}.items()}
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, fields
+from operator import itemgetter
+from typing import Any, ClassVar, TypeVar
+
+R = TypeVar("R", bound="Record")
+
+# 取值种类很少的字符串字段，驻留后同值共享一个对象。
+INTERNED_FIELDS = frozenset({"symbol", "side", "status", "level"})
+
+
+class Record:
+    """紧凑记录的公共行为：从 JSON 键值对直接构造，未知字段丢弃。"""
+
+    __slots__ = ()
+    FIELDS: ClassVar[tuple[str, ...]] = ()
+    INTERNED: ClassVar[tuple[str, ...]] = ()
+    _values: ClassVar[Callable[[dict[str, Any]], tuple[Any, ...]]]
+    _interned_indexes: ClassVar[tuple[int, ...]] = ()
+
+    @classmethod
+    def from_json_object(cls: type[R], obj: dict[str, Any]) -> R | dict[str, Any]:
+        """json.loads 的 object_hook：每解析完一个对象就立即转成记录，对象 dict 随即释放。"""
+        # 快速路径：字段齐全时按位置构造，比关键字参数快一倍左右；多出的字段直接忽略。
+        try:
+            values = list(cls._values(obj))
+        except KeyError:
+            return cls._from_partial(obj)
+        for index in cls._interned_indexes:
+            value = values[index]
+            if value.__class__ is str:
+                values[index] = sys.intern(value)
+        return cls(*values)
+
+    @classmethod
+    def _from_partial(cls: type[R], obj: dict[str, Any]) -> R | dict[str, Any]:
+        for key in cls.INTERNED:
+            value = obj.get(key)
+            if value.__class__ is str:
+                obj[key] = sys.intern(value)
+        known = {key: value for key, value in obj.items() if key in cls.FIELDS}
+        try:
+            return cls(**known)
+        except TypeError:
+            # 缺少必填字段：多半是嵌套对象，原样交回给外层。
+            return obj
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+@dataclass(slots=True)
+class Order(Record):
+    order_id: Any
+    symbol: str = ""
+    side: str = ""
+    price: float = 0.0
+    size: float = 0.0
+    status: str = ""
+    updated_at: str | None = None
+
+
+@dataclass(slots=True)
+class Trade(Record):
+    trade_id: Any
+    order_id: Any = None
+    symbol: str = ""
+    side: str = ""
+    price: float = 0.0
+    size: float = 0.0
+    fee: float = 0.0
+    realized_pnl: float = 0.0
+    created_at: str | None = None
+
+
+@dataclass(slots=True)
+class Position(Record):
+    symbol: str
+    size: float = 0.0
+    entry_price: float = 0.0
+    mark_price: float = 0.0
+    unrealized_pnl: float = 0.0
+
+
+@dataclass(slots=True)
+class Alert(Record):
+    id: int
+    level: str = ""
+    message: str = ""
+    is_read: bool = False
+    created_at: str | None = None
+
+
+for _cls in (Order, Trade, Position, Alert):
+    _cls.FIELDS = tuple(field.name for field in fields(_cls))
+    _cls.INTERNED = tuple(name for name in _cls.FIELDS if name in INTERNED_FIELDS)
+    _cls._values = itemgetter(*_cls.FIELDS)
+    _cls._interned_indexes = tuple(_cls.FIELDS.index(name) for name in _cls.INTERNED)
+del _cls
+
+
+def decode_records(cls: type[R], content: bytes | str) -> list[R]:
+    """把响应体中的 JSON 数组直接解码为记录列表。
+
+    每个对象解析完就转成记录，不会同时持有整批 dict；低基数字符串字段做了驻留。
+    """
+    records = json.loads(content, object_hook=cls.from_json_object)
+    if not isinstance(records, list) or not all(isinstance(record, cls) for record in records):
+        raise ValueError(f"响应不是 {cls.__name__} 记录数组。")
+    return records
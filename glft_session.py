@@ -0,0 +1,457 @@
+"""会话录制与离线回放。
+
+--record 时把每个 API 请求与响应（含时间戳）追加写入会话文件；--replay 时用内存映射读取该文件，
+不连接后端即可驱动同一套界面，并可定位到会话中的任意时刻，查看当时每个接口最近一次返回的内容。
+
+文件格式（小端）：
+  会话文件：魔数 GLFTSES1、<I 长度> + 会话信息 JSON（录制的 base_url），之后是若干帧。
+    每帧为 <I 压缩长度><d 时间戳><Q 请求键哈希><Q 路径哈希>，后接 zlib 压缩的
+    <I 元数据长度> + 元数据 JSON + 响应体。
+  索引文件（会话文件名 + .idx）：每帧一条定长记录 <Q 帧偏移><d 时间戳><Q 请求键哈希><Q 路径哈希>。
+索引可由会话文件重建；进程中断留下的半帧在回放时忽略，继续录制前截掉。
+启用本地存储时订单 / 成交界面展示的是本地库里的行，请求里只有增量，所以另把展示的行录成一帧
+（键为 GET <base>/_store/<表名>），回放时优先用它还原当时的界面。
+密码、token、API 密钥等字段在写盘前替换为 ***。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from glft_client import UsageError
+
+MAGIC = b"GLFTSES1"
+_LENGTH = struct.Struct("<I")
+_FRAME = struct.Struct("<IdQQ")
+_ENTRY = struct.Struct("<QdQQ")
+_KEY_FIELD_OFFSET = 16
+_PATH_FIELD_OFFSET = 24
+COMPRESS_LEVEL = 1
+REDACTED_FIELDS = frozenset({
+    "password",
+    "access_token",
+    "refresh_token",
+    "token",
+    "api_key",
+    "api_secret",
+    "private_key",
+    "smtp_password",
+})
+_REDACT_MARKERS = tuple(f'"{name}"'.encode() for name in REDACTED_FIELDS)
+# 流式下载的响应体可能有数 GB，只记录请求与状态，不保存内容。
+SKIP_BODY_PATHS = ("/reports/pnl.csv",)
+_DROPPED_HEADERS = frozenset({"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"})
+REPLAY_TOKEN = "replay"
+STORE_VIEW_PATH = "/_store/"
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _keys(request: httpx.Request) -> tuple[str, str]:
+    """(请求键, 路径键)：请求键含查询串，路径键只有方法与路径，回放时精确匹配不到再用路径键兜底。"""
+    return f"{request.method} {request.url.raw_path.decode('ascii')}", f"{request.method} {request.url.path}"
+
+
+def _store_view_request(base_url: str, table: str) -> httpx.Request:
+    return httpx.Request("GET", f"{base_url}{STORE_VIEW_PATH}{table}")
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: "***" if key in REDACTED_FIELDS and item else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _redact_body(body: bytes) -> bytes:
+    # 先做字节查找，绝大多数响应不含敏感字段，不必解析。
+    if not any(marker in body for marker in _REDACT_MARKERS):
+        return body
+    try:
+        return json.dumps(_redact(json.loads(body)), ensure_ascii=False).encode("utf-8")
+    except ValueError:
+        return body
+
+
+def _read_header(data: bytes | mmap.mmap, path: Path) -> tuple[dict[str, Any], int]:
+    """校验魔数并读出会话信息，返回 (会话信息, 第一帧的偏移)。"""
+    if data[:len(MAGIC)] != MAGIC or len(data) < len(MAGIC) + _LENGTH.size:
+        raise UsageError(f"{path} 不是会话录制文件。")
+    (length,) = _LENGTH.unpack_from(data, len(MAGIC))
+    start = len(MAGIC) + _LENGTH.size
+    try:
+        info = json.loads(bytes(data[start:start + length]))
+    except ValueError as exc:
+        raise UsageError(f"{path} 的会话信息已损坏：{exc}") from exc
+    return info, start + length
+
+
+def _sync_index(data: mmap.mmap, first_frame: int, index_file: Path) -> int:
+    """补齐索引中缺失的帧（索引丢失或录制中断时），返回完整帧的结束偏移。"""
+    size = len(data)
+    indexed = index_file.stat().st_size // _ENTRY.size if index_file.exists() else 0
+    offset = first_frame
+    if indexed:
+        with index_file.open("rb") as fh:
+            fh.seek((indexed - 1) * _ENTRY.size)
+            last_offset = _ENTRY.unpack(fh.read(_ENTRY.size))[0]
+        if last_offset + _FRAME.size <= size:
+            offset = last_offset + _FRAME.size + _FRAME.unpack_from(data, last_offset)[0]
+        if last_offset + _FRAME.size > size or offset > size:
+            # 索引指向了会话文件之外（文件被截断过），整体重建。
+            indexed, offset = 0, first_frame
+    missing = bytearray()
+    while offset + _FRAME.size <= size:
+        length, timestamp, key_hash, path_hash = _FRAME.unpack_from(data, offset)
+        if offset + _FRAME.size + length > size:
+            break
+        missing += _ENTRY.pack(offset, timestamp, key_hash, path_hash)
+        offset += _FRAME.size + length
+    if missing or not index_file.exists():
+        with index_file.open("r+b" if index_file.exists() else "wb") as fh:
+            fh.truncate(indexed * _ENTRY.size)
+            fh.seek(0, 2)
+            fh.write(missing)
+    return offset
+
+
+class SessionRecorder:
+    """把请求 / 响应追加写入会话文件；可被多个客户端（同步 / 异步）共用。"""
+
+    def __init__(self, path: Path, base_url: str) -> None:
+        path = path.expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        base_url = base_url.rstrip("/")
+        if path.exists() and path.stat().st_size:
+            with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                info, first_frame = _read_header(data, path)
+                if info.get("base_url") != base_url:
+                    raise UsageError(f"{path} 录制自 {info.get('base_url')}，不能追加 {base_url} 的请求。")
+                end = _sync_index(data, first_frame, index_path(path))
+            with path.open("r+b") as fh:
+                fh.truncate(end)
+        else:
+            info = json.dumps({"base_url": base_url, "started_at": time.time()}).encode("utf-8")
+            path.write_bytes(MAGIC + _LENGTH.pack(len(info)) + info)
+            index_path(path).write_bytes(b"")
+        self.base_url = base_url
+        self._data = path.open("ab")
+        self._index = index_path(path).open("ab")
+        self._lock = threading.Lock()
+        self._last_time = 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+    @staticmethod
+    def skips_body(request: httpx.Request) -> bool:
+        return request.url.path.endswith(SKIP_BODY_PATHS)
+
+    def record(self, request: httpx.Request, response: httpx.Response, body: bytes | None) -> None:
+        key, path_key = _keys(request)
+        request_body = _redact_body(request.content) if request.content else b""
+        meta = {
+            "method": request.method,
+            "url": str(request.url),
+            "key": key,
+            "request_body": request_body.decode("utf-8", "replace") or None,
+            "status": response.status_code,
+            "headers": {
+                name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS
+            },
+            "body_skipped": body is None,
+        }
+        encoded = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        blob = zlib.compress(_LENGTH.pack(len(encoded)) + encoded + _redact_body(body or b""), COMPRESS_LEVEL)
+        key_hash, path_hash = _hash(key), _hash(path_key)
+        with self._lock:
+            # 墙钟可能被回拨，时间戳保持单调，回放时才能按时间二分。
+            timestamp = self._last_time = max(time.time(), self._last_time)
+            offset = self._data.tell()
+            self._data.write(_FRAME.pack(len(blob), timestamp, key_hash, path_hash) + blob)
+            self._data.flush()
+            self._index.write(_ENTRY.pack(offset, timestamp, key_hash, path_hash))
+            self._index.flush()
+
+    def record_store_view(self, table: str, rows: list[dict[str, Any]]) -> None:
+        """把界面从本地存储读出并展示的行录成一帧，回放时由 ReplayTransport.store_view 取回。"""
+        response = httpx.Response(200, json=rows)
+        self.record(_store_view_request(self.base_url, table), response, response.content)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    def __init__(self, recorder: SessionRecorder, inner: httpx.BaseTransport | None = None) -> None:
+        self._recorder = recorder
+        self._inner = inner or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._inner.handle_request(request)
+        if self._recorder.skips_body(request):
+            self._recorder.record(request, response, None)
+            return response
+        response.read()
+        self._recorder.record(request, response, response.content)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, recorder: SessionRecorder, inner: httpx.AsyncBaseTransport | None = None) -> None:
+        self._recorder = recorder
+        self._inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._inner.handle_async_request(request)
+        if self._recorder.skips_body(request):
+            self._recorder.record(request, response, None)
+            return response
+        await response.aread()
+        self._recorder.record(request, response, response.content)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    index: int
+    timestamp: float
+    method: str
+    url: str
+    key: str
+    status: int
+    headers: dict[str, str]
+    request_body: str | None
+    body: bytes | None
+
+
+class _Timestamps:
+    """索引中时间戳列的只读序列视图，供 bisect 直接在内存映射上二分。"""
+
+    __slots__ = ("_index", "_count")
+
+    def __init__(self, index: mmap.mmap | bytes, count: int) -> None:
+        self._index = index
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position: int) -> float:
+        return _ENTRY.unpack_from(self._index, position * _ENTRY.size)[1]
+
+
+class SessionReader:
+    """以内存映射方式读取会话文件：按时间二分定位，只解压用到的那一帧，打开多 GB 的录制也不需要全量读入。"""
+
+    def __init__(self, path: Path) -> None:
+        path = path.expanduser()
+        try:
+            self._data_file = path.open("rb")
+        except OSError as exc:
+            raise UsageError(f"无法打开会话文件 {path}：{exc}") from exc
+        self.path = path
+        try:
+            self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            self._data_file.close()
+            raise UsageError(f"会话文件 {path} 为空。") from exc
+        info, first_frame = _read_header(self._data, path)
+        self.base_url: str = info.get("base_url", "")
+        # 只读目录下无法补写索引时，直接按会话文件重建到内存里。
+        try:
+            _sync_index(self._data, first_frame, index_path(path))
+            self._index_file = index_path(path).open("rb")
+            self._index: mmap.mmap | bytes = (
+                mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                if index_path(path).stat().st_size
+                else b""
+            )
+        except OSError:
+            self._index_file = None
+            self._index = self._rebuild_in_memory(first_frame)
+        # 索引可能比会话文件多出录制中断时的半帧，以完整帧为准。
+        count = len(self._index) // _ENTRY.size
+        while count and self._frame_end(count - 1) > len(self._data):
+            count -= 1
+        self._count = count
+        self._timestamps = _Timestamps(self._index, count)
+
+    def _rebuild_in_memory(self, first_frame: int) -> bytes:
+        entries = bytearray()
+        offset = first_frame
+        while offset + _FRAME.size <= len(self._data):
+            length, timestamp, key_hash, path_hash = _FRAME.unpack_from(self._data, offset)
+            entries += _ENTRY.pack(offset, timestamp, key_hash, path_hash)
+            offset += _FRAME.size + length
+        return bytes(entries)
+
+    def close(self) -> None:
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        if self._index_file is not None:
+            self._index_file.close()
+        self._data.close()
+        self._data_file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def start(self) -> float:
+        return self._timestamps[0] if self._count else 0.0
+
+    @property
+    def end(self) -> float:
+        return self._timestamps[self._count - 1] if self._count else 0.0
+
+    def _frame_end(self, position: int) -> int:
+        offset = _ENTRY.unpack_from(self._index, position * _ENTRY.size)[0]
+        if offset + _FRAME.size > len(self._data):
+            return offset + _FRAME.size
+        return offset + _FRAME.size + _FRAME.unpack_from(self._data, offset)[0]
+
+    def position(self, at: float) -> int:
+        """时间戳不晚于 at 的帧数，即 at 时刻之前（含）已发生的请求数。"""
+        return bisect_right(self._timestamps, at)
+
+    def timestamp(self, position: int) -> float:
+        return self._timestamps[position]
+
+    def read(self, position: int) -> SessionRecord:
+        offset = _ENTRY.unpack_from(self._index, position * _ENTRY.size)[0]
+        length, timestamp, _, _ = _FRAME.unpack_from(self._data, offset)
+        start = offset + _FRAME.size
+        blob = zlib.decompress(self._data[start:start + length])
+        (meta_length,) = _LENGTH.unpack_from(blob)
+        meta = json.loads(blob[_LENGTH.size:_LENGTH.size + meta_length])
+        return SessionRecord(
+            index=position,
+            timestamp=timestamp,
+            method=meta["method"],
+            url=meta["url"],
+            key=meta["key"],
+            status=meta["status"],
+            headers=meta["headers"],
+            request_body=meta["request_body"],
+            body=None if meta["body_skipped"] else blob[_LENGTH.size + meta_length:],
+        )
+
+    def find(self, key: str, path_key: str | None, at: float) -> SessionRecord | None:
+        """返回 at 时刻（含）之前该请求最近一次的完整响应（跳过 304）；没有精确匹配时按路径键兜底。"""
+        stop = self.position(at)
+        for text, field in ((key, _KEY_FIELD_OFFSET), (path_key, _PATH_FIELD_OFFSET)):
+            if text is None:
+                continue
+            needle = struct.pack("<Q", _hash(text))
+            end = stop * _ENTRY.size
+            while True:
+                # 在索引字节上做 C 层面的反向查找，再校验落点是否正好是该字段。
+                found = self._index.rfind(needle, 0, end)
+                if found < 0:
+                    break
+                end = found + len(needle) - 1
+                if found % _ENTRY.size != field:
+                    continue
+                record = self.read(found // _ENTRY.size)
+                if record.status != 304 and (field == _PATH_FIELD_OFFSET or record.key == key):
+                    return record
+        return None
+
+
+def resolve_seek_target(text: str, reader: SessionReader, current: float) -> float:
+    """把定位输入解析为回放时刻：完整日期时间、当天的 HH:MM:SS、相对秒数（+30 / -5）、#序号、start、end。"""
+    text = text.strip()
+    if text in ("start", "end"):
+        return reader.start if text == "start" else reader.end
+    if text.startswith("#"):
+        try:
+            number = int(text[1:])
+        except ValueError as exc:
+            raise ValueError(f"无效的序号：{text}") from exc
+        if not 1 <= number <= len(reader):
+            raise ValueError(f"序号超出范围（1–{len(reader)}）。")
+        return reader.timestamp(number - 1)
+    if text[:1] in ("+", "-"):
+        try:
+            return current + float(text)
+        except ValueError as exc:
+            raise ValueError(f"无效的相对秒数：{text}") from exc
+    try:
+        if "-" in text:
+            return datetime.fromisoformat(text).timestamp()
+        clock = datetime.strptime(text, "%H:%M:%S" if text.count(":") == 2 else "%H:%M").time()
+    except ValueError as exc:
+        raise ValueError(f"无法识别的时刻：{text}") from exc
+    return datetime.combine(datetime.fromtimestamp(current).date(), clock).timestamp()
+
+
+def _json_response(status: int, data: Any) -> httpx.Response:
+    return httpx.Response(status, json=data)
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """用录制的响应应答请求，不访问网络。at 为当前回放时刻，默认是会话末尾。
+
+    只读：登录直接成功，其它写请求一律拒绝；分页请求（带 offset）找不到录制时按空页返回，分页循环据此结束。
+    """
+
+    def __init__(self, reader: SessionReader) -> None:
+        self.reader = reader
+        self.at = reader.end
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            if request.url.path.endswith("/auth/login"):
+                return _json_response(200, {"access_token": REPLAY_TOKEN, "token_type": "bearer"})
+            return _json_response(403, {"detail": "回放模式为只读，不会向后端发送修改。"})
+        key, path_key = _keys(request)
+        paged = b"offset=" in request.url.query
+        record = self.reader.find(key, None if paged else path_key, self.at)
+        if record is None:
+            if paged:
+                return _json_response(200, [])
+            return _json_response(404, {"detail": "录制中在当前回放时刻之前没有该请求。"})
+        if record.body is None:
+            return _json_response(404, {"detail": "录制时未保存该响应的内容。"})
+        return httpx.Response(record.status, headers=record.headers, content=record.body)
+
+    def store_view(self, table: str) -> list[dict[str, Any]] | None:
+        """录制时界面从本地存储展示的 table 行（当前回放时刻之前最近一次）；录制时未启用本地存储则为 None。"""
+        key, _ = _keys(_store_view_request(self.reader.base_url, table))
+        record = self.reader.find(key, None, self.at)
+        if record is None or record.body is None:
+            return None
+        return json.loads(record.body)
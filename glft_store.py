@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from glft_records import Order, Trade, Record
+
+# 表名 -> (主键字段, 候选游标字段)。游标字段在首次同步时按顺序取第一条记录中存在的那个，
+# 之后固定不变：订单的状态会变化，服务端提供 updated_at 时用它才能拿到状态更新。
+STORE_TABLES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "orders": ("order_id", ("updated_at", "order_id")),
+    "trades": ("trade_id", ("trade_id",)),
+}
+# 游标字段不是主键时（updated_at）同一秒可能有多条更新，增量请求的 since 往回退这么多秒，重叠部分按主键去重。
+CURSOR_OVERLAP_SECONDS = 1
+
+INDEXED_FIELDS = ("symbol", "side", "status")
+RECORD_TYPES: dict[str, type[Record]] = {"orders": Order, "trades": Trade}
+
+
+def _back_off(cursor: Any) -> Any:
+    if isinstance(cursor, (int, float)) and not isinstance(cursor, bool):
+        return cursor - CURSOR_OVERLAP_SECONDS
+    if not isinstance(cursor, str):
+        return cursor
+    try:
+        moment = datetime.fromisoformat(cursor)
+    except ValueError:
+        return cursor
+    text = (moment - timedelta(seconds=CURSOR_OVERLAP_SECONDS)).isoformat()
+    # 保持服务端的写法，字符串比较才与时间先后一致。
+    return text[:-6] + "Z" if cursor.endswith("Z") and text.endswith("+00:00") else text
+
+
+class LocalStore:
+    """订单 / 成交的本地 SQLite 增量存储，按主键去重，按游标增量同步。"""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, cursor_field TEXT, cursor TEXT)"
+        )
+        for table in STORE_TABLES:
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "id TEXT PRIMARY KEY, cursor, symbol TEXT, side TEXT, status TEXT, data TEXT NOT NULL)"
+            )
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_cursor ON {table} (cursor)")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _state(self, table: str) -> tuple[str | None, Any]:
+        row = self._db.execute("SELECT cursor_field, cursor FROM sync_state WHERE name = ?", (table,)).fetchone()
+        if row is None:
+            return None, None
+        return row[0], json.loads(row[1]) if row[1] is not None else None
+
+    def cursor(self, table: str) -> Any:
+        return self._state(table)[1]
+
+    def sync_params(self, table: str) -> dict[str, Any]:
+        """增量同步时附带给服务端的查询参数；首次同步为空，即全量拉取。
+
+        游标不唯一时 since 比游标早 CURSOR_OVERLAP_SECONDS：服务端按“严格大于 since”过滤时，
+        与游标同一秒、但上次同步之后才更新的记录也能取回。
+        """
+        cursor_field, cursor = self._state(table)
+        if cursor is None:
+            return {}
+        if cursor_field != STORE_TABLES[table][0]:
+            cursor = _back_off(cursor)
+        return {"since": cursor}
+
+    def merge(self, table: str, rows: list[dict[str, Any]] | list[Record], since: Any = None) -> Any:
+        """写入一批服务端记录中游标大于 since 的部分，返回其中最大的游标（没有写入时为 None）。
+
+        since 应传本轮同步开始时 sync_params 给出的 since：服务端忽略 since 参数时据此在本地过滤旧记录。
+        这里不推进同步游标，整轮同步完成后再调用 advance，中途失败时下次会从旧游标重来。
+        """
+        key, candidates = STORE_TABLES[table]
+        rows = [row if isinstance(row, dict) else row.to_dict() for row in rows]
+        cursor_field, _ = self._state(table)
+        if cursor_field is None:
+            if not rows:
+                return None
+            # Record.to_dict 会带出值为 None 的字段，只能按实际有值的字段选游标。
+            cursor_field = next((field for field in candidates if rows[0].get(field) is not None), key)
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state (name, cursor_field, cursor) VALUES (?, ?, NULL)",
+                    (table, cursor_field),
+                )
+
+        fresh: list[tuple[Any, ...]] = []
+        newest = None
+        for row in rows:
+            value = row.get(cursor_field)
+            if value is None or (since is not None and value <= since):
+                continue
+            if newest is None or value > newest:
+                newest = value
+            fresh.append((
+                str(row[key]),
+                value,
+                *(None if row.get(field) is None else str(row[field]) for field in INDEXED_FIELDS),
+                json.dumps(row, ensure_ascii=False, separators=(",", ":")),
+            ))
+        if fresh:
+            with self._db:
+                self._db.executemany(
+                    f"INSERT OR REPLACE INTO {table} (id, cursor, symbol, side, status, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    fresh,
+                )
+        return newest
+
+    def advance(self, table: str, cursor: Any) -> None:
+        """把同步游标推进到 cursor；比当前游标旧或为 None 时忽略。"""
+        cursor_field, current = self._state(table)
+        if cursor is None or cursor_field is None or (current is not None and cursor <= current):
+            return
+        with self._db:
+            self._db.execute(
+                "UPDATE sync_state SET cursor = ? WHERE name = ?",
+                (json.dumps(cursor), table),
+            )
+
+    def recent(self, table: str, limit: int = 50) -> list[Any]:
+        rows = self._db.execute(
+            f"SELECT data FROM {table} ORDER BY cursor DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        hook = RECORD_TYPES[table].from_json_object
+        return [json.loads(data, object_hook=hook) for (data,) in rows]
+
+    def trade_prices(self, symbol: str, limit: int) -> list[float]:
+        """某标的最近 limit 笔成交价，按成交先后排列；供参数扫描回放，不必重新拉取。"""
+        rows = self._db.execute(
+            "SELECT json_extract(data, '$.price') FROM trades WHERE symbol = ? ORDER BY cursor DESC LIMIT ?",
+            (symbol, limit),
+        ).fetchall()
+        return [float(price) for (price,) in reversed(rows) if price is not None]
+
+    def count(self, table: str) -> int:
+        return self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
@@ -0,0 +1,208 @@
+"""大结果集的表格视图：只格式化可见窗口，任意列排序，按预建索引筛选。
+
+视图只管“哪些行、什么顺序、当前窗口的文本”，不依赖 rich；翻页交互与渲染由 glft_app 负责。
+构造时对低基数字段（标的、方向、状态、级别）各建一份 取值 -> 行号 的倒排表，筛选只查倒排表与候选行，
+不扫描全表；每列的排序名次在首次按该列排序时计算并缓存，之后切换排序方向或筛选条件都不再整表排序。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from itertools import compress
+from typing import Any
+
+from glft_records import Record
+
+INDEX_FIELDS = ("symbol", "side", "status", "level")
+DEFAULT_PAGE_ROWS = 20
+# 筛选结果超过全表的这个比例时，沿缓存的整表顺序挑出命中行，比对命中行重新排序更快。
+_MASK_SORT_RATIO = 0.1
+
+
+def _column(rows: Sequence[Record | dict[str, Any]], field: str) -> list[Any]:
+    return [getattr(row, field, None) if isinstance(row, Record) else row.get(field) for row in rows]
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    # None 排在最后；数字与字符串混排时按字符串比较。
+    if value is None:
+        return (2, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value))
+
+
+def _matching_keys(keys: Sequence[Any], text: str) -> list[Any]:
+    """在某字段的全部取值里找匹配 text 的：先精确匹配（不区分大小写），没有再按子串匹配。"""
+    lowered = text.lower()
+    exact = [key for key in keys if key is not None and str(key).lower() == lowered]
+    return exact or [key for key in keys if key is not None and lowered in str(key).lower()]
+
+
+class TableView:
+    """rows 保持传入顺序作为默认顺序；columns 为 [(字段, 列标题)]。"""
+
+    def __init__(
+        self,
+        rows: Sequence[Record | dict[str, Any]],
+        columns: list[tuple[str, str]],
+        page_rows: int = DEFAULT_PAGE_ROWS,
+    ) -> None:
+        self.rows = rows
+        self.columns = columns
+        self.page_rows = max(1, page_rows)
+        self.offset = 0
+        self.sort_field: str | None = None
+        self.descending = False
+        self.filters: dict[str, list[Any]] = {}
+
+        self._values: dict[str, list[Any]] = {}
+        # 字段 -> 取值 -> 升序行号。
+        self._index: dict[str, dict[Any, list[int]]] = {}
+        for field, _ in columns:
+            if field not in INDEX_FIELDS:
+                continue
+            postings: dict[Any, list[int]] = {}
+            for position, value in enumerate(self._column(field)):
+                postings.setdefault(value, []).append(position)
+            self._index[field] = postings
+        # 字段 -> 按该列升序排列的行号，以及每行在其中的名次。
+        self._orders: dict[str, list[int]] = {}
+        self._ranks: dict[str, list[int]] = {}
+        self._visible: Sequence[int] = range(len(rows))
+
+    @property
+    def indexed_fields(self) -> tuple[str, ...]:
+        return tuple(self._index)
+
+    @property
+    def total(self) -> int:
+        return len(self.rows)
+
+    def __len__(self) -> int:
+        return len(self._visible)
+
+    def _column(self, field: str) -> list[Any]:
+        values = self._values.get(field)
+        if values is None:
+            values = self._values[field] = _column(self.rows, field)
+        return values
+
+    def resolve_field(self, name: str) -> str:
+        """把字段名或列标题解析为字段名。"""
+        for field, label in self.columns:
+            if name in (field, label):
+                return field
+        raise ValueError(f"没有名为 {name} 的列，可选：{'、'.join(label for _, label in self.columns)}")
+
+    def parse_filter(self, text: str) -> dict[str, list[Any]]:
+        """解析筛选条件：`symbol=BTC side=sell`，也可以只写取值（`BTC sell open`），按索引字段的取值自动归属。
+
+        同一字段的多个条件取并集（`ETH,SOL`），不同字段之间取交集。
+        """
+        criteria: dict[str, list[Any]] = {}
+        for term in text.replace("，", " ").replace(",", " ").split():
+            name, sep, value = term.partition("=")
+            if sep:
+                field = self.resolve_field(name.strip())
+                if field not in self._index:
+                    raise ValueError(f"只能按以下字段筛选：{'、'.join(self._index) or '无'}")
+                keys = _matching_keys(list(self._index[field]), value.strip())
+            else:
+                field, keys = next(
+                    ((field, keys) for field, postings in self._index.items()
+                     if (keys := _matching_keys(list(postings), term))),
+                    ("", []),
+                )
+            if not keys:
+                raise ValueError(f"没有匹配 {term} 的记录。")
+            merged = criteria.setdefault(field, [])
+            merged.extend(key for key in keys if key not in merged)
+        return criteria
+
+    def set_filter(self, criteria: dict[str, list[Any]]) -> None:
+        self.filters = criteria
+        self._refresh()
+
+    def sort_by(self, field: str, descending: bool | None = None) -> None:
+        """按 field 排序；不指定方向时，对同一列再次排序即切换升 / 降序。"""
+        if descending is None:
+            descending = not self.descending if field == self.sort_field else False
+        self.sort_field, self.descending = field, descending
+        self._refresh()
+
+    def _rank(self, field: str) -> list[int]:
+        ranks = self._ranks.get(field)
+        if ranks is None:
+            values = self._column(field)
+            try:
+                order = sorted(range(len(values)), key=values.__getitem__)
+            except TypeError:
+                order = sorted(range(len(values)), key=lambda position: _sort_key(values[position]))
+            ranks = [0] * len(order)
+            for rank, position in enumerate(order):
+                ranks[position] = rank
+            self._orders[field], self._ranks[field] = order, ranks
+        return ranks
+
+    def _filtered(self) -> list[int] | None:
+        if not self.filters:
+            return None
+        # 以命中行最少的字段为基准，其余字段只对这些候选行逐个核对取值，不展开其它字段的倒排表。
+        base_field = min(
+            self.filters,
+            key=lambda field: sum(len(self._index[field][key]) for key in self.filters[field]),
+        )
+        postings = [self._index[base_field][key] for key in self.filters[base_field]]
+        base = postings[0] if len(postings) == 1 else sorted(position for part in postings for position in part)
+        positions = base
+        for field, keys in self.filters.items():
+            if field != base_field:
+                values, accepted = self._column(field), set(keys)
+                positions = [position for position in positions if values[position] in accepted]
+        return positions
+
+    def _refresh(self) -> None:
+        positions = self._filtered()
+        if self.sort_field is None:
+            self._visible = range(len(self.rows)) if positions is None else positions
+        else:
+            ranks = self._rank(self.sort_field)
+            order = self._orders[self.sort_field]
+            if positions is None:
+                self._visible = order
+            elif len(positions) > len(order) * _MASK_SORT_RATIO:
+                mask = bytearray(len(order))
+                for position in positions:
+                    mask[position] = 1
+                self._visible = list(compress(order, map(mask.__getitem__, order)))
+            else:
+                self._visible = sorted(positions, key=ranks.__getitem__)
+        self.offset = 0
+
+    def scroll(self, rows: int) -> None:
+        self.offset = max(0, min(self.offset + rows, len(self._visible) - self.page_rows))
+
+    def home(self) -> None:
+        self.offset = 0
+
+    def end(self) -> None:
+        self.offset = max(0, len(self._visible) - self.page_rows)
+
+    def window(self) -> list[list[str]]:
+        """当前窗口内各行的单元格文本；只格式化这 page_rows 行。"""
+        count = len(self._visible)
+        start, stop = self.offset, min(self.offset + self.page_rows, count)
+        if self.descending:
+            positions = [self._visible[count - 1 - index] for index in range(start, stop)]
+        else:
+            positions = list(self._visible[start:stop])
+        fields = [field for field, _ in self.columns]
+        rows = self.rows
+        return [
+            [
+                str(getattr(row, field, "") if isinstance(row, Record) else row.get(field, ""))
+                for field in fields
+            ]
+            for row in map(rows.__getitem__, positions)
+        ]
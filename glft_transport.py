@@ -0,0 +1,407 @@
+"""HTTP 传输层：连接池上限、可选 HTTP/2、GET 的抖动指数退避重试、熔断器与延迟敏感读接口的对冲请求。
+
+作为 httpx 的自定义 transport 挂在 GlftApiClient / AsyncGlftApiClient 下面，对上层透明。只有 GET 会被重试或对冲；
+登录、启停引擎、改参数等写请求无论成败都只发一次，熔断期间直接失败、不会发出，因此不存在重复执行写操作的可能。
+熔断器按后端统计连续失败（网络错误或 5xx），达到阈值后在冷却期内直接拒绝请求，冷却期满放行一个试探请求，成功即恢复。
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from urllib.request import getproxies, proxy_bypass_environment
+
+import httpx
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    from glft_metrics import ClientMetrics
+
+# 延迟敏感、可以安全重复发送的读接口，开启对冲时只对这些路径生效。
+HEDGED_PATHS = ("/dashboard/metrics", "/risk/status")
+# 网关 / 负载均衡返回的这些状态通常是暂时的，GET 可以重试；500 多半是服务端缺陷，重试无益。
+RETRY_STATUSES = frozenset({502, 503, 504})
+# 服务端要求等待超过这么久（Retry-After）时不再重试，直接把响应交给上层。
+RETRY_AFTER_MAX_SECONDS = 5.0
+# 连接、读写超时与连接被对端断开都可以重试；协议不支持、代理错误等重试也不会好转。
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+# 传输层事件名，计入 ClientMetrics.observe_transport。
+EVENT_RETRY = "retry"
+EVENT_HEDGE = "hedge"
+EVENT_HEDGE_WIN = "hedge_win"
+EVENT_BREAKER_OPEN = "breaker_open"
+EVENT_SHORT_CIRCUIT = "short_circuit"
+
+
+@dataclass(slots=True)
+class TransportOptions:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    # 需要安装 h2（pip install 'httpx[http2]'）；开启后同一后端的并发请求复用一条连接。
+    http2: bool = False
+    # GET 失败后最多重试的次数；第 n 次重试前等待 [0, min(retry_backoff_max, retry_backoff * 2**n)] 内的随机时长。
+    retries: int = 2
+    retry_backoff: float = 0.2
+    retry_backoff_max: float = 2.0
+    # 连续失败这么多次后熔断，冷却 breaker_cooldown 秒后放行试探请求；阈值为 0 时不熔断。
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 10.0
+    # hedge_paths 中的 GET 超过 hedge_after 秒仍未返回时再发一份相同请求，取先返回的；None 表示不对冲。
+    hedge_after: float | None = None
+    hedge_paths: tuple[str, ...] = HEDGED_PATHS
+    # 显式代理（如 http://proxy:3128），优先于环境变量；为 None 且 trust_env 时按 HTTP(S)_PROXY / ALL_PROXY / NO_PROXY。
+    proxy: str | None = None
+    trust_env: bool = True
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class CircuitOpenError(httpx.TransportError):
+    """熔断期间请求未发出即失败。不在可重试的异常之列。"""
+
+
+class CircuitBreaker:
+    """连续失败计数熔断器，线程安全，可由同一后端的同步与异步 transport 共用。
+
+    状态：closed（正常）→ open（冷却期内拒绝一切请求）→ half-open（放行一个试探请求，成功则 closed，失败重新 open）。
+    """
+
+    def __init__(self, threshold: int, cooldown: float, metrics: ClientMetrics | None = None) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._probing else "open"
+
+    def before(self) -> None:
+        """请求发出前调用；熔断中抛出 CircuitOpenError。"""
+        if self._opened_at is None:
+            return
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining <= 0 and not self._probing:
+                self._probing = True
+                return
+        if self._metrics is not None:
+            self._metrics.observe_transport(EVENT_SHORT_CIRCUIT)
+        if remaining > 0:
+            raise CircuitOpenError(f"后端连续 {self.failures} 次请求失败，已熔断，约 {math.ceil(remaining)} 秒后重试。")
+        raise CircuitOpenError("后端连续请求失败，已熔断，正在试探后端是否恢复。")
+
+    def record(self, status_code: int) -> None:
+        if status_code >= 500:
+            self.failure()
+        else:
+            self.success()
+
+    def success(self) -> None:
+        if self.failures == 0 and self._opened_at is None:
+            return
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.threshold <= 0:
+                return
+            if self._probing or (self._opened_at is None and self.failures >= self.threshold):
+                self._opened_at = time.monotonic()
+                self._probing = False
+                opened = True
+            else:
+                opened = False
+        if opened and self._metrics is not None:
+            self._metrics.observe_transport(EVENT_BREAKER_OPEN)
+
+    def release(self) -> None:
+        """试探请求被取消、没有结果时调用，让下一个请求接着试探。"""
+        with self._lock:
+            self._probing = False
+
+
+def _close_loser(future: Future[httpx.Response]) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class _ResilientBase:
+    def __init__(
+        self,
+        options: TransportOptions | None,
+        metrics: ClientMetrics | None,
+        breaker: CircuitBreaker | None,
+    ) -> None:
+        self.options = options if options is not None else TransportOptions()
+        self._metrics = metrics
+        self.breaker = breaker or CircuitBreaker(self.options.breaker_threshold, self.options.breaker_cooldown, metrics)
+
+    def _mount(self, connect: Callable[[str | None], Any]) -> None:
+        """按 httpx 默认客户端的规则为每类 URL 建立连接池（直连或经代理）。
+
+        给 httpx.Client 传入自定义 transport 后，它不再读取环境变量里的代理，所以在这一层补上。
+        环境变量用标准库 urllib.request 的公开函数解析（httpx 自己也是这样做的），不依赖 httpx 的私有模块。
+        """
+        self._no_proxy: dict[str, str] | None = None
+        if self.options.proxy is not None:
+            proxies = {"all": self.options.proxy}
+        elif self.options.trust_env:
+            environment = getproxies()
+            # 与 httpx 一致：只认 http / https / all，没写协议的代理地址按 http:// 处理。
+            proxies = {
+                scheme: url if "://" in url else f"http://{url}"
+                for scheme in ("http", "https", "all")
+                if (url := environment.get(scheme))
+            }
+            if environment.get("no"):
+                self._no_proxy = environment
+        else:
+            proxies = {}
+        self._default = connect(None)
+        pools = {url: connect(url) for url in set(proxies.values())}
+        self._routes = {scheme: pools[url] for scheme, url in proxies.items()}
+
+    def _transport_for(self, url: httpx.URL) -> Any:
+        transport = self._routes.get(url.scheme) or self._routes.get("all")
+        if transport is None:
+            return self._default
+        if self._no_proxy is not None and proxy_bypass_environment(url.host, self._no_proxy):
+            return self._default
+        return transport
+
+    def _observe(self, event: str) -> None:
+        if self._metrics is not None:
+            self._metrics.observe_transport(event)
+
+    def _should_hedge(self, request: httpx.Request) -> bool:
+        return self.options.hedge_after is not None and request.url.path.endswith(self.options.hedge_paths)
+
+    def _retry_delay(self, attempt: int, response: httpx.Response | None = None) -> float | None:
+        """第 attempt 次重试前的等待秒数（全抖动）；不该再重试时返回 None。"""
+        if attempt >= self.options.retries:
+            return None
+        delay = random.uniform(0, min(self.options.retry_backoff_max, self.options.retry_backoff * 2**attempt))
+        if response is None:
+            return delay
+        if response.status_code not in RETRY_STATUSES:
+            return None
+        try:
+            retry_after = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            return delay
+        return None if retry_after > RETRY_AFTER_MAX_SECONDS else max(delay, retry_after)
+
+
+class ResilientTransport(_ResilientBase, httpx.BaseTransport):
+    """同步 transport。对冲请求在内部线程池里并发发出，落败一方的响应在返回后关闭、归还连接。"""
+
+    def __init__(
+        self,
+        options: TransportOptions | None = None,
+        metrics: ClientMetrics | None = None,
+        breaker: CircuitBreaker | None = None,
+        inner: httpx.BaseTransport | None = None,
+    ) -> None:
+        super().__init__(options, metrics, breaker)
+        if inner is not None:
+            self._default, self._routes, self._no_proxy = inner, {}, None
+        else:
+            self._mount(
+                lambda proxy: httpx.HTTPTransport(http2=self.options.http2, limits=self.options.limits(), proxy=proxy)
+            )
+        self._hedge_pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return self._attempt(request)
+        attempt = 0
+        while True:
+            try:
+                response = self._hedged(request) if self._should_hedge(request) else self._attempt(request)
+            except RETRYABLE_ERRORS:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+            attempt += 1
+            self._observe(EVENT_RETRY)
+            time.sleep(delay)
+
+    def _attempt(self, request: httpx.Request) -> httpx.Response:
+        self.breaker.before()
+        try:
+            response = self._transport_for(request.url).handle_request(request)
+        except httpx.TransportError:
+            self.breaker.failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record(response.status_code)
+        return response
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._hedge_pool is None:
+            with self._pool_lock:
+                if self._hedge_pool is None:
+                    from concurrent.futures import ThreadPoolExecutor
+
+                    self._hedge_pool = ThreadPoolExecutor(self.options.max_connections, "glft-hedge")
+        return self._hedge_pool
+
+    def _hedged(self, request: httpx.Request) -> httpx.Response:
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        pool = self._pool()
+        futures = [pool.submit(self._attempt, request)]
+        done, pending = wait(futures, timeout=self.options.hedge_after)
+        if not done:
+            self._observe(EVENT_HEDGE)
+            futures.append(pool.submit(self._attempt, request))
+            pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in futures if future in done and future.exception() is None), None)
+            if winner is None:
+                continue
+            if winner is not futures[0]:
+                self._observe(EVENT_HEDGE_WIN)
+            for future in futures:
+                if future is not winner:
+                    future.add_done_callback(_close_loser)
+            return winner.result()
+        # 只发了一份且已结束，或两份都失败：返回 / 抛出最后发出的那份的结果。
+        return futures[-1].result()
+
+    def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+        self._default.close()
+        for transport in set(self._routes.values()):
+            transport.close()
+
+
+class AsyncResilientTransport(_ResilientBase, httpx.AsyncBaseTransport):
+    """异步 transport，语义与 ResilientTransport 相同；对冲落败的一方直接取消。"""
+
+    def __init__(
+        self,
+        options: TransportOptions | None = None,
+        metrics: ClientMetrics | None = None,
+        breaker: CircuitBreaker | None = None,
+        inner: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        super().__init__(options, metrics, breaker)
+        if inner is not None:
+            self._default, self._routes, self._no_proxy = inner, {}, None
+        else:
+            self._mount(
+                lambda proxy: httpx.AsyncHTTPTransport(
+                    http2=self.options.http2, limits=self.options.limits(), proxy=proxy
+                )
+            )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._attempt(request)
+        import asyncio
+
+        attempt = 0
+        while True:
+            try:
+                if self._should_hedge(request):
+                    response = await self._hedged(request)
+                else:
+                    response = await self._attempt(request)
+            except RETRYABLE_ERRORS:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            attempt += 1
+            self._observe(EVENT_RETRY)
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, request: httpx.Request) -> httpx.Response:
+        self.breaker.before()
+        try:
+            response = await self._transport_for(request.url).handle_async_request(request)
+        except httpx.TransportError:
+            self.breaker.failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record(response.status_code)
+        return response
+
+    async def _hedged(self, request: httpx.Request) -> httpx.Response:
+        import asyncio
+
+        tasks = [asyncio.ensure_future(self._attempt(request))]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.options.hedge_after)
+            if not done:
+                self._observe(EVENT_HEDGE)
+                tasks.append(asyncio.ensure_future(self._attempt(request)))
+                pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in tasks if task in done and task.exception() is None), None)
+                if winner is None:
+                    continue
+                if winner is not tasks[0]:
+                    self._observe(EVENT_HEDGE_WIN)
+                for task in tasks:
+                    if task is winner:
+                        continue
+                    if not task.done():
+                        task.cancel()
+                    elif task.exception() is None:
+                        await task.result().aclose()
+                return winner.result()
+            # 只发了一份且已结束，或两份都失败：返回 / 抛出最后发出的那份的结果。
+            return tasks[-1].result()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def aclose(self) -> None:
+        await self._default.aclose()
+        for transport in set(self._routes.values()):
+            await transport.aclose()
@@ -0,0 +1,550 @@
+"""本地模拟 GLFT API 服务，实现客户端用到的全部接口，供离线联调与基准测试使用。
+
+    python mock_server.py --port 8000 --latency-ms 30 --error-rate 0.01 --trades 1000000
+
+--alert-interval-ms 大于 0 时会定时产生新告警，并通过 /events/stream（server-sent events）推送给订阅方。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+SYMBOLS = ("BTC_USDT_Perp", "ETH_USDT_Perp", "SOL_USDT_Perp")
+BASE_PRICES = {"BTC_USDT_Perp": 60000.0, "ETH_USDT_Perp": 3000.0, "SOL_USDT_Perp": 150.0}
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# 固定 token 永不过期，便于脚本直接通过 GLFT_TOKEN 使用；登录签发的 token 按 token_ttl_seconds 过期。
+MOCK_TOKEN = "mock-token"
+JSON_BATCH_ROWS = 2000
+# 事件流只保留最近这么多条事件，断线重连时按 Last-Event-ID 从中补发。
+EVENT_LOG_SIZE = 1000
+EVENT_HEARTBEAT_SECONDS = 10.0
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    trades: int = 10_000
+    orders: int = 2_000
+    alerts: int = 200
+    metrics_tick_ms: int = 1000
+    alert_interval_ms: int = 0
+    token_ttl_seconds: float = 3600.0
+    seed: int = 7
+
+
+def _iso(seconds: int) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).isoformat()
+
+
+def make_trade(trade_id: int) -> dict[str, Any]:
+    """按编号确定性地生成一条成交，百万级数据也不需要常驻内存。"""
+    symbol = SYMBOLS[trade_id % len(SYMBOLS)]
+    price = round(BASE_PRICES[symbol] * (1 + 0.01 * math.sin(trade_id / 500)), 2)
+    size = round(0.001 * (1 + trade_id % 7), 4)
+    return {
+        "trade_id": trade_id,
+        "order_id": trade_id // 2 + 1,
+        "symbol": symbol,
+        "side": "buy" if trade_id % 2 else "sell",
+        "price": price,
+        "size": size,
+        "fee": round(price * size * 0.0002, 6),
+        "realized_pnl": round(((trade_id * 7919) % 200 - 95) / 100, 4),
+        "created_at": _iso(trade_id),
+    }
+
+
+def make_order(order_id: int, total: int) -> dict[str, Any]:
+    symbol = SYMBOLS[order_id % len(SYMBOLS)]
+    status = "open" if order_id > total - 20 else ("filled" if order_id % 3 else "cancelled")
+    return {
+        "order_id": order_id,
+        "symbol": symbol,
+        "side": "buy" if order_id % 2 else "sell",
+        "price": round(BASE_PRICES[symbol] * (1 + 0.002 * ((order_id % 11) - 5)), 2),
+        "size": round(0.001 * (1 + order_id % 5), 4),
+        "status": status,
+        "updated_at": _iso(order_id * 2),
+    }
+
+
+class MockState:
+    """模拟后端的可变状态：参数、阈值、引擎开关、告警已读标记与推送事件日志。"""
+
+    def __init__(self, config: MockConfig) -> None:
+        self.config = config
+        self.lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        self.engine_running = True
+        self.read_alerts: set[int] = set()
+        self.alert_count = config.alerts
+        # (事件号, 事件类型, JSON 文本)；新事件到达时通知所有等待中的事件流连接。
+        self.events: deque[tuple[int, str, str]] = deque(maxlen=EVENT_LOG_SIZE)
+        self.event_seq = 0
+        self.events_changed = threading.Condition(self.lock)
+        self.strategy_params: dict[str, Any] = {
+            "gamma": 0.1,
+            "sigma": 0.02,
+            "A": 140.0,
+            "k": 1.5,
+            "time_horizon_seconds": 60,
+            "inventory_cap_usd": 5000.0,
+            "order_cap_usd": 500.0,
+            "leverage_limit": 3.0,
+            "auto_tuning_enabled": False,
+        }
+        self.risk_limits: dict[str, Any] = {
+            "max_inventory_usd": 10000.0,
+            "max_order_usd": 1000.0,
+            "max_leverage": 5.0,
+            "max_cancel_rate_per_min": 120.0,
+            "max_order_rate_per_min": 240.0,
+        }
+        self.config_values: dict[str, Any] = {
+            "grvt_env": "testnet",
+            "grvt_symbol": SYMBOLS[0],
+            "quote_interval_ms": 500,
+            "order_duration_secs": 30,
+            "calibration_window_days": 7,
+            "calibration_timeframe": "1m",
+            "calibration_update_time": "00:05",
+            "calibration_trade_sample": 5000,
+            "log_retention_days": 30,
+            "alert_email_to": "ops@example.com",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": 587,
+            "smtp_user": "glft",
+            "smtp_tls": True,
+        }
+        self.keys: dict[str, Any] | None = None
+        self._csv: bytes | None = None
+        # 登录签发的 token -> 过期时刻（monotonic）。
+        self.tokens: dict[str, float] = {}
+        self.token_seq = 0
+
+    def issue_token(self) -> str:
+        with self.lock:
+            self.token_seq += 1
+            token = f"{MOCK_TOKEN}-{self.token_seq}"
+            self.tokens[token] = time.monotonic() + self.config.token_ttl_seconds
+        return token
+
+    def token_valid(self, token: str) -> bool:
+        if token == MOCK_TOKEN:
+            return True
+        with self.lock:
+            expires_at = self.tokens.get(token)
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.tokens[token]
+                expires_at = None
+        return expires_at is not None
+
+    def metrics(self) -> tuple[str, dict[str, Any]]:
+        tick = int(time.time() * 1000) // max(self.config.metrics_tick_ms, 1)
+        wave = math.sin(tick / 10)
+        mid = round(60000 * (1 + 0.001 * wave), 2)
+        inventory = round(0.05 * wave, 6)
+        return f'"m{tick}"', {
+            "mid_price": mid,
+            "inventory_btc": inventory,
+            "inventory_usd": round(inventory * mid, 2),
+            "unrealized_pnl": round(12.5 * wave, 2),
+            "open_orders": 20 if self.engine_running else 0,
+            "spread": round(2.5 + wave, 4),
+            "cancel_rate_per_min": round(40 + 20 * wave, 2),
+            "order_rate_per_min": round(80 + 30 * wave, 2),
+        }
+
+    def risk_status(self) -> dict[str, Any]:
+        _, metrics = self.metrics()
+        return {
+            "engine_running": self.engine_running,
+            "kill_switch": False,
+            "inventory_usd": metrics["inventory_usd"],
+            "cancel_rate_per_min": metrics["cancel_rate_per_min"],
+            "order_rate_per_min": metrics["order_rate_per_min"],
+            "breaches": [],
+        }
+
+    def positions(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "symbol": symbol,
+                "size": round(0.01 * (index + 1), 4),
+                "entry_price": BASE_PRICES[symbol],
+                "mark_price": round(BASE_PRICES[symbol] * 1.001, 2),
+                "unrealized_pnl": round(BASE_PRICES[symbol] * 0.001 * 0.01 * (index + 1), 4),
+            }
+            for index, symbol in enumerate(SYMBOLS)
+        ]
+
+    def alert(self, alert_id: int) -> dict[str, Any]:
+        return {
+            "id": alert_id,
+            "level": ("info", "warning", "critical")[alert_id % 3],
+            "message": f"模拟告警 #{alert_id}",
+            "is_read": alert_id in self.read_alerts or alert_id < self.config.alerts - 20,
+            "created_at": _iso(alert_id * 60),
+        }
+
+    def publish(self, event: str, data: Any) -> None:
+        """追加一条推送事件，调用方须持有 lock。"""
+        self.event_seq += 1
+        self.events.append((self.event_seq, event, json.dumps(data, ensure_ascii=False)))
+        self.events_changed.notify_all()
+
+    def events_after(self, last_id: int) -> list[tuple[int, str, str]]:
+        """返回事件号大于 last_id 的事件，调用方须持有 lock。"""
+        if not self.events or self.events[-1][0] <= last_id:
+            return []
+        return [entry for entry in self.events if entry[0] > last_id]
+
+    def raise_alert(self) -> dict[str, Any]:
+        with self.lock:
+            self.alert_count += 1
+            alert = self.alert(self.alert_count)
+            self.publish("alert", alert)
+        return alert
+
+    def pnl_csv(self) -> bytes:
+        with self.lock:
+            if self._csv is None:
+                lines = ["trade_id,symbol,side,price,size,fee,realized_pnl,created_at"]
+                for trade_id in range(1, self.config.trades + 1):
+                    trade = make_trade(trade_id)
+                    lines.append(
+                        f"{trade_id},{trade['symbol']},{trade['side']},{trade['price']},{trade['size']},"
+                        f"{trade['fee']},{trade['realized_pnl']},{trade['created_at']}"
+                    )
+                self._csv = ("\n".join(lines) + "\n").encode("utf-8")
+            return self._csv
+
+
+def _page_ids(total: int, query: dict[str, str], seconds_per_id: int) -> range:
+    """按 since / limit / offset 计算本页的编号区间，新记录在前。
+
+    since 可以是编号，也可以是 ISO 时间（对应记录的时间字段 = EPOCH + 编号 * seconds_per_id）。
+    """
+    raw_since = query.get("since") or "0"
+    if raw_since.isdigit():
+        since = int(raw_since)
+    else:
+        since = int((datetime.fromisoformat(raw_since) - EPOCH).total_seconds()) // seconds_per_id
+    newest_first = range(total, since, -1)
+    offset = int(query.get("offset", 0) or 0)
+    if "limit" in query:
+        return newest_first[offset:offset + int(query["limit"])]
+    return newest_first[offset:]
+
+
+_ALERT_READ = re.compile(r"^/alerts/(\d+)/read$")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，不关 Nagle 会和客户端的延迟 ACK 叠出约 40ms 的假延迟。
+    disable_nagle_algorithm = True
+    server: MockServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        state = self.server.state
+        config = state.config
+        url = urlsplit(self.path)
+        path = url.path.removeprefix(self.server.prefix)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("content-length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null") if length else None
+
+        if config.latency_ms or config.jitter_ms:
+            time.sleep(max(0.0, config.latency_ms + state.random.uniform(-1, 1) * config.jitter_ms) / 1000)
+        if config.error_rate and state.random.random() < config.error_rate:
+            self._json({"detail": "模拟服务端错误"}, status=503)
+            return
+
+        if path == "/auth/login" and method == "POST":
+            if not body or not body.get("password"):
+                self._json({"detail": "用户名或密码错误"}, status=401)
+                return
+            token = state.issue_token()
+            self._json({"access_token": token, "token_type": "bearer", "expires_in": config.token_ttl_seconds})
+            return
+        if not state.token_valid(self.headers.get("authorization", "").removeprefix("Bearer ")):
+            self._json({"detail": "未授权"}, status=401)
+            return
+
+        if not self._route(method, path, query, body):
+            self._json({"detail": "Not Found"}, status=404)
+
+    def _route(self, method: str, path: str, query: dict[str, str], body: Any) -> bool:
+        state = self.server.state
+        config = state.config
+        if method == "GET":
+            if path == "/auth/me":
+                self._json({"username": "admin", "is_active": True})
+            elif path == "/dashboard/metrics":
+                etag, metrics = state.metrics()
+                if self.headers.get("if-none-match") == etag:
+                    self._empty(304, {"ETag": etag})
+                else:
+                    self._json(metrics, headers={"ETag": etag})
+            elif path == "/orders":
+                self._json_rows(make_order(i, config.orders) for i in _page_ids(config.orders, query, 2))
+            elif path == "/trades":
+                self._json_rows(make_trade(i) for i in _page_ids(config.trades, query, 1))
+            elif path == "/alerts":
+                self._json_rows(state.alert(i) for i in _page_ids(state.alert_count, query, 60))
+            elif path == "/events/stream":
+                self._event_stream()
+            elif path == "/positions":
+                self._json(state.positions())
+            elif path in ("/strategy/params", "/risk/status", "/risk/limits", "/config", "/keys"):
+                with state.lock:
+                    data = {
+                        "/strategy/params": state.strategy_params,
+                        "/risk/status": state.risk_status(),
+                        "/risk/limits": state.risk_limits,
+                        "/config": state.config_values,
+                        "/keys": state.keys,
+                    }[path]
+                    payload = None if data is None else json.dumps(data, ensure_ascii=False)
+                if payload is None:
+                    self._json({"detail": "未配置 API Key"}, status=404)
+                else:
+                    self._raw_json(payload.encode("utf-8"))
+            elif path == "/reports/pnl.csv":
+                self._csv(state.pnl_csv())
+            else:
+                return False
+            return True
+
+        with state.lock:
+            if path == "/strategy/params":
+                state.strategy_params.update(body or {})
+                result = dict(state.strategy_params)
+            elif path == "/risk/limits":
+                state.risk_limits.update(body or {})
+                result = dict(state.risk_limits)
+            elif path == "/config":
+                values = dict(body or {})
+                if not values.get("smtp_password"):
+                    values.pop("smtp_password", None)
+                state.config_values.update(values)
+                result = dict(state.config_values)
+            elif path == "/keys":
+                payload = body or {}
+                state.keys = result = {
+                    "api_key": f"{str(payload.get('api_key', ''))[:4]}****",
+                    "sub_account_id": payload.get("sub_account_id", ""),
+                    "ip_whitelist": payload.get("ip_whitelist", ""),
+                }
+            elif path in ("/engine/start", "/engine/stop"):
+                state.engine_running = path == "/engine/start"
+                result = {"engine_running": state.engine_running}
+                state.publish("status", state.risk_status())
+            elif path == "/alerts/read":
+                ids = sorted({int(alert_id) for alert_id in (body or {}).get("ids", [])})
+                state.read_alerts.update(ids)
+                result = {"ids": ids, "is_read": True}
+                state.publish("alerts_read", {"ids": ids})
+            elif match := _ALERT_READ.match(path):
+                state.read_alerts.add(int(match.group(1)))
+                result = {"id": int(match.group(1)), "is_read": True}
+                state.publish("alerts_read", {"ids": [result["id"]]})
+            else:
+                return False
+        self._json(result)
+        return True
+
+    def _json(self, data: Any, status: int = 200, headers: dict[str, str] | None = None) -> None:
+        self._raw_json(json.dumps(data, ensure_ascii=False).encode("utf-8"), status, headers)
+
+    def _raw_json(self, payload: bytes, status: int = 200, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _empty(self, status: int, headers: dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _json_rows(self, rows: Any) -> None:
+        """大列表用 chunked 编码分批序列化，服务端内存不随行数增长。"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._chunk(b"[")
+        batch: list[str] = []
+        first = True
+        for row in rows:
+            batch.append(json.dumps(row, ensure_ascii=False))
+            if len(batch) >= JSON_BATCH_ROWS:
+                self._chunk(("" if first else ",").encode() + ",".join(batch).encode("utf-8"))
+                batch, first = [], False
+        if batch:
+            self._chunk(("" if first else ",").encode() + ",".join(batch).encode("utf-8"))
+        self._chunk(b"]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _event_stream(self) -> None:
+        """server-sent events：先补发 Last-Event-ID 之后的事件，再阻塞等待新事件，空闲时发心跳注释。"""
+        state = self.server.state
+        raw_last_id = self.headers.get("last-event-id", "")
+        # 不带 Last-Event-ID 的新订阅只接收之后的事件。
+        with state.lock:
+            last_id = int(raw_last_id) if raw_last_id.isdigit() else state.event_seq
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            self._chunk(b"retry: 1000\n\n")
+            while not self.server.stopped.is_set():
+                with state.lock:
+                    pending = state.events_after(last_id)
+                    if not pending:
+                        state.events_changed.wait(EVENT_HEARTBEAT_SECONDS)
+                        pending = state.events_after(last_id)
+                if not pending:
+                    self._chunk(b": keepalive\n\n")
+                    continue
+                self._chunk("".join(
+                    f"id: {event_id}\nevent: {event}\ndata: {data}\n\n" for event_id, event, data in pending
+                ).encode("utf-8"))
+                last_id = pending[-1][0]
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def _csv(self, data: bytes) -> None:
+        etag = f'"csv-{len(data)}"'
+        start = 0
+        range_header = self.headers.get("range", "")
+        if_range = self.headers.get("if-range")
+        if range_header.startswith("bytes=") and (if_range is None or if_range == etag):
+            start = int(range_header.removeprefix("bytes=").split("-", 1)[0] or 0)
+            if start >= len(data):
+                self._empty(416, {"Content-Range": f"bytes */{len(data)}"})
+                return
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+        view = memoryview(data)[start:]
+        for offset in range(0, len(view), 256 * 1024):
+            self.wfile.write(view[offset:offset + 256 * 1024])
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: MockConfig, prefix: str = "/api") -> None:
+        super().__init__(address, MockHandler)
+        self.state = MockState(config)
+        self.prefix = prefix.rstrip("/")
+        self.stopped = threading.Event()
+        if config.alert_interval_ms > 0:
+            threading.Thread(target=self._alert_ticker, name="glft-mock-alerts", daemon=True).start()
+
+    def _alert_ticker(self) -> None:
+        while not self.stopped.wait(self.state.config.alert_interval_ms / 1000):
+            self.state.raise_alert()
+
+    def server_close(self) -> None:
+        self.stopped.set()
+        with self.state.lock:
+            self.state.events_changed.notify_all()
+        super().server_close()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+
+def start_mock_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> MockServer:
+    """在后台线程启动模拟服务，port 为 0 时由系统分配端口。"""
+    server = MockServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="glft-mock-server", daemon=True).start()
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="GLFT 模拟 API 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每个请求附加的延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="延迟的随机抖动幅度（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 503 的比例（0~1）")
+    parser.add_argument("--trades", type=int, default=10_000, help="成交条数")
+    parser.add_argument("--orders", type=int, default=2_000, help="订单条数")
+    parser.add_argument("--alerts", type=int, default=200, help="告警条数")
+    parser.add_argument("--metrics-tick-ms", type=int, default=1000, help="仪表盘指标变化周期（毫秒）")
+    parser.add_argument("--alert-interval-ms", type=int, default=0, help="定时产生新告警的周期（毫秒，0 为不产生）")
+    parser.add_argument("--token-ttl-seconds", type=float, default=3600.0, help="登录签发的 token 有效期（秒）")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        trades=args.trades,
+        orders=args.orders,
+        alerts=args.alerts,
+        metrics_tick_ms=args.metrics_tick_ms,
+        alert_interval_ms=args.alert_interval_ms,
+        token_ttl_seconds=args.token_ttl_seconds,
+    )
+    server = MockServer((args.host, args.port), config)
+    print(f"GLFT 模拟服务已启动：{server.base_url}（登录任意账号，密码非空即可）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
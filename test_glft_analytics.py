@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from glft_records import Order, Trade
+from mock_server import make_trade
+
+np = pytest.importorskip("numpy")
+
+from glft_analytics import TradeAnalytics  # noqa: E402
+
+
+def _trades(first: int, last: int) -> list[Trade]:
+    return [Trade.from_json_object(make_trade(trade_id)) for trade_id in range(first, last + 1)]
+
+
+def _reference(trades: list[Trade]) -> dict:
+    """逐笔计算的对照结果。"""
+    unique = {trade.trade_id: trade for trade in reversed(trades)}
+    ordered = [unique[trade_id] for trade_id in sorted(unique)]
+    equity = np.cumsum([trade.realized_pnl - trade.fee for trade in ordered])
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    return {
+        "trades": len(ordered),
+        "fees": sum(trade.fee for trade in ordered),
+        "realized_pnl": sum(trade.realized_pnl for trade in ordered),
+        "volume": sum(trade.size for trade in ordered),
+        "max_drawdown": float((peak - equity).max()),
+        "by_symbol": {
+            symbol: sum(1 for trade in ordered if trade.symbol == symbol) for symbol in {t.symbol for t in ordered}
+        },
+        "sells": sum(1 for trade in ordered if trade.side == "sell"),
+    }
+
+
+def _check(analytics: TradeAnalytics, expected: dict) -> None:
+    summary = analytics.summary()
+    assert summary["trades"] == expected["trades"]
+    for field in ("fees", "realized_pnl", "volume", "max_drawdown"):
+        assert summary[field] == pytest.approx(expected[field])
+    symbols = {row["symbol"]: row["count"] for row in analytics.breakdown("symbol")}
+    assert symbols == expected["by_symbol"]
+    sides = {row["side"]: row["count"] for row in analytics.breakdown("side")}
+    assert sides["sell"] == expected["sells"]
+    assert sum(sides.values()) == expected["trades"]
+
+
+@pytest.mark.parametrize("newest_first", [False, True])
+def test_ordered_batches_match_reference(newest_first):
+    trades = _trades(1, 3000)
+    analytics = TradeAnalytics(sharpe_window=50)
+    batch = trades[::-1] if newest_first else trades
+    assert analytics.add_trades(batch) == 3000
+    assert analytics.trade_cursor == 3000
+    assert analytics.first_trade_at == trades[0].created_at
+    assert analytics.last_trade_at == trades[-1].created_at
+    _check(analytics, _reference(trades))
+
+
+def test_incremental_equals_one_shot_with_overlap_and_shuffle():
+    trades = _trades(1, 2000)
+    one_shot = TradeAnalytics(sharpe_window=50)
+    one_shot.add_trades(trades)
+
+    incremental = TradeAnalytics(sharpe_window=50)
+    assert incremental.add_trades(trades[:800]) == 800
+    shuffled = trades[500:1500] + trades[700:900]
+    random.Random(7).shuffle(shuffled)
+    assert incremental.add_trades(shuffled) == 700
+    assert incremental.add_trades(trades[1400:][::-1]) == 500
+    assert incremental.add_trades(trades[:100]) == 0
+
+    _check(incremental, _reference(trades))
+    assert np.allclose(incremental.equity_curve(100), one_shot.equity_curve(100))
+    assert np.allclose(incremental.rolling_sharpe(), one_shot.rolling_sharpe())
+
+
+def test_newest_first_pages_with_overlap_equal_one_shot():
+    trades = _trades(1, 2000)
+    one_shot = TradeAnalytics(sharpe_window=50)
+    one_shot.add_trades(trades[:300])
+    one_shot.add_trades(trades[300:])
+
+    paged = TradeAnalytics(sharpe_window=50)
+    paged.add_trades(trades[:300])
+    # 按新到旧翻页；翻页期间有新成交写入时下一页会与上一页重叠几条。
+    pages = [trades[1500:][::-1], trades[900:1505][::-1], trades[200:900][::-1]]
+    assert paged.add_trade_pages(iter(pages)) == 1700
+    assert paged.add_trade_pages([]) == 0
+    assert paged.trade_cursor == 2000
+    assert (paged.first_trade_at, paged.last_trade_at) == (trades[0].created_at, trades[-1].created_at)
+
+    _check(paged, _reference(trades))
+    assert np.allclose(paged.equity_curve(100), one_shot.equity_curve(100))
+    assert np.allclose(paged.rolling_sharpe(), one_shot.rolling_sharpe())
+
+
+def test_fill_rate_counts_orders_in_either_arrival_order():
+    trades = _trades(1, 10)
+    analytics = TradeAnalytics()
+    analytics.add_orders([Order(order_id=order_id, updated_at=f"t{order_id}") for order_id in (1, 2, 3, 99)])
+    analytics.add_trades(trades[:4])
+    analytics.add_orders([Order(order_id=order_id) for order_id in (3, 4, 5, 6)])
+    analytics.add_trades(trades[4:])
+    summary = analytics.summary()
+    assert summary["orders"] == 7
+    assert summary["fill_rate"] == pytest.approx(6 / 7)
+    assert analytics.order_cursor == "t99"
+
+
+def test_trades_without_order_id_are_counted():
+    trades = [Trade(trade_id=1, symbol="BTCUSDT", side="buy", size=1.0), Trade(trade_id=2, order_id=5, side="sell")]
+    analytics = TradeAnalytics()
+    assert analytics.add_trades(trades) == 2
+    analytics.add_orders([Order(order_id=5)])
+    assert analytics.summary()["fill_rate"] == 1.0
+    assert [row["symbol"] for row in analytics.breakdown("symbol")] == ["BTCUSDT", ""]
+
+
+def test_unknown_breakdown_is_rejected():
+    with pytest.raises(ValueError):
+        TradeAnalytics().breakdown("venue")
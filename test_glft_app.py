@@ -0,0 +1,155 @@
+import asyncio
+import io
+import threading
+import time
+
+import httpx
+import pytest
+from rich.console import Console
+from rich.prompt import Prompt
+
+from glft_app import GlftTuiApp
+from glft_client import ApiError, AsyncGlftApiClient, GlftApiClient
+from glft_events import StreamEvent
+from glft_session import RecordingTransport, ReplayTransport, SessionReader, SessionRecorder
+from glft_store import LocalStore
+from mock_server import MockConfig, start_mock_server
+
+
+@pytest.fixture
+def server():
+    server = start_mock_server(MockConfig(trades=50, orders=50))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _app(server, **kwargs) -> tuple[GlftTuiApp, io.StringIO]:
+    output = io.StringIO()
+    api = GlftApiClient(server.base_url)
+    api.login("admin", "secret")
+    return GlftTuiApp(api, Console(file=output, width=160), **kwargs), output
+
+
+def _wait_for(predicate, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_live_dashboard_prints_pushed_alerts_without_waiting_for_the_next_poll(server):
+    app, output = _app(server, live_interval=30.0)
+    flush = app._flush_notices
+
+    def flush_then_stop(console: Console) -> None:
+        flush(console)
+        if stop.is_set():
+            raise KeyboardInterrupt
+
+    stop = threading.Event()
+    app._flush_notices = flush_then_stop
+    watcher = threading.Thread(target=app.watch_dashboard, daemon=True)
+    watcher.start()
+    _wait_for(lambda: "/dashboard/metrics" in app.metrics.request_summaries())
+    pushed_at = time.monotonic()
+    app._on_stream_event(StreamEvent("1", "alert", {"id": 901, "level": "critical", "message": "库存超限"}))
+    _wait_for(lambda: "新告警 #901" in output.getvalue())
+    assert time.monotonic() - pushed_at < 1.0
+    stop.set()
+    app._notice_ready.set()
+    watcher.join(3)
+    assert not watcher.is_alive()
+
+
+def _market_data_counts(app: GlftTuiApp, output: io.StringIO) -> list[str]:
+    output.seek(0)
+    output.truncate()
+    app.show_market_data()
+    return [line for line in output.getvalue().splitlines() if "条）" in line]
+
+
+def test_market_data_recorded_with_store_replays_the_rows_shown(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(Prompt, "ask", lambda *args, **kwargs: "0")
+    store = LocalStore(tmp_path / "store.db")
+    # 录制开始前本地库已同步过，录下的请求里只有增量，没有完整的订单 / 成交。
+    app, output = _app(server, store=store)
+    _market_data_counts(app, output)
+    app.close()
+
+    path = tmp_path / "session.glft"
+    recorder = SessionRecorder(path, server.base_url)
+    api = GlftApiClient(server.base_url, transport=RecordingTransport(recorder, httpx.HTTPTransport()))
+    api.login("admin", "secret")
+    app = GlftTuiApp(api, Console(file=output, width=160), store=store, recorder=recorder)
+    try:
+        recorded = _market_data_counts(app, output)
+    finally:
+        app.close()
+        store.close()
+        api.close()
+        recorder.close()
+    assert recorded[:2] == ["1) 订单（50 条）", "2) 成交（50 条）"]
+
+    reader = SessionReader(path)
+    replay = ReplayTransport(reader)
+    api = GlftApiClient(reader.base_url, transport=replay)
+    api.login("replay", "replay")
+    app = GlftTuiApp(api, Console(file=output, width=160), replay=replay)
+    try:
+        assert _market_data_counts(app, output) == recorded
+    finally:
+        app.close()
+        api.close()
+        reader.close()
+
+
+def test_prefetch_is_reused_until_a_write_bumps_the_cache_generation():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.endswith("/positions"):
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json={"calls": calls.count(request.url.path)})
+
+    api = GlftApiClient("http://backend/api", transport=httpx.MockTransport(handler))
+    api.token = "token"
+    app = GlftTuiApp(api, Console(file=io.StringIO()))
+    try:
+        app._start_prefetch()
+        app._start_prefetch()
+        assert app._call("get_risk_status") == {"calls": 1}
+
+        app._start_prefetch()
+        for _, _, future in app._prefetched.values():
+            future.result()
+        api.cache.invalidate(("/risk/status",))
+        assert app._call("get_risk_status") == {"calls": 2}
+        assert calls.count("/api/risk/status") == 2
+    finally:
+        app.close()
+
+
+def test_fetch_concurrently_fans_out_and_isolates_a_failing_endpoint():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        if request.url.path.endswith("/positions"):
+            return httpx.Response(500, json={"detail": "boom"})
+        return httpx.Response(200, json=[])
+
+    api = GlftApiClient("http://backend/api")
+    api.token = "token"
+    async_api = AsyncGlftApiClient("http://backend/api", transport=httpx.MockTransport(handler))
+    app = GlftTuiApp(api, Console(file=io.StringIO()), async_api=async_api)
+    try:
+        started = time.perf_counter()
+        orders, trades, positions = app._fetch_concurrently(
+            ("get_order_records", {"limit": 10}), ("get_trade_records", {"limit": 10}), "get_position_records"
+        )
+        # 三个接口同时发出，总耗时接近一次往返而不是三次。
+        assert time.perf_counter() - started < 0.25
+    finally:
+        app.close()
+    assert (orders, trades) == ([], [])
+    assert isinstance(positions, ApiError)
+    assert positions.status_code == 500
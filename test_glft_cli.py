@@ -0,0 +1,85 @@
+import argparse
+import json
+import socket
+
+import httpx
+import pytest
+
+from glft_cli import EXIT_API_ERROR, EXIT_AUTH, EXIT_OK, EXIT_USAGE, _watch_events, parse_assignments, run
+from glft_client import ENV_CREDENTIALS_FILE, ENV_PASSWORD, ENV_TOKEN, ENV_USERNAME, GlftApiClient, UsageError
+from mock_server import MockConfig, start_mock_server
+from tui import parse_args
+
+
+def test_watch_exits_with_auth_code_when_stream_token_is_rejected(capsys):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.headers["authorization"])
+        return httpx.Response(401, json={"detail": "expired"})
+
+    api = GlftApiClient("http://backend/api")
+    api.token = "stale"
+    args = argparse.Namespace(count=None, json=True)
+    assert _watch_events(api, args, transport=httpx.MockTransport(handler)) == EXIT_AUTH
+    assert calls == ["Bearer stale"]
+    assert "鉴权失败" in capsys.readouterr().err
+
+
+@pytest.fixture
+def server():
+    server = start_mock_server(MockConfig(trades=10, orders=10))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _no_ambient_credentials(monkeypatch):
+    for name in (ENV_TOKEN, ENV_USERNAME, ENV_PASSWORD, ENV_CREDENTIALS_FILE):
+        monkeypatch.delenv(name, raising=False)
+
+
+def _run(server, *argv: str) -> int:
+    return run(parse_args(["--api-url", server.base_url, *argv]))
+
+
+def test_run_exit_codes(server, monkeypatch, tmp_path, capsys):
+    assert _run(server, "metrics", "--json") == EXIT_USAGE
+    assert "未提供凭据" in capsys.readouterr().err
+
+    monkeypatch.setenv(ENV_USERNAME, "admin")
+    monkeypatch.setenv(ENV_PASSWORD, "secret")
+    assert _run(server, "metrics", "--json") == EXIT_OK
+    assert "mid_price" in json.loads(capsys.readouterr().out)
+    assert _run(server, "strategy", "set", "no_such_field=1") == EXIT_USAGE
+
+    monkeypatch.setenv(ENV_TOKEN, "forged")
+    assert _run(server, "metrics") == EXIT_AUTH
+    monkeypatch.delenv(ENV_TOKEN)
+
+    credentials = tmp_path / "credentials.json"
+    credentials.write_text("{broken", encoding="utf-8")
+    monkeypatch.delenv(ENV_USERNAME)
+    assert _run(server, "metrics", "--credentials", str(credentials)) == EXIT_USAGE
+
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    closed.close()
+    monkeypatch.setenv(ENV_TOKEN, "token")
+    assert run(parse_args(["--api-url", f"http://127.0.0.1:{port}/api", "--retries", "0", "metrics"])) == EXIT_API_ERROR
+
+
+def test_parse_assignments_coerces_to_the_current_type():
+    current = {"enabled": False, "levels": 3, "gamma": 0.1, "mode": "glft"}
+    assert parse_assignments(["enabled=on", "levels=5", "gamma = 0.25", "mode=avellaneda"], current) == {
+        "enabled": True,
+        "levels": 5,
+        "gamma": 0.25,
+        "mode": "avellaneda",
+    }
+    assert parse_assignments(["levels=2.5"], current) == {"levels": 2.5}
+    for assignment in ("levels", "=1", "unknown=1", "enabled=maybe", "gamma=high"):
+        with pytest.raises(UsageError):
+            parse_assignments([assignment], current)
@@ -0,0 +1,356 @@
+import asyncio
+import json
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+import pytest
+
+from glft_client import (
+    _MISS,
+    TOKEN_EXPIRY_MARGIN_SECONDS,
+    ApiError,
+    AsyncGlftApiClient,
+    GlftApiClient,
+    ResponseCache,
+    TokenCache,
+    partial_download_paths,
+    pnl_export_compression,
+)
+from glft_store import LocalStore
+
+CSV = b"time,pnl\n" + b"".join(b"2024-01-01T00:00:%02d,%d\n" % (i % 60, i) for i in range(500))
+
+
+def _client(handler) -> GlftApiClient:
+    client = GlftApiClient("http://backend/api", transport=httpx.MockTransport(handler))
+    client.token = "token"
+    return client
+
+
+def _serve_csv(request: httpx.Request) -> httpx.Response:
+    start = int(request.headers.get("range", "bytes=0-")[6:-1])
+    if start >= len(CSV):
+        return httpx.Response(416)
+    status = 206 if start else 200
+    headers = {"content-range": f"bytes {start}-{len(CSV) - 1}/{len(CSV)}", "etag": '"v1"'}
+    return httpx.Response(status, headers=headers, content=CSV[start:])
+
+
+def test_pnl_download_records_a_metrics_sample(tmp_path):
+    client = _client(_serve_csv)
+    target = tmp_path / "pnl.csv"
+    assert client.download_pnl_csv(target) == target
+    assert target.read_bytes() == CSV
+    summary = client.metrics.request_summaries()["/reports/pnl.csv"]
+    assert (summary["count"], summary["errors"], summary["bytes"]) == (1, 0, len(CSV))
+
+
+def test_pnl_download_resume_and_errors_are_sampled(tmp_path):
+    target = tmp_path / "pnl.csv"
+    part_path, state_path = partial_download_paths(target)
+    part_path.write_bytes(CSV[:100])
+    state_path.write_text(json.dumps({"compression": None, "etag": '"v1"'}), encoding="utf-8")
+    client = _client(_serve_csv)
+    client.download_pnl_csv(target)
+    assert target.read_bytes() == CSV
+
+    failing = _client(lambda request: httpx.Response(500, json={"detail": "boom"}))
+    failing.metrics = client.metrics
+    with pytest.raises(ApiError):
+        failing.download_pnl_csv(tmp_path / "other.csv")
+    summary = client.metrics.request_summaries()["/reports/pnl.csv"]
+    assert (summary["count"], summary["errors"], summary["bytes"]) == (2, 1, len(CSV) - 100)
+
+
+def test_export_compression_prefers_saved_state(tmp_path):
+    target = tmp_path / "pnl.csv"
+    assert pnl_export_compression(target) is None
+    assert pnl_export_compression(tmp_path / "pnl.csv.gz") == "gzip"
+    assert pnl_export_compression(tmp_path / "pnl.csv.zst") == "zstd"
+
+    state_path = partial_download_paths(target)[1]
+    state_path.write_text(json.dumps({"compression": "zstd", "raw": 10, "written": 4}), encoding="utf-8")
+    assert pnl_export_compression(target) == "zstd"
+    state_path.write_text("{broken", encoding="utf-8")
+    assert pnl_export_compression(target) is None
+
+
+def test_marking_alerts_read_keeps_unrelated_cache_entries():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append((request.method, request.url.path))
+        if request.url.path.endswith("/alerts/read"):
+            return httpx.Response(404, json={"detail": "not found"})
+        return httpx.Response(200, json={"ok": True})
+
+    client = _client(handler)
+    client.get_strategy_params()
+    client.mark_alert_read(12)
+    client.mark_alerts_read([3, 4])
+    client.get_strategy_params()
+    assert calls.count(("GET", "/api/strategy/params")) == 1
+    client.update_strategy_params({"gamma": 0.1})
+    client.get_strategy_params()
+    assert calls.count(("GET", "/api/strategy/params")) == 2
+
+
+def test_async_client_coalesces_concurrent_401s_into_one_login():
+    logins, attempts = [], []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/auth/login"):
+            logins.append(json.loads(request.content)["username"])
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"access_token": "fresh", "token_type": "bearer"})
+        attempts.append(request.headers["authorization"])
+        if request.headers["authorization"] != "Bearer fresh":
+            return httpx.Response(401, json={"detail": "expired"})
+        return httpx.Response(200, json=[])
+
+    async def main() -> list[Any]:
+        client = AsyncGlftApiClient("http://backend/api", transport=httpx.MockTransport(handler))
+        client.token = "stale"
+        client.credentials = ("admin", "secret")
+        try:
+            return await asyncio.gather(*(client.get_order_records(offset=offset) for offset in range(5)))
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(main()) == [[]] * 5
+    assert logins == ["admin"]
+    assert attempts.count("Bearer stale") == 5
+    assert attempts.count("Bearer fresh") == 5
+
+
+def test_async_client_without_credentials_raises_401():
+    async def main() -> None:
+        client = AsyncGlftApiClient(
+            "http://backend/api", transport=httpx.MockTransport(lambda request: httpx.Response(401, json={}))
+        )
+        client.token = "stale"
+        try:
+            await client.get_order_records()
+        finally:
+            await client.aclose()
+
+    with pytest.raises(ApiError) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status_code == 401
+
+
+def test_token_cache_is_private_and_rejects_unsafe_or_expiring_tokens(tmp_path):
+    directory = tmp_path / "glft"
+    LocalStore(directory / "store.db").close()
+    cache = TokenCache(directory / "store.token")
+    cache.save("secret", time.time() + 3600, "admin")
+    assert stat.S_IMODE(cache.path.stat().st_mode) == 0o600
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+    assert cache.load()["access_token"] == "secret"
+
+    cache.path.chmod(0o644)
+    assert cache.load() is None
+    cache.path.chmod(0o600)
+    cache.save("secret", time.time() + TOKEN_EXPIRY_MARGIN_SECONDS - 1, "admin")
+    assert cache.load() is None
+    cache.save("secret", None)
+    assert not cache.path.exists()
+
+
+def _expiring_backend(logins: list[str], attempts: list[str]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/auth/login"):
+            logins.append(json.loads(request.content)["username"])
+            return httpx.Response(200, json={"access_token": "fresh", "token_type": "bearer"})
+        attempts.append(request.headers["authorization"])
+        if request.headers["authorization"] != "Bearer fresh":
+            return httpx.Response(401, json={"detail": "expired"})
+        return httpx.Response(200, json=[])
+
+    return handler
+
+
+def test_a_401_triggers_one_relogin_and_one_retry():
+    logins, attempts = [], []
+    client = _client(_expiring_backend(logins, attempts))
+    client.reauthenticate = lambda: client.login("admin", "secret")["access_token"]
+    assert client.get_order_records() == []
+    assert logins == ["admin"]
+    assert attempts == ["Bearer token", "Bearer fresh"]
+
+    client.reauthenticate = lambda: None
+    client.token = "expired-again"
+    with pytest.raises(ApiError) as excinfo:
+        client.get_order_records()
+    assert excinfo.value.status_code == 401
+    assert attempts[2:] == ["Bearer expired-again"]
+
+
+def test_concurrent_401s_share_one_renewal():
+    logins, attempts = [], []
+    backend = _expiring_backend(logins, attempts)
+    barrier = threading.Barrier(4)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        # 4 个请求都拿着旧 token 到达后才一起返回 401。
+        if request.headers.get("authorization") == "Bearer token":
+            barrier.wait(2)
+        return backend(request)
+
+    client = _client(handler)
+    client.reauthenticate = lambda: client.login("admin", "secret")["access_token"]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda offset: client.get_order_records(offset=offset), range(4)))
+    assert results == [[]] * 4
+    assert logins == ["admin"]
+    assert attempts.count("Bearer token") == attempts.count("Bearer fresh") == 4
+
+
+def test_response_cache_ttl_and_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.store(("/a", ()), 1, 60, cache.generation)
+    cache.store(("/b", ()), 2, 60, cache.generation)
+    assert cache.lookup(("/a", ())) == 1
+    cache.store(("/c", ()), 3, 60, cache.generation)
+    assert cache.lookup(("/b", ())) is _MISS
+    assert [cache.lookup((path, ())) for path in ("/a", "/c")] == [1, 3]
+
+    cache.store(("/short", ()), 4, 0.01, cache.generation)
+    time.sleep(0.02)
+    assert cache.lookup(("/short", ())) is _MISS
+
+
+def test_response_cache_single_flight_for_racing_threads():
+    cache = ResponseCache()
+    started, release, loads = threading.Event(), threading.Event(), []
+
+    def loader() -> str:
+        loads.append(1)
+        started.set()
+        release.wait(2)
+        return "value"
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(cache.get_or_load, ("/params", ()), 60, loader)
+        started.wait(2)
+        follower = pool.submit(cache.get_or_load, ("/params", ()), 60, loader)
+        time.sleep(0.05)
+        release.set()
+        assert leader.result() == follower.result() == "value"
+    assert len(loads) == 1
+
+
+def test_response_cache_drops_a_load_that_raced_a_write():
+    cache = ResponseCache()
+
+    def loader() -> str:
+        # 加载过程中发生写操作：返回给本次调用方，但不写入缓存。
+        cache.invalidate(("/params",))
+        return "before-write"
+
+    assert cache.get_or_load(("/params", ()), 60, loader) == "before-write"
+    assert cache.lookup(("/params", ())) is _MISS
+    assert cache.get_or_load(("/params", ()), 60, lambda: "after-write") == "after-write"
+    assert cache.lookup(("/params", ())) == "after-write"
+
+
+def test_async_client_single_flight_and_write_during_load():
+    requests = []
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.method)
+        number = len(requests)
+        if request.method == "GET":
+            await release.wait()
+        return httpx.Response(200, json={"gamma": number})
+
+    async def main() -> None:
+        client = AsyncGlftApiClient("http://backend/api", transport=httpx.MockTransport(handler))
+        client.token = "token"
+        try:
+            loads = [asyncio.ensure_future(client.get_strategy_params()) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            await client.update_strategy_params({"gamma": 0.2})
+            release.set()
+            assert [await load for load in loads] == [{"gamma": 1}] * 3
+            assert await client.get_strategy_params() == {"gamma": 3}
+        finally:
+            await client.aclose()
+
+    asyncio.run(main())
+    assert requests == ["GET", "POST", "GET"]
+
+
+def test_async_client_mirrors_the_sync_api():
+    # 只有流式下载、条件轮询与分页迭代这类界面按同步方式使用的接口没有异步版本。
+    public = {name for name in dir(GlftApiClient) if not name.startswith("_")}
+    assert public - set(dir(AsyncGlftApiClient)) == {
+        "close",
+        "download_pnl_csv",
+        "iter_alerts",
+        "iter_orders",
+        "iter_pages",
+        "iter_trades",
+        "poll_dashboard_metrics",
+    }
+
+
+def test_poll_dashboard_metrics_sends_validators_and_skips_unchanged_bodies():
+    seen, bodies = [], [{"mid_price": 1.0}, {"mid_price": 1.0}, {"mid_price": 2.0}]
+
+    def with_etag(request: httpx.Request) -> httpx.Response:
+        seen.append((request.headers.get("if-none-match"), request.headers.get("if-modified-since")))
+        if request.headers.get("if-none-match") == '"m1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"mid_price": 1.0}, headers={"etag": '"m1"', "last-modified": "Mon"})
+
+    client = _client(with_etag)
+    assert client.poll_dashboard_metrics() == ({"mid_price": 1.0}, True)
+    assert client.poll_dashboard_metrics() == ({"mid_price": 1.0}, False)
+    assert seen == [(None, None), ('"m1"', "Mon")]
+
+    # 服务端不支持校验头时按原始字节比较，内容相同也视为未变化。
+    client = _client(lambda request: httpx.Response(200, json=bodies.pop(0)))
+    assert client.poll_dashboard_metrics() == ({"mid_price": 1.0}, True)
+    assert client.poll_dashboard_metrics() == ({"mid_price": 1.0}, False)
+    assert client.poll_dashboard_metrics() == ({"mid_price": 2.0}, True)
+    assert client.metrics.request_summaries()["/dashboard/metrics"]["count"] == 3
+
+
+def _rows(count: int) -> list[dict[str, int]]:
+    return [{"trade_id": trade_id} for trade_id in range(count, 0, -1)]
+
+
+def test_iter_pages_requests_limit_and_offset():
+    requested = []
+
+    def paged(request: httpx.Request) -> httpx.Response:
+        limit, offset = int(request.url.params["limit"]), int(request.url.params["offset"])
+        requested.append((request.url.params.get("since"), limit, offset))
+        return httpx.Response(200, json=_rows(25)[offset:offset + limit])
+
+    client = _client(paged)
+    assert [len(page) for page in client.iter_pages(client.get_trades, 10, since=3)] == [10, 10, 5]
+    assert requested == [("3", 10, 0), ("3", 10, 10), ("3", 10, 20)]
+    assert [row["trade_id"] for row in client.iter_trades(page_size=10)] == list(range(25, 0, -1))
+
+
+@pytest.mark.parametrize("total", [25, 10])
+def test_iter_pages_slices_locally_when_the_server_ignores_paging(total):
+    requested = []
+
+    def unpaged(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.params["offset"])
+        return httpx.Response(200, json=_rows(total))
+
+    client = _client(unpaged)
+    pages = list(client.iter_pages(client.get_trades, 10))
+    assert [row for page in pages for row in page] == _rows(total)
+    assert all(len(page) <= 10 for page in pages)
+    # 整表比一页长时一次请求就够；恰好一页时要再请求一次，靠“下一页与上一页相同”识别。
+    assert requested == (["0"] if total > 10 else ["0", "10"])
@@ -0,0 +1,116 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from glft_events import STATE_CONNECTED, STATE_UNAUTHORIZED, EventStream, parse_sse
+
+
+def test_parse_sse_events_and_multiline_data():
+    lines = ["event: alert", 'data: {"a":', "data: 1}", "id: 7", "", "data: plain", ""]
+    assert list(parse_sse(lines)) == [("7", "alert", '{"a":\n1}', None), ("7", "message", "plain", None)]
+
+
+def test_parse_sse_comments_retry_and_field_edge_cases():
+    lines = [
+        ": heartbeat",
+        "",
+        "retry: 1500",
+        "",
+        "retry: soon",
+        "id: bad\0id",
+        "data:no-space",
+        "data:  two-spaces",
+        "unknown: x",
+        "",
+        "event: status",
+        "",
+        "data: tail-without-blank-line",
+    ]
+    assert list(parse_sse(lines)) == [
+        (None, "message", "", 1500),
+        (None, "message", "no-space\n two-spaces", None),
+    ]
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.server.tokens.append(self.headers.get("authorization"))
+        if self.headers.get("authorization") != "Bearer fresh":
+            body = b'{"detail": "expired"}'
+            self.send_response(401)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b'id: 1\nevent: alert\ndata: {"id": 1}\n\n')
+        self.wfile.flush()
+        self.server.closed.wait(5)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stream_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+    server.daemon_threads = True
+    server.tokens, server.closed = [], threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.closed.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_for(predicate, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_rejected_token_is_not_retried_until_it_changes(stream_server):
+    token = ["stale"]
+    states, events = [], []
+    stream = EventStream(
+        f"http://127.0.0.1:{stream_server.server_port}", lambda: token[0], events.append, states.append
+    )
+    stream.start()
+    try:
+        _wait_for(lambda: STATE_UNAUTHORIZED in states)
+        time.sleep(1.2)
+        assert stream_server.tokens == ["Bearer stale"]
+        token[0] = "fresh"
+        _wait_for(lambda: events)
+    finally:
+        stream.stop()
+    assert states == [STATE_UNAUTHORIZED, STATE_CONNECTED]
+    assert [event.data for event in events] == [{"id": 1}]
+
+
+def test_renew_hook_supplies_fresh_token(stream_server):
+    token, renewed, events = ["stale"], [], []
+
+    def renew(stale: str) -> str:
+        renewed.append(stale)
+        token[0] = "fresh"
+        return token[0]
+
+    stream = EventStream(
+        f"http://127.0.0.1:{stream_server.server_port}", lambda: token[0], events.append, renew_token=renew
+    )
+    stream.start()
+    try:
+        _wait_for(lambda: events)
+    finally:
+        stream.stop()
+    assert renewed == ["stale"]
+    assert stream_server.tokens == ["Bearer stale", "Bearer fresh"]
+    assert stream.last_event_id == "1"
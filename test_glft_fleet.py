@@ -0,0 +1,81 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from glft_client import ApiError
+from glft_fleet import Fleet, FleetEngine
+from glft_transport import TransportOptions
+from mock_server import MockConfig, start_mock_server
+
+LATENCY_MS = 200.0
+
+
+@pytest.fixture(scope="module")
+def servers():
+    servers = [start_mock_server(MockConfig(latency_ms=LATENCY_MS, trades=10, orders=10)) for _ in range(3)]
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def engines(servers):
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    closed.close()
+    credentials = {"username": "admin", "password": "secret"}
+    return [FleetEngine(f"engine-{index}", server.base_url, credentials) for index, server in enumerate(servers)] + [
+        FleetEngine("down", f"http://127.0.0.1:{port}/api", credentials)
+    ]
+
+
+def _run(engines, action):
+    async def main():
+        fleet = Fleet(engines, options=TransportOptions(retries=0))
+        try:
+            await fleet.login_all()
+            started = time.perf_counter()
+            result = await action(fleet)
+            return result, time.perf_counter() - started
+        finally:
+            await fleet.aclose()
+
+    return asyncio.run(main())
+
+
+def test_poll_fans_out_and_isolates_the_failing_engine(engines):
+    snapshots, elapsed = _run(engines, lambda fleet: fleet.poll())
+    by_name = {snapshot.name: snapshot for snapshot in snapshots}
+    assert list(by_name) == ["engine-0", "engine-1", "engine-2", "down"]
+    for name in ("engine-0", "engine-1", "engine-2"):
+        assert by_name[name].error is None
+        assert "mid_price" in by_name[name].metrics and by_name[name].risk is not None
+    assert by_name["down"].metrics is None and by_name["down"].error
+    # 三台后端同时请求：耗时接近一台的延迟，而不是三台之和。
+    assert elapsed < 2 * LATENCY_MS / 1000
+
+
+def test_broadcast_reports_each_engine(engines):
+    results, elapsed = _run(engines, lambda fleet: fleet.broadcast("engine_stop"))
+    assert [isinstance(results[name], ApiError) for name in results] == [False, False, False, True]
+    assert elapsed < 2 * LATENCY_MS / 1000
+
+
+def test_login_all_reports_missing_credentials_per_engine(engines):
+    engines[1].credentials = None
+
+    async def main():
+        fleet = Fleet(engines, options=TransportOptions(retries=0))
+        try:
+            return await fleet.login_all()
+        finally:
+            await fleet.aclose()
+
+    logins = asyncio.run(main())
+    assert isinstance(logins["engine-1"], ApiError) and logins["engine-1"].status_code == 401
+    assert isinstance(logins["down"], ApiError)
+    assert not isinstance(logins["engine-0"], ApiError)
@@ -0,0 +1,127 @@
+import pytest
+
+from glft_monitor import (
+    CANCELS,
+    FILLS,
+    LEVEL_CRITICAL,
+    LEVEL_OK,
+    LEVEL_WARNING,
+    NOTIONAL,
+    ORDERS,
+    RiskMonitor,
+)
+from glft_records import Order, Trade
+
+LIMITS = {"max_order_rate_per_min": 100, "max_cancel_rate_per_min": "50", "max_inventory_usd": 10_000}
+
+
+def _levels(monitor: RiskMonitor) -> dict[str, str]:
+    return {row.key: row.level for row in monitor.status()}
+
+
+def test_limits_ignore_missing_and_non_positive_values():
+    monitor = RiskMonitor({"max_order_rate_per_min": "abc", "max_cancel_rate_per_min": 0, "max_inventory_usd": 5})
+    assert monitor.limits == {"max_inventory_usd": 5.0}
+    with pytest.raises(ValueError):
+        RiskMonitor(window_seconds=1)
+
+
+def test_orders_and_cancels_are_counted_once_per_order():
+    monitor = RiskMonitor()
+    monitor.observe_order(1, "open", 100.0)
+    monitor.observe_order(1, "partially_filled", 100.5)
+    monitor.observe_order(1, "cancelled", 101.0)
+    monitor.observe_order(2, "filled", 101.2)
+    monitor.observe_order(3, "canceled", 101.4)
+    assert monitor.per_minute(ORDERS) == 3
+    assert monitor.per_minute(CANCELS) == 2
+    assert monitor.events == 5
+
+
+def test_window_slides_and_drops_late_events():
+    monitor = RiskMonitor(window_seconds=10)
+    for second in range(10):
+        monitor.observe_order(second, "open", 1000.0 + second)
+    assert monitor.per_minute(ORDERS) == 10 * 6
+    monitor.advance(1014.0)
+    assert monitor.per_minute(ORDERS) == 5 * 6
+    monitor.observe_order("late", "open", 1004.0)
+    assert monitor.late_events == 1
+    monitor.advance(1100.0)
+    assert monitor.per_minute(ORDERS) == 0
+    monitor.advance(50.0)
+    assert monitor.per_minute(ORDERS) == 0
+
+
+def test_per_second_reads_last_complete_second():
+    monitor = RiskMonitor()
+    assert monitor.per_second(FILLS) == 0.0
+    monitor.observe_trade("buy", 1.0, 10.0, 200.2)
+    monitor.observe_trade("sell", 2.0, 10.0, 200.7)
+    monitor.observe_trade("buy", 1.0, 10.0, 201.1)
+    assert monitor.per_second(FILLS) == 2
+    assert monitor.per_second(NOTIONAL) == -10.0
+
+
+def test_inventory_calibration_only_counts_later_fills():
+    monitor = RiskMonitor()
+    monitor.set_inventory(500.0, as_of=300.0)
+    monitor.observe_trades([
+        Trade(trade_id=1, side="buy", size=1.0, price=100.0, created_at="1970-01-01T00:04:59Z"),
+        Trade(trade_id=2, side="sell", size=2.0, price=100.0, created_at="1970-01-01T00:05:01Z"),
+        Trade(trade_id=3, side="buy", size=1.0, price=100.0, created_at=None),
+    ])
+    assert monitor.inventory_usd == 300.0
+    assert monitor.per_minute(FILLS) == 2
+
+
+def test_observe_orders_skips_records_without_timestamp():
+    monitor = RiskMonitor()
+    orders = [
+        Order(order_id=1, status="open", updated_at="2026-01-01T00:00:00+00:00"),
+        Order(order_id=2, status="open", updated_at="not a time"),
+        Order(order_id=3, status="open"),
+    ]
+    assert monitor.observe_orders(orders) == 1
+
+
+def test_levels_and_check_report_only_new_or_escalated_warnings():
+    monitor = RiskMonitor(LIMITS)
+    for index in range(80):
+        monitor.observe_order(index, "open", 1000.0 + index * 0.5)
+    monitor.advance(1040.0)
+    assert _levels(monitor)["order_rate"] == LEVEL_WARNING
+    assert [warning.key for warning in monitor.check()] == ["order_rate"]
+    assert monitor.check() == []
+
+    for index in range(80, 96):
+        monitor.observe_order(index, "open", 1040.0)
+    assert _levels(monitor)["order_rate"] == LEVEL_CRITICAL
+    assert [warning.level for warning in monitor.check()] == [LEVEL_CRITICAL]
+
+    monitor.advance(2000.0)
+    assert _levels(monitor)["order_rate"] == LEVEL_OK
+    assert monitor.check() == []
+
+
+def test_projected_rate_warns_before_the_window_fills():
+    monitor = RiskMonitor(LIMITS)
+    for index in range(2):
+        monitor.observe_order(index, "cancelled", 500.5)
+    monitor.advance(501.0)
+    row = next(row for row in monitor.status() if row.key == "cancel_rate")
+    assert row.value == 2 and row.projected == 120
+    assert row.level == LEVEL_WARNING
+    assert "将超过阈值" in monitor.check()[0].message
+
+
+def test_inventory_drift_projection():
+    monitor = RiskMonitor(LIMITS)
+    monitor.set_inventory(-7_000.0, as_of=0.0)
+    monitor.observe_trade("sell", 1.0, 4_000.0, 10.0)
+    monitor.advance(11.0)
+    row = next(row for row in monitor.status() if row.key == "inventory")
+    assert row.value == 11_000.0
+    assert row.level == LEVEL_CRITICAL
+    assert row.headroom == -1_000.0
+    assert row.usage == pytest.approx(1.1)
@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from glft_quote import SWEEP_FIELDS, candidate_grid, glft_offsets, parse_range, quote_grid, sweep  # noqa: E402
+
+PARAMS = {"gamma": 0.1, "sigma": 2.0, "A": 140.0, "k": 1.5, "order_cap_usd": 100.0, "inventory_cap_usd": 500.0}
+
+
+def test_parse_range_forms():
+    assert parse_range("0.1:0.3:3").tolist() == pytest.approx([0.1, 0.2, 0.3])
+    assert parse_range("1, 2,3").tolist() == [1.0, 2.0, 3.0]
+    assert parse_range(" 0.5 ").tolist() == [0.5]
+
+
+@pytest.mark.parametrize("text", ["0.1:0.2:0", "0.1:0.2:-1", ",", "", "1:2", "abc"])
+def test_parse_range_rejects_empty_or_malformed(text):
+    with pytest.raises(ValueError):
+        parse_range(text)
+
+
+def test_candidate_grid_is_cartesian_product():
+    grid = candidate_grid({"gamma": [0.1, 0.2], "sigma": [1.0], "A": [140.0], "k": [1.0, 2.0, 3.0]})
+    assert all(len(grid[field]) == 6 for field in SWEEP_FIELDS)
+    assert sorted(zip(grid["gamma"], grid["k"])) == [(g, k) for g in (0.1, 0.2) for k in (1.0, 2.0, 3.0)]
+
+
+def test_sweep_with_empty_grid_raises_value_error():
+    ranges = {"gamma": [], "sigma": [1.0], "A": [140.0], "k": [1.5]}
+    with pytest.raises(ValueError, match="参数网格为空"):
+        sweep([100.0, 101.0, 99.0], ranges, 100.0, 500.0, workers=1)
+
+
+def test_offsets_are_symmetric_when_flat():
+    bid, ask = glft_offsets(0.1, 2.0, 140.0, 1.5, 0.0)
+    assert float(bid) == pytest.approx(float(ask))
+    long_bid, long_ask = glft_offsets(0.1, 2.0, 140.0, 1.5, 2.0)
+    # 多头库存时买价退得更远、卖价更近。
+    assert long_bid > bid and long_ask < ask
+
+
+def test_quote_grid_covers_inventory_range():
+    rows = quote_grid(PARAMS, levels=5)
+    assert [row["inventory_usd"] for row in rows] == [-500.0, -250.0, 0.0, 250.0, 500.0]
+    assert rows[2]["skew"] == pytest.approx(0.0)
+
+
+def test_sweep_sorts_by_pnl_and_counts_fills():
+    rng = np.random.default_rng(7)
+    prices = 100.0 + np.cumsum(rng.normal(0, 0.5, 500))
+    ranges = {"gamma": [0.05, 0.2], "sigma": [0.5, 2.0], "A": [140.0], "k": [1.5]}
+    results = sweep(prices, ranges, 100.0, 500.0, workers=1)
+    assert len(results["pnl"]) == 4
+    assert np.all(np.diff(results["pnl"]) <= 0)
+    assert np.all((results["fill_rate"] >= 0) & (results["fill_rate"] <= 1))
+
+
+def test_parallel_sweep_matches_single_process():
+    rng = np.random.default_rng(3)
+    prices = 100.0 + np.cumsum(rng.normal(0, 0.5, 200))
+    ranges = {
+        "gamma": np.linspace(0.05, 0.5, 16),
+        "sigma": np.linspace(0.5, 2.0, 8),
+        "A": [140.0],
+        "k": [1.0, 1.5, 2.0, 2.5],
+    }
+    single = sweep(prices, ranges, 100.0, 500.0, workers=1)
+    parallel = sweep(prices, ranges, 100.0, 500.0, workers=2)
+    assert len(parallel["pnl"]) == 512
+    for field, values in single.items():
+        assert np.array_equal(parallel[field], values)
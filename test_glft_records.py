@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from glft_records import Alert, Order, Position, Trade, decode_records
+from mock_server import make_trade
+
+
+def test_full_objects_use_positional_fast_path_and_drop_unknown_fields():
+    payload = {**make_trade(7), "venue": "binance"}
+    trade = Trade.from_json_object(payload)
+    assert isinstance(trade, Trade)
+    assert trade.to_dict() == make_trade(7)
+
+
+def test_partial_objects_fill_defaults():
+    order = Order.from_json_object({"order_id": 3, "status": "filled", "extra": 1})
+    assert order == Order(order_id=3, status="filled")
+
+
+def test_missing_required_field_returns_dict_unchanged():
+    nested = {"symbol_count": 2}
+    assert Position.from_json_object(nested) is nested
+
+
+def test_low_cardinality_strings_are_interned():
+    first, second = decode_records(Trade, json.dumps([make_trade(3), make_trade(6)]))
+    assert first.symbol == second.symbol
+    assert first.symbol is second.symbol
+    partial = Alert.from_json_object({"id": 1, "level": "".join(["warn", "ing"])})
+    assert partial.level is Alert.from_json_object({"id": 2, "level": "warning"}).level
+
+
+def test_decode_records_keeps_order():
+    rows = [make_trade(trade_id) for trade_id in (5, 1, 9)]
+    records = decode_records(Trade, json.dumps(rows).encode())
+    assert [record.trade_id for record in records] == [5, 1, 9]
+    assert [record.to_dict() for record in records] == rows
+
+
+@pytest.mark.parametrize("content", ['{"trade_id": 1}', '[{"symbol": "x"}]', "[1, 2]"])
+def test_decode_records_rejects_non_record_arrays(content):
+    with pytest.raises(ValueError):
+        decode_records(Trade, content)
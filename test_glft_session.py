@@ -0,0 +1,144 @@
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from glft_client import UsageError
+from glft_session import (
+    REPLAY_TOKEN,
+    RecordingTransport,
+    ReplayTransport,
+    SessionReader,
+    SessionRecorder,
+    index_path,
+    resolve_seek_target,
+)
+
+BASE_URL = "http://backend/api"
+
+
+def _backend(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/auth/login"):
+        return httpx.Response(200, json={"access_token": "secret-token", "token_type": "bearer"})
+    if request.url.path.endswith("/reports/pnl.csv"):
+        return httpx.Response(200, content=b"time,pnl\n")
+    if request.url.path.endswith("/risk/status"):
+        return httpx.Response(200, json={"calls": int(request.headers["x-call"])})
+    return httpx.Response(200, json={"path": request.url.path, "query": request.url.query.decode()})
+
+
+def _record(path, calls):
+    recorder = SessionRecorder(path, BASE_URL)
+    transport = RecordingTransport(recorder, httpx.MockTransport(_backend))
+    with httpx.Client(base_url=BASE_URL, transport=transport) as client:
+        for number, (method, url, body) in enumerate(calls, 1):
+            client.request(method, url, json=body, headers={"x-call": str(number)})
+    recorder.close()
+
+
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "session.glft"
+    _record(path, [
+        ("POST", "/auth/login", {"username": "admin", "password": "hunter2"}),
+        ("GET", "/risk/status", None),
+        ("GET", "/trades?limit=2&offset=0", None),
+        ("GET", "/reports/pnl.csv", None),
+        ("GET", "/risk/status", None),
+    ])
+    return path
+
+
+def test_frames_round_trip_with_secrets_redacted(session):
+    reader = SessionReader(session)
+    try:
+        assert reader.base_url == BASE_URL
+        assert len(reader) == 5
+        login = reader.read(0)
+        assert json.loads(login.request_body)["password"] == "***"
+        assert json.loads(login.body)["access_token"] == "***"
+        assert reader.read(3).body is None
+        assert json.loads(reader.read(4).body) == {"calls": 5}
+        assert reader.start <= reader.timestamp(2) <= reader.end
+    finally:
+        reader.close()
+
+
+def test_replay_answers_from_the_latest_record_before_the_cursor(session):
+    reader = SessionReader(session)
+    transport = ReplayTransport(reader)
+    try:
+        with httpx.Client(base_url=BASE_URL, transport=transport) as client:
+            assert client.get("/risk/status").json() == {"calls": 5}
+            transport.at = reader.timestamp(1)
+            assert client.get("/risk/status").json() == {"calls": 2}
+            transport.at = reader.start - 1
+            assert client.get("/risk/status").status_code == 404
+
+            transport.at = reader.end
+            assert client.get("/trades?limit=2&offset=0").json()["query"] == "limit=2&offset=0"
+            assert client.get("/trades?limit=2&offset=2").json() == []
+            assert client.get("/reports/pnl.csv").status_code == 404
+            assert client.post("/auth/login", json={}).json()["access_token"] == REPLAY_TOKEN
+            assert client.post("/engine/stop").status_code == 403
+    finally:
+        reader.close()
+
+
+def test_appending_keeps_earlier_frames_and_checks_base_url(session):
+    _record(session, [("GET", "/config", None)])
+    reader = SessionReader(session)
+    try:
+        assert len(reader) == 6
+        assert reader.read(5).key == "GET /api/config"
+    finally:
+        reader.close()
+    with pytest.raises(UsageError):
+        SessionRecorder(session, "http://elsewhere/api")
+
+
+def test_torn_frame_is_ignored_and_missing_index_rebuilt(session):
+    with session.open("ab") as fh:
+        fh.write(b"\x40\x00\x00\x00partial")
+    index_path(session).unlink()
+    reader = SessionReader(session)
+    try:
+        assert len(reader) == 5
+        assert json.loads(reader.read(4).body) == {"calls": 5}
+    finally:
+        reader.close()
+    _record(session, [("GET", "/keys", None)])
+    reader = SessionReader(session)
+    try:
+        assert [reader.read(position).key for position in (4, 5)] == ["GET /api/risk/status", "GET /api/keys"]
+    finally:
+        reader.close()
+
+
+def test_rejects_files_that_are_not_sessions(tmp_path):
+    bogus = tmp_path / "bogus.glft"
+    bogus.write_bytes(b"not a session")
+    with pytest.raises(UsageError):
+        SessionReader(bogus)
+    with pytest.raises(UsageError):
+        SessionReader(tmp_path / "missing.glft")
+
+
+def test_resolve_seek_target_forms(session):
+    reader = SessionReader(session)
+    try:
+        current = reader.timestamp(2)
+        assert resolve_seek_target("start", reader, current) == reader.start
+        assert resolve_seek_target("end", reader, current) == reader.end
+        assert resolve_seek_target("#2", reader, current) == reader.timestamp(1)
+        assert resolve_seek_target("+30", reader, current) == current + 30
+        assert resolve_seek_target("-1.5", reader, current) == current - 1.5
+        day = datetime.fromtimestamp(current).date()
+        assert resolve_seek_target("09:30", reader, current) == datetime.fromisoformat(f"{day} 09:30").timestamp()
+        assert resolve_seek_target("2026-01-02 03:04:05", reader, current) == datetime(2026, 1, 2, 3, 4, 5).timestamp()
+        for text in ("#0", "#99", "#x", "+abc", "noon"):
+            with pytest.raises(ValueError):
+                resolve_seek_target(text, reader, current)
+    finally:
+        reader.close()
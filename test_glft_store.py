@@ -0,0 +1,75 @@
+from glft_records import Order, Trade
+from glft_store import LocalStore
+
+
+def _open(tmp_path):
+    return LocalStore(tmp_path / "store.sqlite3")
+
+
+def test_orders_without_updated_at_fall_back_to_order_id(tmp_path):
+    store = _open(tmp_path)
+    orders = [Order(order_id=index, symbol="BTC", side="buy", status="open") for index in (1, 2, 3)]
+    newest = store.merge("orders", orders)
+    store.advance("orders", newest)
+    assert newest == 3
+    assert store.cursor("orders") == 3
+    assert [order.order_id for order in store.recent("orders")] == [3, 2, 1]
+    store.close()
+
+
+def test_orders_with_updated_at_use_it_as_cursor(tmp_path):
+    store = _open(tmp_path)
+    orders = [
+        Order(order_id=1, status="open", updated_at="2026-01-01T00:00:02Z"),
+        Order(order_id=2, status="open", updated_at="2026-01-01T00:00:01Z"),
+    ]
+    assert store.merge("orders", orders) == "2026-01-01T00:00:02Z"
+    assert store.sync_params("orders") == {}
+    store.advance("orders", "2026-01-01T00:00:02Z")
+    # updated_at 不唯一，since 往回退一秒，同一秒内后来的更新也能取回。
+    assert store.sync_params("orders") == {"since": "2026-01-01T00:00:01Z"}
+    store.close()
+
+
+def test_updates_in_the_cursor_second_are_not_lost(tmp_path):
+    store = _open(tmp_path)
+    first = Order(order_id=1, status="open", updated_at="2026-01-01T00:00:05Z")
+    store.advance("orders", store.merge("orders", [first]))
+    since = store.sync_params("orders")["since"]
+    later = [
+        first,
+        Order(order_id=2, status="filled", updated_at="2026-01-01T00:00:05Z"),
+        Order(order_id=3, status="open", updated_at="2026-01-01T00:00:06Z"),
+    ]
+    assert store.merge("orders", later, since) == "2026-01-01T00:00:06Z"
+    assert sorted(order.order_id for order in store.recent("orders")) == [1, 2, 3]
+    store.close()
+
+
+def test_unique_cursors_are_sent_unchanged(tmp_path):
+    store = _open(tmp_path)
+    store.advance("trades", store.merge("trades", [{"trade_id": 7}]))
+    store.advance("orders", store.merge("orders", [{"order_id": 9, "status": "open"}]))
+    assert store.sync_params("trades") == {"since": 7}
+    assert store.sync_params("orders") == {"since": 9}
+    store.close()
+
+
+def test_merge_skips_rows_not_newer_than_since_and_dedupes(tmp_path):
+    store = _open(tmp_path)
+    trades = [Trade(trade_id=index, symbol="ETH", side="sell", price=1.0, size=1.0) for index in (1, 2, 3)]
+    assert store.merge("trades", trades) == 3
+    store.advance("trades", 3)
+    assert store.merge("trades", trades[1:] + [Trade(trade_id=4)], since=3) == 4
+    assert [trade.trade_id for trade in store.recent("trades")] == [4, 3, 2, 1]
+    store.close()
+
+
+def test_advance_ignores_older_cursor(tmp_path):
+    store = _open(tmp_path)
+    store.merge("trades", [{"trade_id": 5}])
+    store.advance("trades", 5)
+    store.advance("trades", 2)
+    store.advance("trades", None)
+    assert store.cursor("trades") == 5
+    store.close()
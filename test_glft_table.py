@@ -0,0 +1,108 @@
+import json
+import random
+
+import pytest
+
+from glft_records import Trade, decode_records
+from glft_table import TableView
+from mock_server import make_trade
+
+COLUMNS = [("trade_id", "成交ID"), ("symbol", "标的"), ("side", "方向"), ("price", "价格")]
+
+
+@pytest.fixture
+def trades():
+    return decode_records(Trade, json.dumps([make_trade(trade_id) for trade_id in range(1, 301)]))
+
+
+def _all_rows(view: TableView) -> list[list[str]]:
+    view.page_rows = max(1, len(view))
+    view.home()
+    return view.window()
+
+
+def test_only_low_cardinality_columns_are_indexed(trades):
+    view = TableView(trades, COLUMNS, page_rows=5)
+    assert view.indexed_fields == ("symbol", "side")
+    assert view.total == len(view) == 300
+    assert view.window()[0] == ["1", trades[0].symbol, "buy", str(trades[0].price)]
+
+
+def test_parse_filter_forms(trades):
+    view = TableView(trades, COLUMNS)
+    assert view.parse_filter("标的=btc") == {"symbol": ["BTC_USDT_Perp"]}
+    assert view.parse_filter("sell ETH,SOL") == {
+        "side": ["sell"],
+        "symbol": ["ETH_USDT_Perp", "SOL_USDT_Perp"],
+    }
+    with pytest.raises(ValueError):
+        view.parse_filter("price=1")
+    with pytest.raises(ValueError):
+        view.parse_filter("nothing-matches")
+    with pytest.raises(ValueError):
+        view.parse_filter("venue=x")
+
+
+@pytest.mark.parametrize("text", ["BTC", "sell", "BTC sell", "ETH,SOL buy"])
+@pytest.mark.parametrize("field", [None, "price", "trade_id", "symbol"])
+def test_filter_and_sort_match_brute_force(trades, text, field):
+    view = TableView(trades, COLUMNS)
+    criteria = view.parse_filter(text)
+    view.set_filter(criteria)
+    expected = [trade for trade in trades if all(getattr(trade, key) in keys for key, keys in criteria.items())]
+    if field is not None:
+        view.sort_by(field)
+        expected.sort(key=lambda trade: getattr(trade, field))
+    assert [int(row[0]) for row in _all_rows(view)] == [trade.trade_id for trade in expected]
+    if field is not None:
+        view.sort_by(field)
+        assert view.descending
+        assert [int(row[0]) for row in _all_rows(view)] == [trade.trade_id for trade in reversed(expected)]
+
+
+def test_mixed_and_missing_values_sort_last():
+    rows = [{"name": value} for value in (3, None, "b", 1, "a", None)]
+    view = TableView(rows, [("name", "名称")])
+    view.sort_by("name")
+    assert [row[0] for row in _all_rows(view)] == ["1", "3", "a", "b", "None", "None"]
+
+
+def test_scrolling_is_clamped(trades):
+    view = TableView(trades, COLUMNS, page_rows=20)
+    view.scroll(-5)
+    assert view.offset == 0
+    view.scroll(1000)
+    assert view.offset == 280
+    view.home()
+    view.end()
+    assert view.window()[-1][0] == "300"
+    view.set_filter(view.parse_filter("symbol=BTC"))
+    assert view.offset == 0
+    assert len(view) == 100
+
+
+def test_resolve_field_accepts_field_or_label(trades):
+    view = TableView(trades, COLUMNS)
+    assert view.resolve_field("价格") == "price"
+    assert view.resolve_field("side") == "side"
+    with pytest.raises(ValueError):
+        view.resolve_field("fee")
+
+
+def test_large_random_filters_use_both_sort_paths():
+    rng = random.Random(3)
+    symbols = "ABCDEFGHIJKLMNOPQRST"
+    rows = [
+        {"symbol": rng.choice(symbols), "side": rng.choice(["buy", "sell"]), "price": rng.random()} for _ in range(2000)
+    ]
+    view = TableView(rows, [("symbol", "标的"), ("side", "方向"), ("price", "价格")])
+    view.sort_by("price")
+    # 约 5% 的行命中时对命中行排序，约 25% 时沿整表顺序按掩码挑选。
+    for text in ("A", "A,B,C,D,E"):
+        criteria = view.parse_filter(text)
+        view.set_filter(criteria)
+        expected = sorted(
+            (row for row in rows if all(row[key] in keys for key, keys in criteria.items())),
+            key=lambda row: row["price"],
+        )
+        assert [float(row[2]) for row in _all_rows(view)] == [row["price"] for row in expected]
@@ -0,0 +1,278 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from glft_metrics import ClientMetrics
+from glft_transport import (
+    AsyncResilientTransport,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientTransport,
+    TransportOptions,
+)
+
+PROXY_ENV = ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY", "http_proxy", "https_proxy", "all_proxy", "no_proxy")
+FAST = TransportOptions(retry_backoff=0.001, retry_backoff_max=0.001)
+
+
+class _Recorder(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.server.paths.append(self.path)
+        self.send_response(200)
+        self.send_header("content-length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def recording_server():
+    servers = []
+
+    def start() -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Recorder)
+        server.paths = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def clean_proxy_env(monkeypatch):
+    for name in PROXY_ENV:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def _sequence(statuses, calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status, json={"n": len(calls)})
+
+    return handler
+
+
+def test_environment_proxy_is_honoured(clean_proxy_env, recording_server):
+    proxy, backend = recording_server(), recording_server()
+    clean_proxy_env.setenv("HTTP_PROXY", f"http://127.0.0.1:{proxy.server_port}")
+    url = f"http://127.0.0.1:{backend.server_port}/api/ping"
+    with httpx.Client(transport=ResilientTransport()) as client:
+        assert client.get(url).text == "ok"
+    assert proxy.paths == [url]
+    assert backend.paths == []
+
+
+def test_no_proxy_goes_direct(clean_proxy_env, recording_server):
+    proxy, backend = recording_server(), recording_server()
+    clean_proxy_env.setenv("HTTP_PROXY", f"http://127.0.0.1:{proxy.server_port}")
+    clean_proxy_env.setenv("NO_PROXY", "127.0.0.1")
+    with httpx.Client(transport=ResilientTransport()) as client:
+        client.get(f"http://127.0.0.1:{backend.server_port}/api/ping")
+    assert proxy.paths == []
+    assert backend.paths == ["/api/ping"]
+
+
+def test_explicit_proxy_option_and_trust_env(clean_proxy_env, recording_server):
+    proxy, backend = recording_server(), recording_server()
+    url = f"http://127.0.0.1:{backend.server_port}/x"
+    options = TransportOptions(proxy=f"http://127.0.0.1:{proxy.server_port}")
+    with httpx.Client(transport=ResilientTransport(options)) as client:
+        client.get(url)
+    clean_proxy_env.setenv("HTTP_PROXY", f"http://127.0.0.1:{proxy.server_port}")
+    with httpx.Client(transport=ResilientTransport(TransportOptions(trust_env=False))) as client:
+        client.get(url)
+    assert proxy.paths == [url]
+    assert backend.paths == ["/x"]
+
+
+def test_all_proxy_without_scheme_and_no_proxy_suffix(clean_proxy_env, recording_server):
+    proxy, backend = recording_server(), recording_server()
+    clean_proxy_env.setenv("ALL_PROXY", f"127.0.0.1:{proxy.server_port}")
+    clean_proxy_env.setenv("NO_PROXY", "internal.example, .corp")
+    transport = ResilientTransport()
+    url = f"http://127.0.0.1:{backend.server_port}/y"
+    with httpx.Client(transport=transport) as client:
+        client.get(url)
+        for host in ("internal.example", "api.internal.example", "db.corp:8443"):
+            assert transport._transport_for(httpx.URL(f"https://{host}/")) is transport._default
+        assert transport._transport_for(httpx.URL("https://example.org/")) is not transport._default
+    assert proxy.paths == [url]
+    assert backend.paths == []
+
+
+def test_get_is_retried_on_transient_status():
+    calls, metrics = [], ClientMetrics()
+    transport = ResilientTransport(FAST, metrics, inner=httpx.MockTransport(_sequence([503, 502, 200], calls)))
+    with httpx.Client(transport=transport) as client:
+        assert client.get("http://backend/api/dashboard/metrics").status_code == 200
+    assert len(calls) == 3
+    assert metrics.transport_counts() == {"retry": 2}
+
+
+def test_get_gives_up_after_configured_retries():
+    calls = []
+    options = TransportOptions(retries=1, retry_backoff=0.001, breaker_threshold=0)
+    transport = ResilientTransport(options, inner=httpx.MockTransport(_sequence([503], calls)))
+    with httpx.Client(transport=transport) as client:
+        assert client.get("http://backend/x").status_code == 503
+    assert len(calls) == 2
+
+
+def test_network_error_is_retried_but_500_is_not():
+    calls = []
+    handler = _sequence([httpx.ConnectError("refused"), 500], calls)
+    with httpx.Client(transport=ResilientTransport(FAST, inner=httpx.MockTransport(handler))) as client:
+        assert client.get("http://backend/x").status_code == 500
+    assert len(calls) == 2
+
+
+def test_long_retry_after_is_not_waited_for():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503, headers={"retry-after": "120"})
+
+    with httpx.Client(transport=ResilientTransport(FAST, inner=httpx.MockTransport(handler))) as client:
+        assert client.get("http://backend/x").status_code == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT", "DELETE"])
+def test_writes_are_sent_exactly_once(method):
+    calls = []
+    handler = _sequence([503, 200], calls)
+    with httpx.Client(transport=ResilientTransport(FAST, inner=httpx.MockTransport(handler))) as client:
+        assert client.request(method, "http://backend/api/engine/start").status_code == 503
+    with httpx.Client(transport=ResilientTransport(FAST, inner=httpx.MockTransport(_failing(calls)))) as client:
+        with pytest.raises(httpx.ConnectError):
+            client.request(method, "http://backend/api/engine/start")
+    assert calls == [method, method]
+
+
+def _failing(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        raise httpx.ConnectError("refused")
+
+    return handler
+
+
+def test_breaker_opens_short_circuits_and_recovers():
+    metrics = ClientMetrics()
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05, metrics=metrics)
+    breaker.failure()
+    breaker.before()
+    breaker.failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    time.sleep(0.06)
+    breaker.before()
+    assert breaker.state == "half-open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    breaker.record(200)
+    assert breaker.state == "closed"
+    assert metrics.transport_counts() == {"breaker_open": 1, "short_circuit": 2}
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.failure()
+    time.sleep(0.02)
+    breaker.before()
+    breaker.record(503)
+    assert breaker.state == "open"
+
+
+def test_open_breaker_blocks_writes_without_sending():
+    calls = []
+    options = TransportOptions(breaker_threshold=1, breaker_cooldown=60)
+    transport = ResilientTransport(options, inner=httpx.MockTransport(_failing(calls)))
+    with httpx.Client(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError):
+            client.post("http://backend/api/engine/stop")
+        with pytest.raises(CircuitOpenError):
+            client.post("http://backend/api/engine/stop")
+    assert calls == ["POST"]
+
+
+def _slow_first(delay):
+    calls = []
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            calls.append(request.url.path)
+            first = len(calls) == 1
+        if first:
+            time.sleep(delay)
+        return httpx.Response(200, json={"first": first})
+
+    return handler, calls
+
+
+def test_hedged_read_returns_faster_copy():
+    handler, calls = _slow_first(0.5)
+    metrics = ClientMetrics()
+    options = TransportOptions(hedge_after=0.02)
+    transport = ResilientTransport(options, metrics, inner=httpx.MockTransport(handler))
+    with httpx.Client(transport=transport) as client:
+        started = time.perf_counter()
+        response = client.get("http://backend/api/risk/status")
+        elapsed = time.perf_counter() - started
+    assert response.json() == {"first": False}
+    assert elapsed < 0.4
+    assert len(calls) == 2
+    assert metrics.transport_counts() == {"hedge": 1, "hedge_win": 1}
+
+
+def test_only_configured_paths_are_hedged():
+    handler, calls = _slow_first(0.05)
+    options = TransportOptions(hedge_after=0.01)
+    with httpx.Client(transport=ResilientTransport(options, inner=httpx.MockTransport(handler))) as client:
+        client.get("http://backend/api/trades")
+        client.post("http://backend/api/dashboard/metrics")
+    assert len(calls) == 2
+
+
+def test_async_hedge_and_retry():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.endswith("/dashboard/metrics") and len(calls) == 1:
+            await asyncio.sleep(0.5)
+        if request.url.path.endswith("/orders") and len(calls) < 4:
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    async def main() -> float:
+        metrics = ClientMetrics()
+        options = TransportOptions(hedge_after=0.02, retry_backoff=0.001)
+        transport = AsyncResilientTransport(options, metrics, inner=httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            started = time.perf_counter()
+            await client.get("http://backend/api/dashboard/metrics")
+            elapsed = time.perf_counter() - started
+            assert (await client.get("http://backend/api/orders")).status_code == 200
+        assert metrics.transport_counts() == {"hedge": 1, "hedge_win": 1, "retry": 1}
+        return elapsed
+
+    assert asyncio.run(main()) < 0.4
+    assert calls.count("/api/dashboard/metrics") == 2